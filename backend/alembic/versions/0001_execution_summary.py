@@ -0,0 +1,32 @@
+"""add test_executions.summary
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    # 新库的表由应用启动时的create_all创建, 已包含该列
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    if not _has_column('test_executions', 'summary'):
+        op.add_column('test_executions', sa.Column('summary', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('test_executions', 'summary')
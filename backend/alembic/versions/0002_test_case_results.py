@@ -0,0 +1,45 @@
+"""create test_case_results
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 新库的表由应用启动时的create_all创建
+    if sa.inspect(op.get_bind()).has_table('test_case_results'):
+        return
+    op.create_table(
+        'test_case_results',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('execution_id', sa.Integer(), sa.ForeignKey('test_executions.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('test_case_id', sa.Integer(), sa.ForeignKey('test_cases.id', ondelete='SET NULL')),
+        sa.Column('test_case_name', sa.String(200)),
+        sa.Column('type', sa.String(20)),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('duration', sa.Float()),
+        sa.Column('error', sa.Text()),
+        sa.Column('output', sa.Text()),
+        sa.Column('details', sa.JSON()),
+        sa.Column('artifacts', sa.JSON()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_test_case_results_id', 'test_case_results', ['id'])
+    op.create_index('ix_test_case_results_execution_case', 'test_case_results', ['execution_id', 'test_case_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table('test_case_results')
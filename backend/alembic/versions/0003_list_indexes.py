@@ -0,0 +1,42 @@
+"""add composite indexes for project list queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_test_executions_project_created', 'test_executions', ['project_id', 'created_at', 'id']),
+    ('ix_test_executions_project_status', 'test_executions', ['project_id', 'status']),
+    ('ix_test_cases_project', 'test_cases', ['project_id', 'id']),
+    ('ix_test_cases_project_type', 'test_cases', ['project_id', 'type', 'id']),
+]
+
+
+def _has_index(table: str, name: str) -> bool:
+    # 新库的索引由应用启动时的create_all创建
+    return name in {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        if not _has_index(table, name):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
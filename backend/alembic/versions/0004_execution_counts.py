@@ -0,0 +1,73 @@
+"""add scalar result counts to test_executions
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = [
+    ('total_count', sa.Integer()),
+    ('passed_count', sa.Integer()),
+    ('failed_count', sa.Integer()),
+    ('error_count', sa.Integer()),
+    ('skipped_count', sa.Integer()),
+    ('duration', sa.Float()),
+]
+
+
+def _has_column(table: str, column: str) -> bool:
+    # 新库的表由应用启动时的create_all创建, 已包含该列
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    for name, type_ in COLUMNS:
+        if not _has_column('test_executions', name):
+            op.add_column('test_executions', sa.Column(name, type_, nullable=True))
+
+    # 从已有执行的result.summary回填
+    bind = op.get_bind()
+    executions = sa.table(
+        'test_executions',
+        sa.column('id', sa.Integer()),
+        sa.column('result', sa.JSON()),
+        *[sa.column(name, type_) for name, type_ in COLUMNS]
+    )
+    rows = bind.execute(
+        sa.select(executions.c.id, executions.c.result).where(executions.c.total_count.is_(None))
+    ).fetchall()
+    for execution_id, result in rows:
+        if isinstance(result, str):
+            result = json.loads(result)
+        summary = (result or {}).get('summary')
+        if not isinstance(summary, dict):
+            continue
+        bind.execute(
+            executions.update().where(executions.c.id == execution_id).values(
+                total_count=summary.get('total', 0),
+                passed_count=summary.get('passed', 0),
+                failed_count=summary.get('failed', 0),
+                error_count=summary.get('error', 0),
+                skipped_count=summary.get('skipped', 0),
+                duration=summary.get('duration', 0)
+            )
+        )
+
+
+def downgrade() -> None:
+    for name, _ in reversed(COLUMNS):
+        op.drop_column('test_executions', name)
@@ -0,0 +1,67 @@
+"""create daily stats rollup tables
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 新库的表由应用启动时的create_all创建
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('project_daily_stats'):
+        op.create_table(
+            'project_daily_stats',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('runs', sa.Integer(), nullable=False),
+            sa.Column('passed_runs', sa.Integer(), nullable=False),
+            sa.Column('failed_runs', sa.Integer(), nullable=False),
+            sa.Column('cancelled_runs', sa.Integer(), nullable=False),
+            sa.Column('case_runs', sa.Integer(), nullable=False),
+            sa.Column('case_passes', sa.Integer(), nullable=False),
+            sa.Column('case_failures', sa.Integer(), nullable=False),
+            sa.Column('case_errors', sa.Integer(), nullable=False),
+            sa.Column('total_duration', sa.Float(), nullable=False),
+            sa.Column('duration_histogram', sa.JSON()),
+        )
+        op.create_index('ix_project_daily_stats_id', 'project_daily_stats', ['id'])
+        op.create_index('ix_project_daily_stats_project_day', 'project_daily_stats', ['project_id', 'day'], unique=True)
+
+    if not inspector.has_table('test_case_daily_stats'):
+        op.create_table(
+            'test_case_daily_stats',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('test_case_id', sa.Integer(), sa.ForeignKey('test_cases.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('runs', sa.Integer(), nullable=False),
+            sa.Column('passes', sa.Integer(), nullable=False),
+            sa.Column('failures', sa.Integer(), nullable=False),
+            sa.Column('errors', sa.Integer(), nullable=False),
+            sa.Column('flips', sa.Integer(), nullable=False),
+            sa.Column('last_status', sa.String(20)),
+            sa.Column('total_duration', sa.Float(), nullable=False),
+            sa.Column('duration_histogram', sa.JSON()),
+        )
+        op.create_index('ix_test_case_daily_stats_id', 'test_case_daily_stats', ['id'])
+        op.create_index('ix_test_case_daily_stats_case_day', 'test_case_daily_stats', ['test_case_id', 'day'], unique=True)
+        op.create_index('ix_test_case_daily_stats_project_day', 'test_case_daily_stats', ['project_id', 'day'])
+
+
+def downgrade() -> None:
+    op.drop_table('test_case_daily_stats')
+    op.drop_table('project_daily_stats')
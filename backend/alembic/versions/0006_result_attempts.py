@@ -0,0 +1,42 @@
+"""add retry attempts to test_case_results
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = [
+    # 已有的结果都只执行了一次
+    ('attempts', sa.Integer(), dict(nullable=False, server_default='1')),
+    ('flaky', sa.Boolean(), dict(nullable=False, server_default=sa.false())),
+    ('attempt_history', sa.JSON(), dict(nullable=True)),
+]
+
+
+def _has_column(table: str, column: str) -> bool:
+    # 新库的表由应用启动时的create_all创建, 已包含该列
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    for name, type_, options in COLUMNS:
+        if not _has_column('test_case_results', name):
+            op.add_column('test_case_results', sa.Column(name, type_, **options))
+
+
+def downgrade() -> None:
+    for name, _, _ in reversed(COLUMNS):
+        op.drop_column('test_case_results', name)
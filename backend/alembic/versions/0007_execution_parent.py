@@ -0,0 +1,38 @@
+"""add parent_id to test_executions for reruns
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 新库的表由应用启动时的create_all创建, 已包含该列和索引
+    inspector = sa.inspect(op.get_bind())
+    if 'parent_id' not in {c["name"] for c in inspector.get_columns('test_executions')}:
+        with op.batch_alter_table('test_executions') as batch_op:
+            batch_op.add_column(sa.Column('parent_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                'fk_test_executions_parent', 'test_executions', ['parent_id'], ['id'], ondelete='SET NULL'
+            )
+    if 'ix_test_executions_parent' not in {index["name"] for index in inspector.get_indexes('test_executions')}:
+        op.create_index('ix_test_executions_parent', 'test_executions', ['parent_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_test_executions_parent', table_name='test_executions')
+    # 删除列时同时删除其外键(SQLite上通过重建表)
+    with op.batch_alter_table('test_executions') as batch_op:
+        batch_op.drop_column('parent_id')
@@ -0,0 +1,46 @@
+"""add change-based test selection
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 新库的表和列由应用启动时的create_all创建
+    inspector = sa.inspect(op.get_bind())
+    if 'selection' not in {c["name"] for c in inspector.get_columns('test_executions')}:
+        op.add_column('test_executions', sa.Column('selection', sa.JSON(), nullable=True))
+
+    if not inspector.has_table('test_impact_mappings'):
+        op.create_table(
+            'test_impact_mappings',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('path', sa.String(500), nullable=False),
+            sa.Column('test_case_id', sa.Integer(), sa.ForeignKey('test_cases.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('failures', sa.Integer(), nullable=False),
+            sa.Column('last_failed_at', sa.DateTime(timezone=True)),
+        )
+        op.create_index('ix_test_impact_mappings_id', 'test_impact_mappings', ['id'])
+        op.create_index(
+            'ix_test_impact_mappings_project_path_case', 'test_impact_mappings',
+            ['project_id', 'path', 'test_case_id'], unique=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('test_impact_mappings')
+    op.drop_column('test_executions', 'selection')
@@ -0,0 +1,48 @@
+"""add test result cache
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 新库的表和列由应用启动时的create_all创建
+    inspector = sa.inspect(op.get_bind())
+    if 'cached_from' not in {c["name"] for c in inspector.get_columns('test_case_results')}:
+        op.add_column('test_case_results', sa.Column('cached_from', sa.Integer(), nullable=True))
+
+    if not inspector.has_table('test_result_cache'):
+        op.create_table(
+            'test_result_cache',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('key', sa.String(64), nullable=False),
+            sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('environment_id', sa.Integer(), sa.ForeignKey('environments.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('test_case_id', sa.Integer(), sa.ForeignKey('test_cases.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('execution_id', sa.Integer(), sa.ForeignKey('test_executions.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        )
+        op.create_index('ix_test_result_cache_id', 'test_result_cache', ['id'])
+        op.create_index('ix_test_result_cache_key', 'test_result_cache', ['key'], unique=True)
+        op.create_index(
+            'ix_test_result_cache_project_environment', 'test_result_cache', ['project_id', 'environment_id']
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('test_result_cache')
+    op.drop_column('test_case_results', 'cached_from')
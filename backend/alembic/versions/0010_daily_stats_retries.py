@@ -0,0 +1,29 @@
+"""add retries to test_case_daily_stats
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 新库的表由应用启动时的create_all创建, 已包含该列; 已有的汇总没有记录重试
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns('test_case_daily_stats')}
+    if 'retries' not in columns:
+        op.add_column('test_case_daily_stats', sa.Column('retries', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('test_case_daily_stats', 'retries')
@@ -0,0 +1,29 @@
+"""add worker_id to test_executions
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 新库的表由应用启动时的create_all创建, 已包含该列
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns('test_executions')}
+    if 'worker_id' not in columns:
+        op.add_column('test_executions', sa.Column('worker_id', sa.String(100), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('test_executions', 'worker_id')
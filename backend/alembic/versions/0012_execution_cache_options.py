@@ -0,0 +1,32 @@
+"""add use_cache and environment_version to test_executions
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 新库的表由应用启动时的create_all创建, 已包含这些列
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns('test_executions')}
+    if 'use_cache' not in columns:
+        op.add_column('test_executions', sa.Column('use_cache', sa.Boolean(), nullable=True))
+    if 'environment_version' not in columns:
+        op.add_column('test_executions', sa.Column('environment_version', sa.String(200), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('test_executions', 'environment_version')
+    op.drop_column('test_executions', 'use_cache')
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select, func, cast, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from core.database import get_db
+from core.permissions import require_project_access, get_test_case_for_user
+from models.test_case import TestCase
+from models.project_daily_stats import ProjectDailyStats
+from models.test_case_daily_stats import TestCaseDailyStats
+from schemas.analytics import ProjectTrendPoint, TestCaseTrendPoint, CaseStats
+from services.analytics import project_point, case_point, summarize_case_stats
+
+router = APIRouter()
+
+# 趋势接口最多返回的天数
+MAX_TREND_DAYS = 365
+
+def window_days(days: int):
+    """最近days天(含今天)的日期列表, 与执行的start_time一样使用UTC"""
+    today = datetime.utcnow().date()
+    return [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+
+def fill_days(days, rows, make_point) -> list:
+    """按天补齐没有执行的日期"""
+    by_day = {row.day: row for row in rows}
+    return [make_point(day, by_day.get(day)) for day in days]
+
+@router.get("/projects/{project_id}/trends", response_model=List[ProjectTrendPoint])
+async def get_project_trends(
+    days: int = Query(30, ge=1, le=MAX_TREND_DAYS),
+    project_id: int = Depends(require_project_access),
+    db: AsyncSession = Depends(get_db)
+):
+    """项目的每日通过率和耗时趋势, 从每日汇总读取"""
+    day_list = window_days(days)
+    rows = (await db.execute(
+        select(ProjectDailyStats).where(
+            ProjectDailyStats.project_id == project_id,
+            ProjectDailyStats.day >= day_list[0]
+        )
+    )).scalars().all()
+    return fill_days(day_list, rows, project_point)
+
+@router.get("/projects/{project_id}/flaky-cases", response_model=List[CaseStats])
+async def get_flaky_cases(
+    days: int = Query(30, ge=1, le=MAX_TREND_DAYS),
+    min_runs: int = Query(5, ge=2),
+    limit: int = Query(20, ge=1, le=100),
+    project_id: int = Depends(require_project_access),
+    db: AsyncSession = Depends(get_db)
+):
+    """时间窗口内结果切换最频繁的用例"""
+    start_day = window_days(days)[0]
+    runs = func.sum(TestCaseDailyStats.runs)
+    # 与summarize_case_stats一致: 切换次数除以相邻执行(包括重试)的对数
+    flakiness = cast(func.sum(TestCaseDailyStats.flips), Float) / (runs + func.sum(TestCaseDailyStats.retries) - 1)
+    ranked = (await db.execute(
+        select(TestCaseDailyStats.test_case_id)
+        .where(TestCaseDailyStats.project_id == project_id, TestCaseDailyStats.day >= start_day)
+        .group_by(TestCaseDailyStats.test_case_id)
+        .having(runs >= min_runs, func.sum(TestCaseDailyStats.flips) > 0)
+        .order_by(flakiness.desc(), TestCaseDailyStats.test_case_id)
+        .limit(limit)
+    )).scalars().all()
+    if not ranked:
+        return []
+
+    rows = (await db.execute(
+        select(TestCaseDailyStats).where(
+            TestCaseDailyStats.test_case_id.in_(ranked),
+            TestCaseDailyStats.day >= start_day
+        )
+    )).scalars().all()
+    names = dict((await db.execute(select(TestCase.id, TestCase.name).where(TestCase.id.in_(ranked)))).all())
+
+    rows_by_case = {case_id: [] for case_id in ranked}
+    for row in rows:
+        rows_by_case[row.test_case_id].append(row)
+    return [
+        {"test_case_id": case_id, "test_case_name": names.get(case_id), **summarize_case_stats(case_rows)}
+        for case_id, case_rows in rows_by_case.items()
+    ]
+
+@router.get("/test-cases/{case_id}/trends", response_model=List[TestCaseTrendPoint])
+async def get_test_case_trends(
+    days: int = Query(30, ge=1, le=MAX_TREND_DAYS),
+    test_case: TestCase = Depends(get_test_case_for_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """单个用例的每日趋势"""
+    day_list = window_days(days)
+    rows = (await db.execute(
+        select(TestCaseDailyStats).where(
+            TestCaseDailyStats.test_case_id == test_case.id,
+            TestCaseDailyStats.day >= day_list[0]
+        )
+    )).scalars().all()
+    return fill_days(day_list, rows, case_point)
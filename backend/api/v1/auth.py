@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from core.database import get_db
@@ -17,17 +18,17 @@ from schemas.user import User as UserSchema
 router = APIRouter()
 
 @router.post("/register", response_model=UserSchema)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     """用户注册"""
     # 检查用户名是否已存在
-    if db.query(User).filter(User.username == user_data.username).first():
+    if await db.scalar(select(User).where(User.username == user_data.username)):
         raise HTTPException(
             status_code=400,
             detail="Username already registered"
         )
     
     # 检查邮箱是否已存在
-    if db.query(User).filter(User.email == user_data.email).first():
+    if await db.scalar(select(User).where(User.email == user_data.email)):
         raise HTTPException(
             status_code=400,
             detail="Email already registered"
@@ -41,15 +42,15 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         password_hash=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """用户登录"""
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await db.scalar(select(User).where(User.username == form_data.username))
     
     if not user or not verify_password(form_data.password, user.password_hash):
         raise HTTPException(
@@ -1,132 +1,506 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse, JSONResponse
+from sqlalchemy import select, func, literal, update
+from sqlalchemy.orm import load_only
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from core.config import settings
 
 from core.database import get_db
 from core.security import get_current_active_user
+from core.permissions import require_project_access, get_execution_for_user
 from models.user import User
-from models.project import Project
 from models.test_execution import TestExecution
 from models.environment import Environment
+from models.project import Project
+from models.test_case import TestCase
+from models.test_case_result import TestCaseResult
 from schemas.test_execution import (
     TestExecution as TestExecutionSchema, 
+    TestExecutionListItem,
     TestExecutionCreate, 
-    TestExecutionUpdate
+    TestExecutionRerun,
+    TestExecutionUpdate,
+    CombinedSummary
 )
+from schemas.test_case_result import TestCaseResult as TestCaseResultSchema
+from schemas.execution_plan import ExecutionPlan
 from services.test_service import TestExecutionService
+from services.job_queue import create_job_queue
+from services.events import format_sse, TERMINAL_STATUSES
+from services.artifact_store import artifact_store
+from services.execution_plan import case_durations_query, estimate_durations, build_plan
+from services.result_cache import invalidate_query
+from utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, keyset_condition, count_rows
 
 router = APIRouter()
 test_service = TestExecutionService()
+job_queue = create_job_queue()
+
+# SSE连接空闲时发送心跳注释的间隔(秒), 防止代理断开连接
+EVENT_KEEPALIVE_INTERVAL = 15
+
+def execution_filters(
+    status: Optional[str] = Query(None),
+    environment_id: Optional[int] = Query(None),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None)
+) -> list:
+    """执行历史的筛选条件"""
+    conditions = []
+    if status:
+        conditions.append(TestExecution.status == status)
+    if environment_id:
+        conditions.append(TestExecution.environment_id == environment_id)
+    if created_from:
+        conditions.append(TestExecution.created_at >= created_from)
+    if created_to:
+        conditions.append(TestExecution.created_at < created_to)
+    return conditions
 
-@router.get("/projects/{project_id}/executions", response_model=List[TestExecutionSchema])
+# 列表接口只加载的列, result/summary等JSON列只在详情接口返回
+LIST_COLUMNS = [getattr(TestExecution, name) for name in TestExecutionListItem.model_fields]
+
+@router.get("/projects/{project_id}/executions", response_model=List[TestExecutionListItem])
 async def get_executions(
-    project_id: int,
+    response: Response,
+    project_id: int = Depends(require_project_access),
+    filters: list = Depends(execution_filters),
+    cursor: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    limit: int = Query(100, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
 ):
-    """获取测试执行历史"""
-    # 检查项目权限
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    """获取测试执行历史
+    
+    按创建时间倒序返回; 响应头X-Next-Cursor为下一页的cursor参数, 没有下一页时不返回。
+    """
+    query = (
+        select(TestExecution)
+        .options(load_only(*LIST_COLUMNS, raiseload=True))
+        .where(TestExecution.project_id == project_id, *filters)
+    )
+    
+    if cursor:
+        # 排序键优先从最后一行读取, 与存储的时间精度一致; 该行已被删除时使用游标记录的创建时间
+        last = decode_cursor(cursor, ["id", "created_at"])
+        try:
+            created_at = datetime.fromisoformat(last["created_at"])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        last_created_at = func.coalesce(
+            select(TestExecution.created_at).where(TestExecution.id == last["id"]).scalar_subquery(),
+            created_at
+        )
+        query = query.where(keyset_condition(
+            [TestExecution.created_at, TestExecution.id],
+            [last_created_at, last["id"]],
+            descending=True
+        ))
+    elif skip:
+        query = query.offset(skip)
     
-    if current_user.role != "admin" and project.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    # 多取一行判断是否还有下一页
+    executions = (await db.scalars(
+        query.order_by(TestExecution.created_at.desc(), TestExecution.id.desc()).limit(limit + 1)
+    )).all()
     
-    executions = db.query(TestExecution).filter(
-        TestExecution.project_id == project_id
-    ).order_by(TestExecution.created_at.desc()).offset(skip).limit(limit).all()
+    if len(executions) > limit:
+        executions = executions[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({
+            "id": executions[-1].id,
+            "created_at": executions[-1].created_at.isoformat()
+        })
     
     return executions
 
+@router.get("/projects/{project_id}/executions/count")
+async def count_executions(
+    project_id: int = Depends(require_project_access),
+    filters: list = Depends(execution_filters),
+    db: AsyncSession = Depends(get_db)
+):
+    """统计测试执行数量(数量很大时返回估计值)"""
+    query = select(TestExecution.id).where(TestExecution.project_id == project_id, *filters)
+    count, estimated = await count_rows(db, query, settings.COUNT_ESTIMATE_THRESHOLD)
+    return {"count": count, "estimated": estimated}
+
 @router.get("/executions/{execution_id}", response_model=TestExecutionSchema)
 async def get_execution(
-    execution_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    execution: TestExecution = Depends(get_execution_for_user),
+    fields: Optional[str] = Query(None, description="逗号分隔的返回字段, 例如 id,status,summary")
 ):
     """获取测试执行详情"""
-    execution = db.query(TestExecution).filter(TestExecution.id == execution_id).first()
+    if not fields:
+        return execution
+    
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected - set(TestExecutionSchema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
     
-    if not execution:
-        raise HTTPException(status_code=404, detail="Execution not found")
+    data = TestExecutionSchema.model_validate(execution).model_dump(include=selected)
+    return JSONResponse(jsonable_encoder(data))
+
+@router.get("/executions/{execution_id}/results", response_model=List[TestCaseResultSchema])
+async def get_execution_results(
+    execution_id: int,
+    execution: TestExecution = Depends(get_execution_for_user),
+    status: str = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取执行中每个用例的结果(执行过程中可查看已完成的用例)"""
+    query = select(TestCaseResult).where(TestCaseResult.execution_id == execution_id)
     
-    # 检查项目权限
-    project = db.query(Project).filter(Project.id == execution.project_id).first()
-    if current_user.role != "admin" and project.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if status:
+        query = query.where(TestCaseResult.status == status)
     
-    return execution
+    results = await db.scalars(query.order_by(TestCaseResult.id).offset(skip).limit(limit))
+    return results.all()
+
+def execution_chain(execution_id: int):
+    """执行及其所有上级执行(重跑链)的CTE, depth为到该执行的距离"""
+    chain = (
+        select(TestExecution.id, TestExecution.parent_id, literal(0).label("depth"))
+        .where(TestExecution.id == execution_id)
+        .cte("execution_chain", recursive=True)
+    )
+    return chain.union_all(
+        select(TestExecution.id, TestExecution.parent_id, chain.c.depth + 1)
+        .join(chain, TestExecution.id == chain.c.parent_id)
+    )
+
+def combined_results_query(chain):
+    """重跑链合并后的用例结果: 每个用例取距离最近(最新重跑)的结果"""
+    ranked = (
+        select(
+            TestCaseResult.id,
+            func.row_number().over(
+                # 用例已删除的结果各自保留
+                partition_by=func.coalesce(TestCaseResult.test_case_id, -TestCaseResult.id),
+                order_by=chain.c.depth
+            ).label("rank")
+        )
+        .join(chain, TestCaseResult.execution_id == chain.c.id)
+        .subquery()
+    )
+    return select(TestCaseResult).join(ranked, TestCaseResult.id == ranked.c.id).where(ranked.c.rank == 1)
+
+@router.get("/executions/{execution_id}/combined-results", response_model=List[TestCaseResultSchema])
+async def get_combined_results(
+    execution_id: int,
+    execution: TestExecution = Depends(get_execution_for_user),
+    status: str = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """原执行及其重跑合并后的用例结果, execution_id为结果所属的执行"""
+    query = combined_results_query(execution_chain(execution_id))
+    
+    if status:
+        query = query.where(TestCaseResult.status == status)
+    
+    results = await db.scalars(query.order_by(TestCaseResult.id).offset(skip).limit(limit))
+    return results.all()
+
+@router.get("/executions/{execution_id}/combined-summary", response_model=CombinedSummary)
+async def get_combined_summary(
+    execution_id: int,
+    execution: TestExecution = Depends(get_execution_for_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """原执行及其重跑合并后的数量汇总"""
+    chain = execution_chain(execution_id)
+    execution_ids = (await db.scalars(select(chain.c.id).order_by(chain.c.depth.desc()))).all()
+    
+    combined = combined_results_query(chain).subquery()
+    rows = (await db.execute(
+        select(combined.c.status, func.count(), func.coalesce(func.sum(combined.c.duration), 0))
+        .group_by(combined.c.status)
+    )).all()
+    
+    summary = {"execution_ids": execution_ids, "total": 0, "passed": 0, "failed": 0, "error": 0, "skipped": 0, "duration": 0.0}
+    for status, count, duration in rows:
+        summary["total"] += count
+        summary[status if status in ("passed", "failed", "skipped") else "error"] += count
+        summary["duration"] += duration
+    return summary
+
+@router.get("/executions/{execution_id}/results/{result_id}/artifacts/{name}")
+async def download_result_artifact(
+    execution_id: int,
+    result_id: int,
+    name: str,
+    execution: TestExecution = Depends(get_execution_for_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """下载用例结果的产物(完整的输出、错误或详情), 流式返回解压后的内容"""
+    result = await db.scalar(
+        select(TestCaseResult).where(
+            TestCaseResult.id == result_id,
+            TestCaseResult.execution_id == execution_id
+        )
+    )
+    artifact = (result.artifacts or {}).get(name) if result else None
+    if not isinstance(artifact, dict) or "key" not in artifact:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    
+    try:
+        chunks = artifact_store.open(artifact["key"])
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Artifact content not found")
+    
+    extension = "json" if artifact.get("content_type") == "application/json" else "txt"
+    return StreamingResponse(
+        chunks,
+        media_type=artifact.get("content_type", "application/octet-stream"),
+        headers={
+            "Content-Length": str(artifact["size"]),
+            "Content-Disposition": f'attachment; filename="result-{result_id}-{name}.{extension}"'
+        }
+    )
+
+@router.get("/executions/{execution_id}/events")
+async def stream_execution_events(
+    execution_id: int,
+    execution: TestExecution = Depends(get_execution_for_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """以Server-Sent Events推送执行进度"""
+    # 先订阅再读取快照, 避免两者之间的事件丢失
+    event_bus = test_service.event_bus
+    queue = event_bus.subscribe(execution_id)
+    
+    await db.refresh(execution)
+    rows = await db.execute(
+        select(TestCaseResult.status, func.count(TestCaseResult.id))
+        .where(TestCaseResult.execution_id == execution_id)
+        .group_by(TestCaseResult.status)
+    )
+    counts = dict(rows.all())
+    # 推送期间不占用数据库连接
+    await db.close()
+    snapshot = {
+        "type": "snapshot",
+        "execution_id": execution_id,
+        "status": execution.status,
+        "counts": counts,
+        "summary": execution.summary
+    }
+    finished = execution.status in TERMINAL_STATUSES
+    
+    async def event_stream():
+        try:
+            yield format_sse(snapshot)
+            if finished:
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), EVENT_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+                if event.get("type") == "execution_finished":
+                    return
+        finally:
+            event_bus.unsubscribe(execution_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/projects/{project_id}/execution-plan", response_model=ExecutionPlan)
+async def preview_execution_plan(
+    environment_id: Optional[int] = Query(None),
+    test_case_ids: Optional[List[int]] = Query(None),
+    project_id: int = Depends(require_project_access),
+    db: AsyncSession = Depends(get_db)
+):
+    """按历史耗时预测一次执行的耗时和用例分片, 不创建执行"""
+    environment = None
+    if environment_id is not None:
+        environment = await db.scalar(
+            select(Environment).where(Environment.id == environment_id, Environment.project_id == project_id)
+        )
+        if not environment:
+            raise HTTPException(status_code=404, detail="Environment not found")
+    
+    query = select(TestCase).options(load_only(TestCase.id, TestCase.type)).where(TestCase.project_id == project_id)
+    if test_case_ids:
+        query = query.where(TestCase.id.in_(test_case_ids))
+    test_cases = (await db.scalars(query.order_by(TestCase.id))).all()
+    
+    history = dict((await db.execute(case_durations_query(project_id))).all())
+    return build_plan(test_cases, estimate_durations(test_cases, history), environment)
 
 @router.post("/projects/{project_id}/execute", response_model=TestExecutionSchema)
 async def execute_tests(
-    project_id: int,
     execution_data: TestExecutionCreate,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    project_id: int = Depends(require_project_access),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """执行测试"""
-    # 检查项目权限
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    if current_user.role != "admin" and project.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
     # 检查环境是否存在
-    environment = db.query(Environment).filter(
-        Environment.id == execution_data.environment_id,
-        Environment.project_id == project_id
-    ).first()
+    environment = await db.scalar(
+        select(Environment).where(
+            Environment.id == execution_data.environment_id,
+            Environment.project_id == project_id
+        )
+    )
     
     if not environment:
         raise HTTPException(status_code=404, detail="Environment not found")
     
+    changes = execution_data.changes
+    if changes and changes.changed_paths is None:
+        # 提交区间由worker从项目仓库计算变更文件
+        repository_url = await db.scalar(select(Project.repository_url).where(Project.id == project_id))
+        if not repository_url:
+            raise HTTPException(status_code=400, detail="Project has no repository_url, provide changed_paths")
+    
     # 创建执行记录
     db_execution = TestExecution(
         project_id=project_id,
         environment_id=execution_data.environment_id,
         status="pending",
+        use_cache=execution_data.use_cache,
+        environment_version=execution_data.environment_version,
         created_by=current_user.id
     )
     db.add(db_execution)
-    db.commit()
-    db.refresh(db_execution)
-    
-    # 后台执行测试
-    background_tasks.add_task(
-        test_service.run_tests,
-        db_execution.id,
-        execution_data.test_case_ids
-    )
+    await db.commit()
+    await db.refresh(db_execution)
+    
+    # 投递到执行队列, 由worker进程执行
+    await job_queue.enqueue({
+        "execution_id": db_execution.id,
+        "test_case_ids": execution_data.test_case_ids,
+        "changes": changes.model_dump() if changes else None,
+        "use_cache": execution_data.use_cache,
+        "environment_version": execution_data.environment_version
+    })
     
     return db_execution
 
-@router.post("/executions/{execution_id}/stop")
-async def stop_execution(
+@router.post("/executions/{execution_id}/rerun-failed", response_model=TestExecutionSchema)
+async def rerun_failed(
     execution_id: int,
-    db: Session = Depends(get_db),
+    rerun_data: Optional[TestExecutionRerun] = None,
+    execution: TestExecution = Depends(get_execution_for_user),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """停止测试执行"""
-    execution = db.query(TestExecution).filter(TestExecution.id == execution_id).first()
+    """只重跑执行中失败、出错或被取消的用例, 新执行的parent_id指向原执行"""
+    if execution.status in ("pending", "running"):
+        raise HTTPException(status_code=400, detail="Execution has not finished")
+    
+    environment_id = (rerun_data.environment_id if rerun_data else None) or execution.environment_id
+    if environment_id != execution.environment_id:
+        environment = await db.scalar(
+            select(Environment.id).where(
+                Environment.id == environment_id,
+                Environment.project_id == execution.project_id
+            )
+        )
+        if not environment:
+            raise HTTPException(status_code=404, detail="Environment not found")
+    
+    case_ids = set((await db.scalars(
+        select(TestCaseResult.test_case_id).where(
+            TestCaseResult.execution_id == execution_id,
+            TestCaseResult.status.in_(("failed", "error")),
+            TestCaseResult.test_case_id.is_not(None)
+        )
+    )).all())
+    # 停止的执行中没有运行的用例
+    case_ids.update((execution.result or {}).get("cancelled_case_ids") or [])
     
-    if not execution:
-        raise HTTPException(status_code=404, detail="Execution not found")
+    # 跳过已删除的用例
+    if case_ids:
+        case_ids = (await db.scalars(
+            select(TestCase.id)
+            .where(TestCase.project_id == execution.project_id, TestCase.id.in_(case_ids))
+            .order_by(TestCase.id)
+        )).all()
+    if not case_ids:
+        raise HTTPException(status_code=400, detail="No failed test cases to rerun")
+    
+    # 沿用原执行的缓存选项; 换了环境时原执行的环境版本不适用于新环境
+    use_cache = execution.use_cache is not False
+    environment_version = execution.environment_version if environment_id == execution.environment_id else None
+    db_execution = TestExecution(
+        project_id=execution.project_id,
+        environment_id=environment_id,
+        parent_id=execution_id,
+        status="pending",
+        use_cache=use_cache,
+        environment_version=environment_version,
+        created_by=current_user.id
+    )
+    db.add(db_execution)
+    await db.commit()
+    await db.refresh(db_execution)
     
-    # 检查项目权限
-    project = db.query(Project).filter(Project.id == execution.project_id).first()
-    if current_user.role != "admin" and project.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    await job_queue.enqueue({
+        "execution_id": db_execution.id,
+        "test_case_ids": list(case_ids),
+        "use_cache": use_cache,
+        "environment_version": environment_version
+    })
     
+    return db_execution
+
+@router.delete("/projects/{project_id}/result-cache")
+async def invalidate_result_cache(
+    environment_id: Optional[int] = Query(None),
+    test_case_id: Optional[int] = Query(None),
+    project_id: int = Depends(require_project_access),
+    db: AsyncSession = Depends(get_db)
+):
+    """清除项目的缓存结果, 可以只清除某个环境或用例(例如环境重新部署后)"""
+    result = await db.execute(invalidate_query(project_id, environment_id, test_case_id))
+    await db.commit()
+    return {"deleted": result.rowcount}
+
+@router.post("/executions/{execution_id}/stop")
+async def stop_execution(
+    execution_id: int,
+    execution: TestExecution = Depends(get_execution_for_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """停止测试执行"""
+    if execution.status == "pending":
+        # 尚未开始: 直接标记为已取消, worker取到任务后会跳过; 条件更新避免覆盖刚被worker认领的执行
+        await job_queue.request_cancel(execution_id)
+        cancelled = await db.execute(
+            update(TestExecution)
+            .where(TestExecution.id == execution_id, TestExecution.status == "pending")
+            .values(status="cancelled", result={"message": "Execution stopped by user"})
+        )
+        await db.commit()
+        if cancelled.rowcount:
+            test_service.event_bus.publish(execution_id, {
+                "type": "execution_finished",
+                "execution_id": execution_id,
+                "status": "cancelled"
+            })
+            return {"message": "Execution stopped successfully"}
+        await db.refresh(execution)
     if execution.status == "running":
+        # 执行中: 通知执行它的worker结束进程和浏览器, 由worker记录已完成/已取消的用例
+        await job_queue.request_cancel(execution_id)
         await test_service.stop_execution(execution_id)
-        execution.status = "failed"
-        execution.result = {"message": "Execution stopped by user"}
-        db.commit()
     
     return {"message": "Execution stopped successfully"}
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from core.database import get_db
@@ -14,27 +15,25 @@ router = APIRouter()
 async def get_projects(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=100),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取项目列表"""
-    if current_user.role == "admin":
-        projects = db.query(Project).offset(skip).limit(limit).all()
-    else:
-        projects = db.query(Project).filter(
-            Project.created_by == current_user.id
-        ).offset(skip).limit(limit).all()
+    query = select(Project)
+    if current_user.role != "admin":
+        query = query.where(Project.created_by == current_user.id)
     
-    return projects
+    projects = await db.scalars(query.offset(skip).limit(limit))
+    return projects.all()
 
 @router.get("/{project_id}", response_model=ProjectSchema)
 async def get_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取项目详情"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -48,7 +47,7 @@ async def get_project(
 @router.post("/", response_model=ProjectSchema)
 async def create_project(
     project: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """创建项目"""
@@ -57,8 +56,8 @@ async def create_project(
         created_by=current_user.id
     )
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    await db.commit()
+    await db.refresh(db_project)
     
     return db_project
 
@@ -66,11 +65,11 @@ async def create_project(
 async def update_project(
     project_id: int,
     project_update: ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """更新项目"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -84,24 +83,24 @@ async def update_project(
     for field, value in update_data.items():
         setattr(project, field, value)
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     return project
 
 @router.delete("/{project_id}")
 async def delete_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("admin"))
 ):
     """删除项目"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
     
     return {"message": "Project deleted successfully"}
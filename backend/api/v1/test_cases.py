@@ -1,134 +1,309 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
 
-from core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select, func, insert, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Callable, Awaitable
+
+from core.config import settings
+from core.database import get_db, AsyncSessionLocal
 from core.security import get_current_active_user
+from core.permissions import require_project_access, get_test_case_for_user
 from models.user import User
-from models.project import Project
 from models.test_case import TestCase
 from schemas.test_case import TestCase as TestCaseSchema, TestCaseCreate, TestCaseUpdate
+from utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, keyset_condition, count_rows
+from utils.bulk_io import (
+    FORMAT_MEDIA_TYPES,
+    detect_format,
+    spool_request,
+    iter_records,
+    format_jsonl,
+    format_csv
+)
 
 router = APIRouter()
 
+def test_case_filters(
+    test_type: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, max_length=200),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None)
+) -> list:
+    """测试用例列表的筛选条件, q按名称模糊搜索"""
+    conditions = []
+    if test_type:
+        conditions.append(TestCase.type == test_type)
+    if q:
+        conditions.append(func.lower(TestCase.name).contains(q.lower(), autoescape=True))
+    if created_from:
+        conditions.append(TestCase.created_at >= created_from)
+    if created_to:
+        conditions.append(TestCase.created_at < created_to)
+    return conditions
+
 @router.get("/projects/{project_id}/test-cases", response_model=List[TestCaseSchema])
 async def get_test_cases(
-    project_id: int,
+    response: Response,
+    project_id: int = Depends(require_project_access),
+    filters: list = Depends(test_case_filters),
+    cursor: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, le=100),
-    test_type: str = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    limit: int = Query(100, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
 ):
-    """获取测试用例列表"""
-    # 检查项目权限
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    """获取测试用例列表
     
-    if current_user.role != "admin" and project.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    按ID顺序返回; 响应头X-Next-Cursor为下一页的cursor参数, 没有下一页时不返回。
+    """
+    query = select(TestCase).where(TestCase.project_id == project_id, *filters)
     
-    query = db.query(TestCase).filter(TestCase.project_id == project_id)
+    if cursor:
+        last_id = decode_cursor(cursor, ["id"])["id"]
+        query = query.where(keyset_condition([TestCase.id], [last_id]))
+    elif skip:
+        query = query.offset(skip)
     
-    if test_type:
-        query = query.filter(TestCase.type == test_type)
+    # 多取一行判断是否还有下一页
+    test_cases = (await db.scalars(query.order_by(TestCase.id).limit(limit + 1))).all()
+    
+    if len(test_cases) > limit:
+        test_cases = test_cases[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": test_cases[-1].id})
     
-    test_cases = query.offset(skip).limit(limit).all()
     return test_cases
 
-@router.get("/test-cases/{case_id}", response_model=TestCaseSchema)
-async def get_test_case(
-    case_id: int,
-    db: Session = Depends(get_db),
+@router.get("/projects/{project_id}/test-cases/count")
+async def count_test_cases(
+    project_id: int = Depends(require_project_access),
+    filters: list = Depends(test_case_filters),
+    db: AsyncSession = Depends(get_db)
+):
+    """统计测试用例数量(数量很大时返回估计值)"""
+    query = select(TestCase.id).where(TestCase.project_id == project_id, *filters)
+    count, estimated = await count_rows(db, query, settings.COUNT_ESTIMATE_THRESHOLD)
+    return {"count": count, "estimated": estimated}
+
+def _record_id(record: Dict[str, Any]) -> int:
+    try:
+        return int(record["id"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("id is required and must be an integer")
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(loc) for loc in item['loc'])}: {item['msg']}" if item["loc"] else item["msg"]
+            for item in error.errors()
+        )
+    return str(error)
+
+async def _process_bulk(
+    request: Request,
+    fmt: Optional[str],
+    validate: Callable[[Dict[str, Any]], Dict[str, Any]],
+    write_batch: Callable[[List[Dict[str, Any]]], Awaitable[int]]
+) -> int:
+    """流式解析请求体并分批写入
+    
+    所有写入在同一个事务中, 有任何记录校验失败时不提交, 返回422和出错的行号。
+    """
+    fmt = detect_format(request, fmt)
+    spool = await spool_request(request)
+    errors = []
+    batch = []
+    count = 0
+    try:
+        try:
+            for line, record in iter_records(spool, fmt):
+                try:
+                    batch.append(validate(record))
+                except (ValidationError, ValueError) as e:
+                    errors.append({"line": line, "error": _error_message(e)})
+                    if len(errors) >= settings.BULK_MAX_ERRORS:
+                        break
+                    continue
+                if len(batch) >= settings.BULK_BATCH_SIZE and not errors:
+                    count += await write_batch(batch)
+                    batch = []
+        except ValueError as e:
+            errors.append({"line": None, "error": str(e)})
+    finally:
+        spool.close()
+    
+    if errors:
+        # 会话关闭时回滚已写入的批次
+        raise HTTPException(status_code=422, detail=errors)
+    
+    if batch:
+        count += await write_batch(batch)
+    return count
+
+@router.post("/projects/{project_id}/test-cases/bulk")
+async def bulk_create_test_cases(
+    request: Request,
+    format: Optional[str] = Query(None, description="jsonl或csv, 默认根据Content-Type判断"),
+    project_id: int = Depends(require_project_access),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """获取测试用例详情"""
-    test_case = db.query(TestCase).filter(TestCase.id == case_id).first()
+    """批量创建测试用例
     
-    if not test_case:
-        raise HTTPException(status_code=404, detail="Test case not found")
+    请求体为JSON Lines(每行一个用例)或CSV(列: name,type,description,test_data),
+    每条记录按TestCaseCreate校验。
+    """
+    def validate(record: Dict[str, Any]) -> Dict[str, Any]:
+        test_case = TestCaseCreate.model_validate({**record, "project_id": project_id})
+        return {**test_case.model_dump(), "created_by": current_user.id}
     
-    # 检查项目权限
-    project = db.query(Project).filter(Project.id == test_case.project_id).first()
-    if current_user.role != "admin" and project.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    async def write_batch(rows: List[Dict[str, Any]]) -> int:
+        await db.execute(insert(TestCase), rows)
+        return len(rows)
     
+    created = await _process_bulk(request, format, validate, write_batch)
+    await db.commit()
+    return {"created": created}
+
+@router.put("/projects/{project_id}/test-cases/bulk")
+async def bulk_update_test_cases(
+    request: Request,
+    format: Optional[str] = Query(None, description="jsonl或csv, 默认根据Content-Type判断"),
+    project_id: int = Depends(require_project_access),
+    db: AsyncSession = Depends(get_db)
+):
+    """批量更新测试用例, 每条记录包含id和至少一个要修改的字段(按TestCaseUpdate校验)"""
+    def validate(record: Dict[str, Any]) -> Dict[str, Any]:
+        case_id = _record_id(record)
+        changes = TestCaseUpdate.model_validate(record).model_dump(exclude_unset=True)
+        if not changes:
+            raise ValueError("no fields to update")
+        return {"id": case_id, **changes}
+    
+    async def write_batch(rows: List[Dict[str, Any]]) -> int:
+        ids = {row["id"] for row in rows}
+        found = set(await db.scalars(
+            select(TestCase.id).where(TestCase.project_id == project_id, TestCase.id.in_(ids))
+        ))
+        missing = sorted(ids - found)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Test cases not found in project: {missing[:20]}")
+        await db.execute(update(TestCase), rows)
+        return len(rows)
+    
+    updated = await _process_bulk(request, format, validate, write_batch)
+    await db.commit()
+    return {"updated": updated}
+
+@router.delete("/projects/{project_id}/test-cases/bulk")
+async def bulk_delete_test_cases(
+    request: Request,
+    format: Optional[str] = Query(None, description="jsonl或csv, 默认根据Content-Type判断"),
+    project_id: int = Depends(require_project_access),
+    db: AsyncSession = Depends(get_db)
+):
+    """批量删除测试用例, 每条记录包含id; 不属于该项目的id会被忽略"""
+    def validate(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {"id": _record_id(record)}
+    
+    async def write_batch(rows: List[Dict[str, Any]]) -> int:
+        result = await db.execute(
+            delete(TestCase).where(
+                TestCase.project_id == project_id,
+                TestCase.id.in_([row["id"] for row in rows])
+            )
+        )
+        return result.rowcount
+    
+    deleted = await _process_bulk(request, format, validate, write_batch)
+    await db.commit()
+    return {"deleted": deleted}
+
+@router.get("/projects/{project_id}/test-cases/export")
+async def export_test_cases(
+    format: str = Query("jsonl", pattern="^(jsonl|csv)$"),
+    project_id: int = Depends(require_project_access),
+    filters: list = Depends(test_case_filters)
+):
+    """流式导出测试用例(JSON Lines或CSV), 按ID分批读取, 不会一次加载全部用例"""
+    columns = [TestCase.id, TestCase.name, TestCase.type, TestCase.description, TestCase.test_data]
+    
+    async def stream_rows():
+        if format == "csv":
+            yield format_csv([], header=True)
+        last_id = 0
+        while True:
+            # 每批使用独立的会话, 两批之间不占用数据库连接
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(*columns)
+                    .where(TestCase.project_id == project_id, TestCase.id > last_id, *filters)
+                    .order_by(TestCase.id)
+                    .limit(settings.BULK_BATCH_SIZE)
+                )
+                rows = [dict(row._mapping) for row in result]
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            yield format_csv(rows) if format == "csv" else format_jsonl(rows)
+    
+    return StreamingResponse(
+        stream_rows(),
+        media_type=FORMAT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="test-cases-{project_id}.{format}"'}
+    )
+
+@router.get("/test-cases/{case_id}", response_model=TestCaseSchema)
+async def get_test_case(
+    test_case: TestCase = Depends(get_test_case_for_user)
+):
+    """获取测试用例详情"""
     return test_case
 
 @router.post("/projects/{project_id}/test-cases", response_model=TestCaseSchema)
 async def create_test_case(
-    project_id: int,
     test_case: TestCaseCreate,
-    db: Session = Depends(get_db),
+    project_id: int = Depends(require_project_access),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """创建测试用例"""
-    # 检查项目权限
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    if current_user.role != "admin" and project.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
     db_test_case = TestCase(
-        **test_case.dict(),
+        **test_case.dict(exclude={"project_id"}),
         project_id=project_id,
         created_by=current_user.id
     )
     db.add(db_test_case)
-    db.commit()
-    db.refresh(db_test_case)
+    await db.commit()
+    await db.refresh(db_test_case)
     
     return db_test_case
 
 @router.put("/test-cases/{case_id}", response_model=TestCaseSchema)
 async def update_test_case(
-    case_id: int,
     test_case_update: TestCaseUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    test_case: TestCase = Depends(get_test_case_for_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """更新测试用例"""
-    test_case = db.query(TestCase).filter(TestCase.id == case_id).first()
-    
-    if not test_case:
-        raise HTTPException(status_code=404, detail="Test case not found")
-    
-    # 检查项目权限
-    project = db.query(Project).filter(Project.id == test_case.project_id).first()
-    if current_user.role != "admin" and project.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
     # 更新字段
     update_data = test_case_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(test_case, field, value)
     
-    db.commit()
-    db.refresh(test_case)
+    await db.commit()
+    await db.refresh(test_case)
     
     return test_case
 
 @router.delete("/test-cases/{case_id}")
 async def delete_test_case(
-    case_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    test_case: TestCase = Depends(get_test_case_for_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """删除测试用例"""
-    test_case = db.query(TestCase).filter(TestCase.id == case_id).first()
-    
-    if not test_case:
-        raise HTTPException(status_code=404, detail="Test case not found")
-    
-    # 检查项目权限
-    project = db.query(Project).filter(Project.id == test_case.project_id).first()
-    if current_user.role != "admin" and project.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
-    db.delete(test_case)
-    db.commit()
+    await db.delete(test_case)
+    await db.commit()
     
     return {"message": "Test case deleted successfully"}
@@ -0,0 +1,156 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Hashable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+
+class TTLCache:
+    """进程内的LRU缓存, 每个条目在ttl秒后过期"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class UserCache:
+    """已认证用户的缓存
+
+    以令牌中的用户名为键缓存用户快照, 第一级是进程内LRU,
+    启用Redis时(USER_CACHE_REDIS, 默认跟随EXECUTION_QUEUE_BACKEND)第二级是多个API进程共享的Redis。
+    用户的角色、状态等字段变更提交后会失效本进程和Redis中的条目(见models.user),
+    其他进程的进程内条目在到期前仍可能被使用, 启用Redis时进程内条目只保留USER_CACHE_LOCAL_TTL秒。
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl: Optional[int] = None,
+        use_redis: Optional[bool] = None
+    ):
+        self.ttl = ttl or settings.USER_CACHE_TTL
+        if use_redis is None:
+            use_redis = settings.USER_CACHE_REDIS
+        if use_redis is None:
+            use_redis = settings.EXECUTION_QUEUE_BACKEND == "redis"
+        self.use_redis = use_redis
+        local_ttl = min(self.ttl, settings.USER_CACHE_LOCAL_TTL) if use_redis else self.ttl
+        self.local = TTLCache(maxsize or settings.USER_CACHE_SIZE, local_ttl)
+        self.prefix = f"{settings.EXECUTION_QUEUE_PREFIX}:user:"
+        self._redis = None
+        self._pending = set()
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self._redis
+
+    async def get(self, username: str, loader):
+        """获取缓存的用户快照, loader把Redis中的JSON还原为快照"""
+        user = self.local.get(username)
+        if user is not None or not self.use_redis:
+            return user
+        try:
+            data = await self.redis.get(self.prefix + username)
+        except Exception as e:
+            print(f"Error reading user cache: {e}")
+            return None
+        if data is None:
+            return None
+        user = loader(data)
+        self.local.set(username, user)
+        return user
+
+    async def set(self, username: str, user, data: Optional[str] = None):
+        """缓存用户快照, data为写入Redis的JSON"""
+        self.local.set(username, user)
+        if self.use_redis and data is not None:
+            try:
+                await self.redis.set(self.prefix + username, data, ex=self.ttl)
+            except Exception as e:
+                print(f"Error writing user cache: {e}")
+
+    def invalidate(self, username: str):
+        """删除用户的缓存条目(可在同步代码中调用)"""
+        self.local.delete(username)
+        if not self.use_redis:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        try:
+            if loop is not None:
+                task = loop.create_task(self.redis.delete(self.prefix + username))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+            else:
+                import redis
+
+                client = redis.from_url(settings.REDIS_URL)
+                try:
+                    client.delete(self.prefix + username)
+                finally:
+                    client.close()
+        except Exception as e:
+            print(f"Error invalidating user cache: {e}")
+
+
+user_cache = UserCache()
+
+# 项目ID到创建者ID的缓存, 用于项目权限检查
+project_owner_cache = TTLCache(settings.PROJECT_ACL_CACHE_SIZE, settings.PROJECT_ACL_CACHE_TTL)
+
+
+def invalidate_on_commit(session: Optional[Session], invalidate: Callable[[Hashable], None], key: Hashable):
+    """会话提交后失效缓存条目, 回滚则放弃
+
+    在flush事件中调用, 避免提交前其他请求把旧数据重新写入缓存。
+    """
+    if session is not None:
+        session.info.setdefault("cache_invalidations", set()).add((invalidate, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_cache_invalidations(session):
+    for invalidate, key in session.info.pop("cache_invalidations", ()):
+        invalidate(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_invalidations(session):
+    session.info.pop("cache_invalidations", None)
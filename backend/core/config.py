@@ -9,12 +9,27 @@ class Settings(BaseSettings):
     
     # 数据库配置
     DATABASE_URL: str
+    # API路由使用的异步驱动URL, 为空时由DATABASE_URL推导(asyncpg/aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = None
     DATABASE_POOL_SIZE: int = 10
     DATABASE_MAX_OVERFLOW: int = 20
+    # 计数接口: 查询计划估计的行数超过该值时返回估计值(仅PostgreSQL)
+    COUNT_ESTIMATE_THRESHOLD: int = 100000
+    # 批量导入每批写入的行数, 以及最多返回的校验错误数
+    BULK_BATCH_SIZE: int = 500
+    BULK_MAX_ERRORS: int = 100
     
     # Redis配置
     REDIS_URL: str = "redis://localhost:6379"
     
+    # 认证用户缓存配置
+    USER_CACHE_TTL: int = 30
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_REDIS: Optional[bool] = None  # 多个API进程共享的Redis缓存, 默认EXECUTION_QUEUE_BACKEND为redis时启用
+    USER_CACHE_LOCAL_TTL: int = 5  # 启用Redis缓存时进程内缓存的有效期(秒), 即其他进程中失效生效的最长延迟
+    PROJECT_ACL_CACHE_TTL: int = 30  # 只读请求使用的项目创建者缓存(进程内), 写请求总是重新查询
+    PROJECT_ACL_CACHE_SIZE: int = 4096
+    
     # JWT配置
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
@@ -22,7 +37,64 @@ class Settings(BaseSettings):
     
     # 测试配置
     TEST_TIMEOUT: int = 300  # 5分钟
-    MAX_CONCURRENT_TESTS: int = 5
+    REPORT_TIMEOUT: int = 300  # allure generate超时时间(秒)
+    REPORT_MAX_CONCURRENCY: int = 2  # 同时生成的Allure报告数量
+    PROCESS_OUTPUT_LIMIT: int = 1024 * 1024  # 外部进程stdout/stderr各自保留的最大字节数
+    MAX_CONCURRENT_TESTS: int = 5  # 每个worker进程的并发上限
+    MAX_CONCURRENT_TESTS_PER_ENV: Optional[int] = None  # 每个worker进程中单个环境(base_url)的并发上限
+    UI_CONTEXT_POOL_SIZE: int = 4  # 每个worker进程中所有执行同时活动的UI用例(浏览器上下文)数量
+    UI_BROWSER_COUNT: int = 1  # 浏览器池中常驻的浏览器进程数量
+    BROWSER_POOL_PREWARM: bool = True  # 应用启动时预热浏览器池
+    BROWSER_MAX_USES: int = 200  # 浏览器进程被回收前可租用的上下文次数
+    BROWSER_HEALTH_CHECK_INTERVAL: int = 30  # 浏览器池健康检查间隔(秒)
+    API_EXECUTION_ENGINE: str = "native"  # native: 进程内执行, pytest: 生成pytest模块在一次会话中执行
+    PYTEST_BATCH_SHARDS: int = 1  # pytest模式下生成的模块分片数
+    PYTEST_XDIST_WORKERS: int = 0  # pytest模式下的xdist worker进程数, 0表示不使用xdist
+    PYTEST_SESSION_TIMEOUT: int = 1800  # pytest模式下一次会话的超时上限(秒), 未运行完的用例记为超时错误
+    PYTEST_INTERRUPT_GRACE: float = 10  # 会话超时后先中断pytest, 等待其写出已完成用例报告的时间(秒)
+    DURATION_HISTORY_DAYS: int = 14  # 估算用例耗时使用的历史天数(每日汇总)
+    DEFAULT_CASE_DURATION: float = 1.0  # 没有历史耗时且同类型用例也没有历史时使用的预计耗时(秒)
+    
+    # API用例的HTTP连接池(每次执行一个), 可被Environment.config["http"]覆盖, 请求超时使用TEST_TIMEOUT
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20  # 保持空闲的keep-alive连接数
+    HTTP_KEEPALIVE_EXPIRY: float = 5.0  # 空闲连接保持时间(秒)
+    HTTP_CONNECT_TIMEOUT: float = 10.0  # 建立连接(含TLS握手)超时时间(秒)
+    HTTP2: bool = False  # native引擎使用HTTP/2
+    
+    # 失败重试, 可被Environment.config["retry"]和用例test_data["retry"]覆盖
+    RETRY_COUNT: int = 0  # 单个用例最多重试次数, 0表示不重试
+    RETRY_BACKOFF: float = 1.0  # 第一次重试前的等待秒数, 之后每次翻倍
+    RETRY_BACKOFF_MAX: float = 30.0
+    RETRY_ON: str = "error"  # 需要重试的结果状态, 逗号分隔: error(异常)、failed(断言失败)
+    RETRY_ERROR_TYPES: str = ""  # 只重试错误信息中包含这些异常类名的结果, 逗号分隔, 例如 ConnectError,ReadTimeout
+    
+    # 按变更选择用例
+    REPOSITORY_CACHE_DIR: str = "./repositories"  # 项目仓库镜像目录, 用于计算提交区间的变更文件
+    GIT_TIMEOUT: int = 120  # git clone/fetch/diff超时时间(秒)
+    IMPACT_RUN_ALL_PATTERNS: str = ""  # 变更匹配这些glob时执行全部用例, 逗号分隔, 例如 requirements.txt,docker/*
+    IMPACT_LEARN_MAX_PATHS: int = 50  # 变更文件超过该数量时不从失败中学习关联
+    
+    # API用例结果缓存, 可被Environment.config["result_cache"]覆盖
+    RESULT_CACHE_TTL: int = 0  # 通过结果的复用时间(秒), 0表示不缓存
+    
+    RESULT_BATCH_SIZE: int = 50  # 用例结果批量写入的条数
+    RESULT_FLUSH_INTERVAL: float = 2.0  # 用例结果写入的最长间隔(秒)
+    
+    # 产物存储配置
+    ARTIFACT_STORE_BACKEND: str = "local"  # 内置local, 或自定义ArtifactStore类的导入路径
+    ARTIFACT_STORE_DIR: str = "./artifacts"
+    ARTIFACT_INLINE_LIMIT: int = 4096  # 输出/错误/详情超过该长度时写入产物存储, 结果中只保留预览
+    
+    # 执行队列配置
+    EXECUTION_QUEUE_BACKEND: str = "redis"  # redis: 独立worker进程消费, memory: API进程内执行
+    EXECUTION_QUEUE_PREFIX: str = "autotester"
+    WORKER_CONCURRENCY: int = 2  # 单个worker同时执行的任务数
+    WORKER_HEARTBEAT_TTL: int = 30  # worker心跳过期时间(秒), 过期后其任务被重新入队
+    CLAIM_RETRY_DELAY: float = 5.0  # 执行仍由其他存活的worker持有时, 任务重新入队前等待的时间(秒)
+    CANCEL_POLL_INTERVAL: float = 1.0  # worker检查停止请求的间隔(秒)
+    CANCEL_REQUEST_TTL: int = 86400  # 停止请求的保留时间(秒)
+    EVENT_BUS_BACKEND: Optional[str] = None  # 执行进度事件: redis或memory, 默认与执行队列一致
     
     # Allure配置
     ALLURE_RESULTS_DIR: str = "./allure-results"
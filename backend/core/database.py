@@ -1,9 +1,27 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.orm import sessionmaker
+from typing import AsyncGenerator
 from .config import settings
 
+# 同步驱动到异步驱动的映射
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """把同步数据库URL转换为异步驱动的URL"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
 # 创建数据库引擎
 engine = create_engine(
     settings.DATABASE_URL,
@@ -12,16 +30,31 @@ engine = create_engine(
     echo=settings.DEBUG
 )
 
-# 创建会话
+# 创建会话(执行服务和worker使用)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步引擎(API路由使用, 查询不阻塞事件循环)
+async_database_url = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+async_pool_options = {}
+if not make_url(async_database_url).drivername.startswith("sqlite"):
+    # aiosqlite使用NullPool, 不支持连接池参数
+    async_pool_options = {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+    }
+async_engine = create_async_engine(async_database_url, echo=settings.DEBUG, **async_pool_options)
+
+# 提交后不过期对象, 响应序列化时不会触发隐式的延迟加载
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # 基础模型类
 Base = declarative_base()
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """获取数据库会话"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
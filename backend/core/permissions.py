@@ -0,0 +1,79 @@
+from fastapi import HTTPException, Depends, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import get_db
+from .security import get_current_active_user
+from .cache import project_owner_cache
+from models.project import Project
+from models.test_case import TestCase
+from models.test_execution import TestExecution
+
+
+def check_project_owner(owner_id: int, current_user):
+    """检查用户是否可以访问该创建者的项目"""
+    if current_user.role != "admin" and owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+# 只读请求才使用缓存的创建者ID
+CACHEABLE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+async def require_project_access(
+    project_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+) -> int:
+    """检查路径中project_id对应项目的权限
+
+    创建者ID缓存在进程内, 其他进程删除项目或修改创建者后本进程的条目在过期前不会失效,
+    因此写请求总是重新查询项目, 项目已删除时返回404而不是写入时的外键错误。
+    """
+    owner_id = project_owner_cache.get(project_id) if request.method in CACHEABLE_METHODS else None
+    if owner_id is None:
+        row = (await db.execute(select(Project.created_by).where(Project.id == project_id))).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        owner_id = row[0]
+        project_owner_cache.set(project_id, owner_id)
+
+    check_project_owner(owner_id, current_user)
+    return project_id
+
+
+async def _load_with_owner(db: AsyncSession, model, object_id: int, not_found: str):
+    """一次联表查询读取子资源及其项目创建者"""
+    row = (await db.execute(
+        select(model, Project.created_by)
+        .join(Project, model.project_id == Project.id)
+        .where(model.id == object_id)
+    )).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    obj, owner_id = row
+    project_owner_cache.set(obj.project_id, owner_id)
+    return obj, owner_id
+
+
+async def get_test_case_for_user(
+    case_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """读取路径中的测试用例并检查项目权限"""
+    test_case, owner_id = await _load_with_owner(db, TestCase, case_id, "Test case not found")
+    check_project_owner(owner_id, current_user)
+    return test_case
+
+
+async def get_execution_for_user(
+    execution_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """读取路径中的测试执行并检查项目权限"""
+    execution, owner_id = await _load_with_owner(db, TestExecution, execution_id, "Execution not found")
+    check_project_owner(owner_id, current_user)
+    return execution
@@ -4,9 +4,11 @@ from jose import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .config import settings
 from .database import get_db
+from .cache import user_cache
 
 # 密码加密上下文
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -53,10 +55,11 @@ def verify_token(token: str) -> Optional[str]:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """获取当前用户"""
+    """获取当前用户(返回缓存的用户快照)"""
     from models.user import User  # 延迟导入避免循环依赖
+    from schemas.user import User as UserSchema
     
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,10 +71,16 @@ async def get_current_user(
     if username is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
+    user = await user_cache.get(username, UserSchema.model_validate_json)
+    if user is not None:
+        return user
+    
+    db_user = await db.scalar(select(User).where(User.username == username))
+    if db_user is None:
         raise credentials_exception
     
+    user = UserSchema.model_validate(db_user)
+    await user_cache.set(username, user, user.model_dump_json())
     return user
 
 async def get_current_active_user(
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -5,8 +6,10 @@ from sqlalchemy import create_engine
 from pathlib import Path
 
 from core.config import settings
-from core.database import Base, engine
-from api.v1 import auth, projects, test_cases, executions
+from core.database import Base, engine, async_engine
+from api.v1 import auth, projects, test_cases, executions, analytics
+from api.v1.executions import test_service, job_queue
+from services.execution_worker import ExecutionWorker
 
 # 创建数据库表
 Base.metadata.create_all(bind=engine)
@@ -26,6 +29,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # 创建必要的目录
@@ -44,6 +48,25 @@ app.include_router(auth.router, prefix="/api/v1/auth", tags=["认证"])
 app.include_router(projects.router, prefix="/api/v1/projects", tags=["项目管理"])
 app.include_router(test_cases.router, prefix="/api/v1", tags=["测试用例"])
 app.include_router(executions.router, prefix="/api/v1", tags=["测试执行"])
+app.include_router(analytics.router, prefix="/api/v1", tags=["统计分析"])
+
+# 单机模式(内存队列)下在API进程内运行worker, 否则由独立的worker.py进程执行测试
+@app.on_event("startup")
+async def startup_event():
+    if settings.EXECUTION_QUEUE_BACKEND == "memory":
+        await test_service.startup()
+        worker = ExecutionWorker(job_queue, test_service)
+        app.state.worker_task = asyncio.create_task(worker.run())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    worker_task = getattr(app.state, "worker_task", None)
+    if worker_task:
+        worker_task.cancel()
+        await asyncio.gather(worker_task, return_exceptions=True)
+    await test_service.shutdown()
+    await job_queue.close()
+    await async_engine.dispose()
 
 # 健康检查
 @app.get("/health")
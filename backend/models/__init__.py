@@ -4,5 +4,13 @@ from .project import Project
 from .environment import Environment
 from .test_case import TestCase
 from .test_execution import TestExecution
+from .test_case_result import TestCaseResult
+from .project_daily_stats import ProjectDailyStats
+from .test_case_daily_stats import TestCaseDailyStats
+from .test_impact_mapping import TestImpactMapping
+from .test_result_cache import TestResultCache
 
-__all__ = ["User", "Project", "Environment", "TestCase", "TestExecution"]
+__all__ = [
+    "User", "Project", "Environment", "TestCase", "TestExecution", "TestCaseResult",
+    "ProjectDailyStats", "TestCaseDailyStats", "TestImpactMapping", "TestResultCache"
+]
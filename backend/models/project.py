@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, event, inspect
 from sqlalchemy.orm import relationship
 from core.database import Base
+from core.cache import project_owner_cache, invalidate_on_commit
 
 class Project(Base):
     __tablename__ = "projects"
@@ -18,3 +19,14 @@ class Project(Base):
     environments = relationship("Environment", back_populates="project", cascade="all, delete-orphan")
     test_cases = relationship("TestCase", back_populates="project", cascade="all, delete-orphan")
     test_executions = relationship("TestExecution", back_populates="project", cascade="all, delete-orphan")
+
+@event.listens_for(Project, "after_update")
+def _project_updated(mapper, connection, target):
+    """项目创建者变化后失效权限缓存"""
+    state = inspect(target)
+    if state.attrs.created_by.history.has_changes():
+        invalidate_on_commit(state.session, project_owner_cache.delete, target.id)
+
+@event.listens_for(Project, "after_delete")
+def _project_deleted(mapper, connection, target):
+    invalidate_on_commit(inspect(target).session, project_owner_cache.delete, target.id)
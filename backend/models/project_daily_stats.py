@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, JSON, Index
+from core.database import Base
+
+class ProjectDailyStats(Base):
+    """项目每日执行汇总, 执行结束时增量更新"""
+    __tablename__ = "project_daily_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    runs = Column(Integer, nullable=False, default=0)  # 执行次数
+    passed_runs = Column(Integer, nullable=False, default=0)
+    failed_runs = Column(Integer, nullable=False, default=0)
+    cancelled_runs = Column(Integer, nullable=False, default=0)
+    case_runs = Column(Integer, nullable=False, default=0)  # 用例执行次数
+    case_passes = Column(Integer, nullable=False, default=0)
+    case_failures = Column(Integer, nullable=False, default=0)
+    case_errors = Column(Integer, nullable=False, default=0)
+    total_duration = Column(Float, nullable=False, default=0)  # 用例耗时合计(秒)
+    duration_histogram = Column(JSON)  # 用例耗时直方图, 桶边界见services.analytics.DURATION_BUCKETS
+
+    __table_args__ = (
+        Index("ix_project_daily_stats_project_day", "project_id", "day", unique=True),
+    )
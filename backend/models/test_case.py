@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, JSON, Index
 from sqlalchemy.orm import relationship
 from core.database import Base
 
@@ -15,6 +15,12 @@ class TestCase(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # 项目用例列表按ID的游标分页
+        Index("ix_test_cases_project", "project_id", "id"),
+        Index("ix_test_cases_project_type", "project_id", "type", "id"),
+    )
+
     # 关系
     project = relationship("Project", back_populates="test_cases")
     creator = relationship("User", back_populates="test_cases")
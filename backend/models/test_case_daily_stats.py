@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, JSON, Index
+from core.database import Base
+
+class TestCaseDailyStats(Base):
+    """用例每日执行汇总, 执行结束时增量更新"""
+    __tablename__ = "test_case_daily_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    runs = Column(Integer, nullable=False, default=0)
+    passes = Column(Integer, nullable=False, default=0)
+    failures = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    flips = Column(Integer, nullable=False, default=0)  # 与上一次执行结果不同(通过/未通过切换)的次数, 包括重试之间
+    retries = Column(Integer, nullable=False, default=0)  # 重试次数(执行次数减去结果数)
+    last_status = Column(String(20))  # 当天最后一次执行的结果, 用于计算下一次的切换
+    total_duration = Column(Float, nullable=False, default=0)
+    duration_histogram = Column(JSON)
+
+    __table_args__ = (
+        Index("ix_test_case_daily_stats_case_day", "test_case_id", "day", unique=True),
+        Index("ix_test_case_daily_stats_project_day", "project_id", "day"),
+    )
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, func, JSON, Index
+from sqlalchemy.orm import relationship
+from core.database import Base
+
+class TestCaseResult(Base):
+    __tablename__ = "test_case_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    execution_id = Column(Integer, ForeignKey("test_executions.id", ondelete="CASCADE"), nullable=False)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="SET NULL"))
+    test_case_name = Column(String(200))
+    type = Column(String(20))  # 'api' or 'ui'
+    status = Column(String(20), nullable=False)  # passed, failed, error, skipped
+    duration = Column(Float, default=0)
+    error = Column(Text)
+    output = Column(Text)
+    details = Column(JSON)
+    artifacts = Column(JSON)  # 截图等产物路径
+    attempts = Column(Integer, nullable=False, default=1)  # 执行次数(含重试)
+    flaky = Column(Boolean, nullable=False, default=False)  # 重试后通过
+    attempt_history = Column(JSON)  # 重试时每次执行的状态、耗时和错误
+    cached_from = Column(Integer)  # 复用缓存结果时, 产生该结果的执行ID
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_test_case_results_execution_case", "execution_id", "test_case_id", unique=True),
+    )
+
+    # 关系
+    execution = relationship("TestExecution", back_populates="case_results")
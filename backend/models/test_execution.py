@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, func, JSON, Index
 from sqlalchemy.orm import relationship
 from core.database import Base
 
@@ -8,15 +8,37 @@ class TestExecution(Base):
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
     environment_id = Column(Integer, ForeignKey("environments.id"))
-    status = Column(String(20), default="pending")  # pending, running, passed, failed
+    parent_id = Column(Integer, ForeignKey("test_executions.id", ondelete="SET NULL"))  # 重跑失败用例时的原执行
+    status = Column(String(20), default="pending")  # pending, running, passed, failed, cancelled
     start_time = Column(DateTime(timezone=True))
     end_time = Column(DateTime(timezone=True))
-    result = Column(JSON)
+    result = Column(JSON)  # 执行结果汇总, 每个用例的结果见test_case_results
+    summary = Column(JSON)  # 由Allure结果计算的用例数量汇总
+    selection = Column(JSON)  # 按变更选择用例时的变更路径、选中的用例及原因
+    # 执行时的结果缓存选项, 重跑失败用例时沿用; 旧数据为空时按use_cache=True处理
+    use_cache = Column(Boolean, default=True)
+    environment_version = Column(String(200))
+    # 执行结束时写入的用例数量和总耗时, 列表接口只读取这些标量列
+    total_count = Column(Integer)
+    passed_count = Column(Integer)
+    failed_count = Column(Integer)
+    error_count = Column(Integer)
+    skipped_count = Column(Integer)
+    duration = Column(Float)
     report_path = Column(String(255))
+    worker_id = Column(String(100))  # 执行它的worker, 该worker失联(没有心跳)后执行可被重新认领
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # 项目执行历史按创建时间倒序的游标分页
+        Index("ix_test_executions_project_created", "project_id", "created_at", "id"),
+        Index("ix_test_executions_project_status", "project_id", "status"),
+        Index("ix_test_executions_parent", "parent_id"),
+    )
+
     # 关系
     project = relationship("Project", back_populates="test_executions")
     environment = relationship("Environment", back_populates="test_executions")
     creator = relationship("User", back_populates="test_executions")
+    case_results = relationship("TestCaseResult", back_populates="execution", cascade="all, delete-orphan", passive_deletes=True)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from core.database import Base
+
+class TestImpactMapping(Base):
+    """从历史失败中学到的变更路径与用例的关联
+
+    带变更范围的执行结束后, 对每个失败的用例记录本次变更的路径, 之后变更这些路径时选中该用例。
+    """
+    __tablename__ = "test_impact_mappings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    path = Column(String(500), nullable=False)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False)
+    failures = Column(Integer, nullable=False, default=0)  # 变更该路径后用例失败的次数
+    last_failed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index("ix_test_impact_mappings_project_path_case", "project_id", "path", "test_case_id", unique=True),
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from core.database import Base
+
+class TestResultCache(Base):
+    """可复用的通过结果
+
+    key为用例定义、环境配置和环境版本的哈希, 指向产生该结果的执行中的test_case_results行。
+    """
+    __tablename__ = "test_result_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(64), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    environment_id = Column(Integer, ForeignKey("environments.id", ondelete="CASCADE"), nullable=False)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False)
+    execution_id = Column(Integer, ForeignKey("test_executions.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_test_result_cache_key", "key", unique=True),
+        Index("ix_test_result_cache_project_environment", "project_id", "environment_id"),
+    )
@@ -1,6 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, func, event, inspect
 from sqlalchemy.orm import relationship
 from core.database import Base
+from core.cache import user_cache, invalidate_on_commit
+
+# 认证缓存的用户快照包含的字段, 变更后需要失效缓存
+CACHED_USER_FIELDS = ("username", "email", "role", "is_active")
 
 class User(Base):
     __tablename__ = "users"
@@ -18,3 +22,18 @@ class User(Base):
     projects = relationship("Project", back_populates="creator")
     test_cases = relationship("TestCase", back_populates="creator")
     test_executions = relationship("TestExecution", back_populates="creator")
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    """缓存字段发生变化的用户在提交后失效"""
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in CACHED_USER_FIELDS):
+        return
+    usernames = {target.username}
+    usernames.update(state.attrs.username.history.deleted or ())
+    for username in usernames:
+        invalidate_on_commit(state.session, user_cache.invalidate, username)
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    invalidate_on_commit(inspect(target).session, user_cache.invalidate, target.username)
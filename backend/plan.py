@@ -0,0 +1,59 @@
+"""
+执行计划预览
+
+按历史耗时预测一次执行的耗时和用例分片, 不创建执行:
+    python plan.py <project_id> [--environment ID] [--cases 1,2,3] [--json]
+"""
+import argparse
+import json
+
+from core.database import SessionLocal
+from models.test_case import TestCase
+from models.environment import Environment
+from services.execution_plan import case_durations_query, estimate_durations, build_plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预测一次测试执行的耗时")
+    parser.add_argument("project_id", type=int)
+    parser.add_argument("--environment", type=int, help="环境ID, 用于读取环境的并发上限")
+    parser.add_argument("--cases", help="逗号分隔的用例ID, 默认为项目的全部用例")
+    parser.add_argument("--json", action="store_true", help="输出JSON")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        environment = None
+        if args.environment is not None:
+            environment = db.query(Environment).filter(
+                Environment.id == args.environment,
+                Environment.project_id == args.project_id
+            ).first()
+            if environment is None:
+                parser.error("environment not found")
+
+        query = db.query(TestCase).filter(TestCase.project_id == args.project_id)
+        if args.cases:
+            query = query.filter(TestCase.id.in_([int(case_id) for case_id in args.cases.split(",")]))
+        test_cases = query.order_by(TestCase.id).all()
+
+        history = dict(db.execute(case_durations_query(args.project_id)).all())
+        plan = build_plan(test_cases, estimate_durations(test_cases, history), environment)
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps(plan, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{plan['case_count']} cases, predicted makespan {plan['makespan']:.1f}s "
+          f"(database order: {plan['unordered_makespan']:.1f}s)")
+    for phase in plan["phases"]:
+        print(f"  {phase['type']}: {phase['case_count']} cases on {phase['workers']} workers, "
+              f"makespan {phase['makespan']:.1f}s (database order: {phase['unordered_makespan']:.1f}s)")
+        for index, shard in enumerate(phase["shards"]):
+            print(f"    shard {index}: {len(shard['test_case_ids'])} cases, {shard['duration']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
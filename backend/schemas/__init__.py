@@ -3,7 +3,12 @@ from .user import User, UserCreate, UserUpdate
 from .project import Project, ProjectCreate, ProjectUpdate
 from .environment import Environment, EnvironmentCreate, EnvironmentUpdate
 from .test_case import TestCase, TestCaseCreate, TestCaseUpdate
-from .test_execution import TestExecution, TestExecutionCreate, TestExecutionUpdate
+from .test_execution import (
+    TestExecution, TestExecutionListItem, TestExecutionCreate, TestExecutionRerun, TestExecutionUpdate, CombinedSummary, ChangeSet
+)
+from .test_case_result import TestCaseResult
+from .analytics import ProjectTrendPoint, TestCaseTrendPoint, CaseStats
+from .execution_plan import ExecutionPlan
 
 __all__ = [
     "Token", "TokenData", "UserLogin", "UserRegister",
@@ -11,5 +16,8 @@ __all__ = [
     "Project", "ProjectCreate", "ProjectUpdate",
     "Environment", "EnvironmentCreate", "EnvironmentUpdate",
     "TestCase", "TestCaseCreate", "TestCaseUpdate",
-    "TestExecution", "TestExecutionCreate", "TestExecutionUpdate"
+    "TestExecution", "TestExecutionListItem", "TestExecutionCreate", "TestExecutionRerun", "TestExecutionUpdate", "CombinedSummary", "ChangeSet",
+    "TestCaseResult",
+    "ProjectTrendPoint", "TestCaseTrendPoint", "CaseStats",
+    "ExecutionPlan"
 ]
@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+class TrendPoint(BaseModel):
+    """一天的趋势数据, runs/passes为用例执行次数"""
+    day: date
+    runs: int = 0
+    passes: int = 0
+    failures: int = 0
+    errors: int = 0
+    pass_rate: Optional[float] = None
+    p50_duration: Optional[float] = None
+    p95_duration: Optional[float] = None
+
+class ProjectTrendPoint(TrendPoint):
+    executions: int = 0
+    passed_executions: int = 0
+    failed_executions: int = 0
+    cancelled_executions: int = 0
+
+class TestCaseTrendPoint(TrendPoint):
+    flips: int = 0
+
+class CaseStats(BaseModel):
+    """用例在时间窗口内的汇总和不稳定度"""
+    test_case_id: int
+    test_case_name: Optional[str] = None
+    runs: int
+    passes: int
+    failures: int
+    errors: int
+    flips: int
+    retries: int = 0
+    pass_rate: Optional[float] = None
+    flakiness: float
+    avg_duration: Optional[float] = None
+    p50_duration: Optional[float] = None
+    p95_duration: Optional[float] = None
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import List, Literal
+
+class PlanShard(BaseModel):
+    test_case_ids: List[int]
+    duration: float
+
+class PlanPhase(BaseModel):
+    """一类用例(API/UI)的调度预测"""
+    type: Literal["api", "ui"]
+    workers: int
+    case_count: int
+    total_duration: float
+    makespan: float  # 按耗时从长到短执行的预计耗时(秒)
+    unordered_makespan: float  # 按数据库顺序执行的预计耗时(秒)
+    shards: List[PlanShard]
+
+class ExecutionPlan(BaseModel):
+    case_count: int
+    makespan: float
+    unordered_makespan: float
+    phases: List[PlanPhase]
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+
+class TestCaseResult(BaseModel):
+    id: int
+    execution_id: int
+    test_case_id: Optional[int] = None
+    test_case_name: Optional[str] = None
+    type: Optional[str] = None
+    status: str
+    duration: Optional[float] = None
+    error: Optional[str] = None
+    output: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+    artifacts: Optional[Dict[str, Any]] = None
+    attempts: int = 1
+    flaky: bool = False
+    attempt_history: Optional[List[Dict[str, Any]]] = None
+    cached_from: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
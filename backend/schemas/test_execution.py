@@ -1,32 +1,91 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, Dict, Any, Literal, List
 from datetime import datetime
 
 class TestExecutionBase(BaseModel):
-    status: Literal["pending", "running", "passed", "failed"] = "pending"
+    status: Literal["pending", "running", "passed", "failed", "cancelled"] = "pending"
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     result: Optional[Dict[str, Any]] = None
+    summary: Optional[Dict[str, Any]] = None
+    selection: Optional[Dict[str, Any]] = None
     report_path: Optional[str] = None
 
+# git提交或引用, 不能以-开头(避免被当作git选项)
+GIT_REF_PATTERN = r"^[\w./@^~{}][\w./@^~{}-]*$"
+
+class ChangeSet(BaseModel):
+    """变更范围: 提交区间(需要项目配置repository_url)或直接给出变更的文件路径"""
+    base: Optional[str] = Field(None, max_length=200, pattern=GIT_REF_PATTERN)
+    head: Optional[str] = Field(None, max_length=200, pattern=GIT_REF_PATTERN)
+    changed_paths: Optional[List[str]] = None
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.changed_paths is None and not (self.base and self.head):
+            raise ValueError("Provide base and head, or changed_paths")
+        return self
+
 class TestExecutionCreate(BaseModel):
     project_id: int
     environment_id: int
     test_case_ids: Optional[List[int]] = None
+    changes: Optional[ChangeSet] = None  # 只执行受这些变更影响的用例
+    use_cache: bool = True  # 为False时不复用缓存结果, 全部重新执行
+    environment_version: Optional[str] = Field(None, max_length=200)  # 环境版本(例如部署的构建号), 变化后缓存失效
+
+class TestExecutionRerun(BaseModel):
+    """重跑失败用例, 默认使用原执行的环境"""
+    environment_id: Optional[int] = None
 
 class TestExecutionUpdate(BaseModel):
-    status: Optional[Literal["pending", "running", "passed", "failed"]] = None
+    status: Optional[Literal["pending", "running", "passed", "failed", "cancelled"]] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     result: Optional[Dict[str, Any]] = None
     report_path: Optional[str] = None
 
-class TestExecution(TestExecutionBase):
+class TestExecutionCounts(BaseModel):
+    total_count: Optional[int] = None
+    passed_count: Optional[int] = None
+    failed_count: Optional[int] = None
+    error_count: Optional[int] = None
+    skipped_count: Optional[int] = None
+    duration: Optional[float] = None
+
+class TestExecution(TestExecutionBase, TestExecutionCounts):
+    id: int
+    project_id: int
+    environment_id: int
+    parent_id: Optional[int] = None
+    created_by: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class TestExecutionListItem(TestExecutionCounts):
+    """执行历史列表项, 不包含result等JSON列"""
     id: int
     project_id: int
     environment_id: int
+    parent_id: Optional[int] = None
+    status: Literal["pending", "running", "passed", "failed", "cancelled"]
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    report_path: Optional[str] = None
     created_by: int
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+class CombinedSummary(BaseModel):
+    """原执行及其重跑合并后的汇总, 每个用例取最近一次重跑的结果"""
+    execution_ids: List[int]  # 从原执行到当前执行
+    total: int
+    passed: int
+    failed: int
+    error: int
+    skipped: int
+    duration: float
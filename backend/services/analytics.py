@@ -0,0 +1,244 @@
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Iterable
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.test_execution import TestExecution
+from models.project_daily_stats import ProjectDailyStats
+from models.test_case_daily_stats import TestCaseDailyStats
+
+# 耗时直方图的桶上界(秒), 最后一个桶保存超过最大上界的耗时
+DURATION_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]
+
+# 并发写入同一天的汇总行时唯一索引冲突的重试次数
+MAX_RECORD_ATTEMPTS = 3
+
+
+def empty_histogram() -> List[int]:
+    return [0] * (len(DURATION_BUCKETS) + 1)
+
+
+def add_to_histogram(histogram: Optional[List[int]], durations: Iterable[float]) -> List[int]:
+    """返回加入新耗时后的直方图(新列表, 保证JSON列能检测到变化)"""
+    histogram = list(histogram or empty_histogram())
+    for duration in durations:
+        index = next((i for i, bound in enumerate(DURATION_BUCKETS) if duration <= bound), len(DURATION_BUCKETS))
+        histogram[index] += 1
+    return histogram
+
+
+def merge_histograms(histograms: Iterable[Optional[List[int]]]) -> List[int]:
+    merged = empty_histogram()
+    for histogram in histograms:
+        for index, count in enumerate(histogram or ()):
+            merged[index] += count
+    return merged
+
+
+def histogram_percentile(histogram: List[int], q: float) -> Optional[float]:
+    """由直方图估算分位数, 在命中的桶内线性插值"""
+    total = sum(histogram)
+    if total == 0:
+        return None
+    target = q * total
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        if count and cumulative + count >= target:
+            lower = DURATION_BUCKETS[index - 1] if index > 0 else 0.0
+            if index >= len(DURATION_BUCKETS):
+                return float(DURATION_BUCKETS[-1])
+            upper = DURATION_BUCKETS[index]
+            return lower + (upper - lower) * (target - cumulative) / count
+        cumulative += count
+    return float(DURATION_BUCKETS[-1])
+
+
+def _case_outcome(status: Optional[str]) -> str:
+    """用于计算结果切换的归类: 通过或未通过"""
+    return "passed" if status == "passed" else "failed"
+
+
+def _attempt_statuses(result: Dict[str, Any]) -> List[Optional[str]]:
+    """用例每次执行的结果, 重试过的用例从attempt_history读取(最后一项为最终结果)"""
+    history = result.get("attempt_history") or []
+    return [attempt.get("status") for attempt in history] or [result.get("status")]
+
+
+def flakiness_ratio(flips: int, runs: int, retries: int) -> float:
+    """结果切换率: 相邻两次执行(包括重试)结果不同的比例, 稳定通过或稳定失败都为0"""
+    transitions = runs + retries - 1
+    return flips / transitions if transitions > 0 else 0.0
+
+
+def record_execution_stats(db: Session, execution: TestExecution, results: List[Dict[str, Any]]):
+    """把一次执行的结果累加到项目和用例的每日汇总
+
+    并发执行同时创建同一天的汇总行时会触发唯一索引冲突, 回滚后重试。
+    """
+    for attempt in range(MAX_RECORD_ATTEMPTS):
+        try:
+            _record(db, execution, results)
+            db.commit()
+            return
+        except IntegrityError:
+            db.rollback()
+            if attempt == MAX_RECORD_ATTEMPTS - 1:
+                raise
+
+
+def _record(db: Session, execution: TestExecution, results: List[Dict[str, Any]]):
+    day = (execution.start_time or execution.created_at or datetime.utcnow()).date()
+    durations = [result.get("duration") or 0 for result in results]
+
+    project_stats = (
+        db.query(ProjectDailyStats)
+        .filter(ProjectDailyStats.project_id == execution.project_id, ProjectDailyStats.day == day)
+        .with_for_update()
+        .first()
+    )
+    if project_stats is None:
+        project_stats = ProjectDailyStats(
+            project_id=execution.project_id, day=day, runs=0, passed_runs=0, failed_runs=0,
+            cancelled_runs=0, case_runs=0, case_passes=0, case_failures=0, case_errors=0, total_duration=0
+        )
+        db.add(project_stats)
+
+    project_stats.runs += 1
+    if execution.status == "passed":
+        project_stats.passed_runs += 1
+    elif execution.status == "cancelled":
+        project_stats.cancelled_runs += 1
+    else:
+        project_stats.failed_runs += 1
+    project_stats.case_runs += len(results)
+    project_stats.case_passes += sum(1 for result in results if result.get("status") == "passed")
+    project_stats.case_failures += sum(1 for result in results if result.get("status") == "failed")
+    project_stats.case_errors += sum(1 for result in results if result.get("status") not in ("passed", "failed", "skipped"))
+    project_stats.total_duration += sum(durations)
+    project_stats.duration_histogram = add_to_histogram(project_stats.duration_histogram, durations)
+
+    results_by_case = {result["test_case_id"]: result for result in results if result.get("test_case_id")}
+    if not results_by_case:
+        return
+
+    case_ids = list(results_by_case)
+    case_stats = {
+        stats.test_case_id: stats
+        for stats in db.query(TestCaseDailyStats)
+        .filter(TestCaseDailyStats.test_case_id.in_(case_ids), TestCaseDailyStats.day == day)
+        .with_for_update()
+    }
+
+    # 当天第一次执行的用例: 从之前最近一天的汇总取上一次结果
+    new_case_ids = [case_id for case_id in case_ids if case_id not in case_stats]
+    previous_status = {}
+    if new_case_ids:
+        latest_day = (
+            db.query(TestCaseDailyStats.test_case_id, func.max(TestCaseDailyStats.day).label("day"))
+            .filter(TestCaseDailyStats.test_case_id.in_(new_case_ids), TestCaseDailyStats.day < day)
+            .group_by(TestCaseDailyStats.test_case_id)
+            .subquery()
+        )
+        previous_status = dict(
+            db.query(TestCaseDailyStats.test_case_id, TestCaseDailyStats.last_status)
+            .join(latest_day, (TestCaseDailyStats.test_case_id == latest_day.c.test_case_id)
+                  & (TestCaseDailyStats.day == latest_day.c.day))
+            .all()
+        )
+
+    for case_id in new_case_ids:
+        stats = TestCaseDailyStats(
+            test_case_id=case_id, project_id=execution.project_id, day=day, runs=0, passes=0,
+            failures=0, errors=0, flips=0, retries=0, total_duration=0, last_status=previous_status.get(case_id)
+        )
+        db.add(stats)
+        case_stats[case_id] = stats
+
+    for case_id, result in results_by_case.items():
+        stats = case_stats[case_id]
+        status = result.get("status")
+        duration = result.get("duration") or 0
+        stats.runs += 1
+        if status == "passed":
+            stats.passes += 1
+        elif status == "failed":
+            stats.failures += 1
+        elif status != "skipped":
+            stats.errors += 1
+        # 重试后通过的用例在本次执行内也发生了切换
+        last_status = stats.last_status
+        attempts = _attempt_statuses(result)
+        for attempt_status in attempts:
+            if last_status and _case_outcome(last_status) != _case_outcome(attempt_status):
+                stats.flips += 1
+            last_status = attempt_status
+        stats.retries += len(attempts) - 1
+        stats.last_status = status
+        stats.total_duration += duration
+        stats.duration_histogram = add_to_histogram(stats.duration_histogram, [duration])
+
+
+def summarize_case_stats(rows: List[TestCaseDailyStats]) -> Dict[str, Any]:
+    """合并一个用例在时间窗口内的每日汇总"""
+    runs = sum(row.runs for row in rows)
+    passes = sum(row.passes for row in rows)
+    flips = sum(row.flips for row in rows)
+    retries = sum(row.retries or 0 for row in rows)
+    histogram = merge_histograms(row.duration_histogram for row in rows)
+    return {
+        "runs": runs,
+        "passes": passes,
+        "failures": sum(row.failures for row in rows),
+        "errors": sum(row.errors for row in rows),
+        "flips": flips,
+        "retries": retries,
+        "pass_rate": passes / runs if runs else None,
+        "flakiness": flakiness_ratio(flips, runs, retries),
+        "avg_duration": sum(row.total_duration for row in rows) / runs if runs else None,
+        "p50_duration": histogram_percentile(histogram, 0.5),
+        "p95_duration": histogram_percentile(histogram, 0.95),
+    }
+
+
+def _duration_point(runs: int, passes: int, histogram: Optional[List[int]]) -> Dict[str, Any]:
+    histogram = histogram or empty_histogram()
+    return {
+        "pass_rate": passes / runs if runs else None,
+        "p50_duration": histogram_percentile(histogram, 0.5),
+        "p95_duration": histogram_percentile(histogram, 0.95),
+    }
+
+
+def project_point(day: date, stats: Optional[ProjectDailyStats]) -> Dict[str, Any]:
+    """项目一天的趋势数据点, 没有执行的日期返回0"""
+    if stats is None:
+        return {"day": day, **_duration_point(0, 0, None)}
+    return {
+        "day": day,
+        "executions": stats.runs,
+        "passed_executions": stats.passed_runs,
+        "failed_executions": stats.failed_runs,
+        "cancelled_executions": stats.cancelled_runs,
+        "runs": stats.case_runs,
+        "passes": stats.case_passes,
+        "failures": stats.case_failures,
+        "errors": stats.case_errors,
+        **_duration_point(stats.case_runs, stats.case_passes, stats.duration_histogram),
+    }
+
+
+def case_point(day: date, stats: Optional[TestCaseDailyStats]) -> Dict[str, Any]:
+    """用例一天的趋势数据点, 没有执行的日期返回0"""
+    if stats is None:
+        return {"day": day, **_duration_point(0, 0, None)}
+    return {
+        "day": day,
+        "runs": stats.runs,
+        "passes": stats.passes,
+        "failures": stats.failures,
+        "errors": stats.errors,
+        "flips": stats.flips,
+        **_duration_point(stats.runs, stats.passes, stats.duration_histogram),
+    }
@@ -0,0 +1,159 @@
+import time
+from typing import List, Dict, Any, Optional
+
+import httpx
+
+from core.config import settings
+from models.test_case import TestCase
+from models.environment import Environment
+from utils.allure_utils import write_allure_result
+from services.http_client import HttpOptions
+
+# 支持的HTTP方法, 只有这些方法会携带json请求体
+SUPPORTED_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+BODY_METHODS = {"POST", "PUT", "PATCH"}
+
+# Allure状态映射
+ALLURE_STATUS = {"passed": "passed", "failed": "failed", "error": "broken"}
+
+
+class ApiTestRunner:
+    """进程内API测试执行引擎
+
+    直接解释测试用例的test_data(method/endpoint/headers/params/json/
+    expected_status/expected_response), 使用共享的异步HTTP连接池发送请求,
+    不再为每个用例生成pytest文件并启动子进程。
+    传入client时使用调用方的连接池(例如同一执行的重试之间复用), 否则按环境配置创建。
+    """
+
+    def __init__(
+        self,
+        environment: Optional[Environment],
+        feature: str = "API Test",
+        results_dir: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.base_url = (environment.base_url if environment else None) or "http://localhost:8000"
+        self.feature = feature
+        self.results_dir = results_dir or settings.ALLURE_RESULTS_DIR
+        self.http_options = HttpOptions.for_environment(environment)
+        self.client = client
+        self._owns_client = client is None
+
+    async def __aenter__(self) -> "ApiTestRunner":
+        if self._owns_client:
+            self.client = self.http_options.async_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._owns_client:
+            await self.client.aclose()
+            self.client = None
+
+    async def run_case(self, test_case: TestCase) -> Dict[str, Any]:
+        """执行单个API测试用例, 返回与pytest执行方式一致的结果字典"""
+        test_data = test_case.test_data or {}
+        steps: List[Dict[str, Any]] = []
+        log: List[str] = []
+        details: Dict[str, Any] = {}
+        status = "passed"
+        error = None
+
+        start = time.time()
+        try:
+            await self._run_steps(test_data, steps, log, details)
+        except AssertionError as e:
+            status = "failed"
+            error = str(e)
+        except Exception as e:
+            status = "error"
+            error = f"{type(e).__name__}: {e}"
+        stop = time.time()
+
+        if steps and error:
+            steps[-1]["status"] = ALLURE_STATUS[status]
+            steps[-1]["stop"] = stop
+        log.append(f"{status.upper()} ({stop - start:.3f}s)")
+
+        write_allure_result(
+            self.results_dir,
+            name=test_case.name,
+            full_name=f"api.test_{test_case.id}",
+            status=ALLURE_STATUS[status],
+            start=start,
+            stop=stop,
+            labels={"feature": self.feature, "story": test_case.name, "suite": "api"},
+            steps=steps,
+            message=error,
+            description=f"自动生成的API测试: {test_case.name}"
+        )
+
+        return {
+            "test_case_id": test_case.id,
+            "test_case_name": test_case.name,
+            "status": status,
+            "output": "\n".join(log),
+            "errors": error or "",
+            "duration": stop - start,
+            "details": details
+        }
+
+    async def _run_steps(
+        self,
+        test_data: Dict[str, Any],
+        steps: List[Dict[str, Any]],
+        log: List[str],
+        details: Dict[str, Any]
+    ):
+        """按步骤发送请求并校验响应, 步骤信息写入steps供Allure使用"""
+        method = test_data.get("method", "GET").upper()
+        endpoint = test_data.get("endpoint", "/")
+        headers = test_data.get("headers", {})
+        params = test_data.get("params", {})
+        json_data = test_data.get("json", None)
+
+        url = self.base_url + endpoint
+
+        # 执行HTTP请求
+        step = self._begin_step(steps, f"发送{method}请求到{url}")
+        if method not in SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        request_kwargs = {"headers": headers, "params": params}
+        if method in BODY_METHODS:
+            request_kwargs["json"] = json_data
+
+        response = await self.client.request(method, url, **request_kwargs)
+        step["stop"] = time.time()
+        log.append(f"{method} {url} -> {response.status_code} ({response.elapsed.total_seconds():.3f}s)")
+        details["request"] = {"method": method, "url": url}
+        details["response"] = {
+            "status_code": response.status_code,
+            "elapsed": response.elapsed.total_seconds(),
+            "http_version": response.http_version
+        }
+
+        # 验证响应
+        expected_status = test_data.get("expected_status", 200)
+        step = self._begin_step(steps, f"验证状态码为{expected_status}")
+        # 不使用assert语句, python -O会去掉断言
+        if response.status_code != expected_status:
+            raise AssertionError(f"Expected {expected_status}, got {response.status_code}")
+        step["stop"] = time.time()
+
+        # 验证响应内容
+        if "expected_response" in test_data:
+            step = self._begin_step(steps, "验证响应内容")
+            expected = test_data["expected_response"]
+            actual = response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text
+            if expected != actual:
+                raise AssertionError(f"Expected {expected}, got {actual}")
+            step["stop"] = time.time()
+
+    @staticmethod
+    def _begin_step(steps: List[Dict[str, Any]], name: str) -> Dict[str, Any]:
+        """记录一个Allure步骤的开始"""
+        now = time.time()
+        step = {"name": name, "status": "passed", "start": now, "stop": now}
+        steps.append(step)
+        return step
@@ -0,0 +1,103 @@
+import gzip
+import hashlib
+import importlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional
+
+from core.config import settings
+
+# 下载时每次读取的解压后字节数
+CHUNK_SIZE = 64 * 1024
+
+
+class ArtifactStore:
+    """执行产物存储
+
+    产物按内容的SHA-256寻址, 相同内容只写入一次。方法都是同步的,
+    在线程中调用(写入结果的线程、下载接口的线程池)。
+    """
+
+    def put(self, data: bytes) -> str:
+        """保存内容并返回键"""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def open(self, key: str) -> Iterator[bytes]:
+        """按块读取原始内容, 键不存在时抛出KeyError"""
+        raise NotImplementedError
+
+    @staticmethod
+    def make_key(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+
+class LocalArtifactStore(ArtifactStore):
+    """本地目录中的gzip压缩文件, 路径为 {root}/ab/cd/{sha256}.gz"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.ARTIFACT_STORE_DIR)
+
+    def _path(self, key: str) -> Path:
+        if len(key) != 64 or any(char not in "0123456789abcdef" for char in key):
+            raise KeyError(key)
+        return self.root / key[:2] / key[2:4] / f"{key}.gz"
+
+    def put(self, data: bytes) -> str:
+        key = self.make_key(data)
+        path = self._path(key)
+        if path.exists():
+            return key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再改名, 并发写入同一内容时不会读到半个文件
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as compressed:
+                compressed.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        return key
+
+    def exists(self, key: str) -> bool:
+        try:
+            return self._path(key).exists()
+        except KeyError:
+            return False
+
+    def open(self, key: str) -> Iterator[bytes]:
+        path = self._path(key)
+        if not path.exists():
+            raise KeyError(key)
+        return self._read(path)
+
+    @staticmethod
+    def _read(path: Path) -> Iterator[bytes]:
+        with gzip.open(path, "rb") as file:
+            while True:
+                chunk = file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+
+ARTIFACT_STORE_BACKENDS = {
+    "local": LocalArtifactStore,
+}
+
+
+def create_artifact_store() -> ArtifactStore:
+    """根据配置创建产物存储, ARTIFACT_STORE_BACKEND可以是内置名称或类的导入路径"""
+    backend = settings.ARTIFACT_STORE_BACKEND
+    store_class = ARTIFACT_STORE_BACKENDS.get(backend)
+    if store_class is None:
+        module_name, _, class_name = backend.rpartition(".")
+        store_class = getattr(importlib.import_module(module_name), class_name)
+    return store_class()
+
+
+artifact_store = create_artifact_store()
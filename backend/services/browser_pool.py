@@ -0,0 +1,148 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from core.config import settings
+from services.scheduler import ConcurrencyLimiter
+
+
+class _BrowserSlot:
+    """浏览器池中的一个浏览器进程"""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        self.retiring = False
+
+    @property
+    def healthy(self) -> bool:
+        return not self.retiring and self.browser.is_connected()
+
+
+class BrowserPool:
+    """进程级常驻浏览器池
+
+    应用启动时预热浏览器进程, 各次执行从池中租用独立的浏览器上下文;
+    浏览器在使用达到上限或崩溃后会被回收并重新启动。
+    所有执行共享limiter, 同时活动的上下文总数不超过context_limit。
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_uses: Optional[int] = None,
+        health_check_interval: Optional[int] = None,
+        context_limit: Optional[int] = None
+    ):
+        self.size = max(1, size or settings.UI_BROWSER_COUNT)
+        self.limiter = ConcurrencyLimiter(context_limit or settings.UI_CONTEXT_POOL_SIZE)
+        self.max_uses = max_uses or settings.BROWSER_MAX_USES
+        self.health_check_interval = health_check_interval or settings.BROWSER_HEALTH_CHECK_INTERVAL
+        self.slots: List[_BrowserSlot] = []
+        self._playwright_manager = None
+        self._playwright: Optional[Playwright] = None
+        self._lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self):
+        """启动playwright并预热浏览器"""
+        async with self._lock:
+            if self.started:
+                return
+            self._playwright_manager = async_playwright()
+            self._playwright = await self._playwright_manager.__aenter__()
+            for _ in range(self.size):
+                self.slots.append(_BrowserSlot(await self._launch()))
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self):
+        """关闭所有浏览器并停止playwright"""
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        async with self._lock:
+            for slot in self.slots:
+                await self._close_browser(slot.browser)
+            self.slots = []
+            if self._playwright_manager:
+                await self._playwright_manager.__aexit__(None, None, None)
+            self._playwright_manager = None
+            self._playwright = None
+
+    @asynccontextmanager
+    async def lease_context(self):
+        """租用一个独立的浏览器上下文, 退出时关闭上下文并归还浏览器"""
+        slot = await self._acquire_slot()
+        context: Optional[BrowserContext] = None
+        try:
+            context = await slot.browser.new_context()
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            slot.active -= 1
+            slot.uses += 1
+            if slot.uses >= self.max_uses:
+                slot.retiring = True
+            if slot.retiring and slot.active == 0:
+                await self._recycle(slot)
+
+    async def health_check(self):
+        """替换已断开的浏览器进程"""
+        for slot in list(self.slots):
+            if not slot.browser.is_connected() and slot.active == 0:
+                await self._recycle(slot)
+
+    async def _acquire_slot(self) -> _BrowserSlot:
+        """选择活动上下文最少的健康浏览器"""
+        if not self.started:
+            await self.start()
+        async with self._lock:
+            healthy = [slot for slot in self.slots if slot.healthy]
+            if not healthy:
+                # 所有浏览器都不可用时临时补充一个
+                slot = _BrowserSlot(await self._launch())
+                self.slots.append(slot)
+                healthy = [slot]
+            slot = min(healthy, key=lambda item: item.active)
+            slot.active += 1
+            return slot
+
+    async def _recycle(self, slot: _BrowserSlot):
+        """关闭旧浏览器, 池未满时启动新的浏览器替换"""
+        async with self._lock:
+            if slot not in self.slots:
+                return
+            self.slots.remove(slot)
+            await self._close_browser(slot.browser)
+            if self.started and len(self.slots) < self.size:
+                self.slots.append(_BrowserSlot(await self._launch()))
+
+    async def _launch(self) -> Browser:
+        return await self._playwright.chromium.launch(headless=True)
+
+    @staticmethod
+    async def _close_browser(browser: Browser):
+        try:
+            await browser.close()
+        except Exception:
+            pass
+
+    async def _health_loop(self):
+        """定期健康检查"""
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.health_check()
+            except Exception as e:
+                print(f"Browser pool health check failed: {e}")
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Dict, Any, Optional, Set, List
+
+from utils.process_utils import kill_process
+
+
+class ExecutionHandle:
+    """运行中执行的句柄
+
+    登记执行所属的任务、子进程和浏览器上下文, 停止时统一结束它们,
+    并记录已完成的用例结果, 用于区分完成和被取消的用例。
+    """
+
+    def __init__(self, execution_id: int, task: Optional[asyncio.Task] = None):
+        self.execution_id = execution_id
+        self.task = task
+        self.processes: Set[asyncio.subprocess.Process] = set()
+        self.contexts: Set[Any] = set()
+        self.case_ids: List[int] = []
+        self.completed: Dict[str, List[Dict[str, Any]]] = {"api": [], "ui": []}
+        self.completed_case_ids: Set[int] = set()
+        self.counters: Dict[str, int] = {"total": 0, "completed": 0, "passed": 0, "failed": 0, "error": 0}
+        self.retry_policies: Dict[int, Any] = {}
+        self.attempts: Dict[int, List[Dict[str, Any]]] = {}  # 用例已失败的执行记录
+        self.retry_case_ids: Set[int] = set()  # 等待重试的用例
+        self.cancelled = False
+
+    def add_process(self, process: asyncio.subprocess.Process):
+        self.processes.add(process)
+
+    def discard_process(self, process: asyncio.subprocess.Process):
+        self.processes.discard(process)
+
+    def add_context(self, context: Any):
+        self.contexts.add(context)
+
+    def discard_context(self, context: Any):
+        self.contexts.discard(context)
+
+    def record(self, test_type: str, result: Dict[str, Any]):
+        """记录一个已完成的用例结果并更新计数"""
+        self.completed[test_type].append(result)
+        self.completed_case_ids.add(result["test_case_id"])
+        self.counters["completed"] += 1
+        status = result.get("status")
+        self.counters[status if status in ("passed", "failed") else "error"] += 1
+
+    @property
+    def cancelled_case_ids(self) -> List[int]:
+        return [case_id for case_id in self.case_ids if case_id not in self.completed_case_ids]
+
+    async def cancel(self, timeout: float = 5):
+        """结束子进程并取消执行任务
+
+        先取消任务, 浏览器上下文由执行器退出时自己关闭, 进行中的用例不会记录为错误;
+        任务在timeout秒内没有结束时再直接关闭仍登记的上下文。
+        """
+        self.cancelled = True
+        for process in list(self.processes):
+            kill_process(process)
+        if self.task and not self.task.done():
+            self.task.cancel()
+            if self.task is not asyncio.current_task():
+                await asyncio.wait({self.task}, timeout=timeout)
+        for context in list(self.contexts):
+            try:
+                await context.close()
+            except Exception:
+                pass
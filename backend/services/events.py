@@ -0,0 +1,120 @@
+import asyncio
+import json
+from typing import Dict, Any, Set, Optional
+
+from core.config import settings
+
+# 每个订阅者最多缓存的事件数, 消费过慢时丢弃最旧的事件
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# 执行结束后不再产生事件的状态
+TERMINAL_STATUSES = ("passed", "failed", "cancelled")
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """把事件编码为一条Server-Sent Events消息"""
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+
+class EventBus:
+    """执行进度事件的进程内发布订阅"""
+
+    def __init__(self):
+        self.subscribers: Dict[int, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, execution_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.setdefault(execution_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, execution_id: int, queue: asyncio.Queue):
+        queues = self.subscribers.get(execution_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            self.subscribers.pop(execution_id, None)
+
+    def publish(self, execution_id: int, event: Dict[str, Any]):
+        """发布事件(不阻塞调用方)"""
+        self._deliver(execution_id, event)
+
+    def _deliver(self, execution_id: int, event: Dict[str, Any]):
+        for queue in list(self.subscribers.get(execution_id, ())):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def close(self):
+        pass
+
+
+class RedisEventBus(EventBus):
+    """通过Redis频道把worker进程的事件扇出到所有API进程"""
+
+    def __init__(self, url: Optional[str] = None, prefix: Optional[str] = None):
+        super().__init__()
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url or settings.REDIS_URL, decode_responses=True)
+        self.prefix = prefix or settings.EXECUTION_QUEUE_PREFIX
+        self._outgoing: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def _channel(self, execution_id: int) -> str:
+        return f"{self.prefix}:events:{execution_id}"
+
+    def subscribe(self, execution_id: int) -> asyncio.Queue:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+        return super().subscribe(execution_id)
+
+    def publish(self, execution_id: int, event: Dict[str, Any]):
+        if self._sender is None:
+            self._outgoing = asyncio.Queue()
+            self._sender = asyncio.create_task(self._send())
+        self._outgoing.put_nowait((execution_id, event))
+
+    async def _send(self):
+        while True:
+            execution_id, event = await self._outgoing.get()
+            try:
+                await self.redis.publish(self._channel(execution_id), json.dumps(event, default=str))
+            except Exception as e:
+                print(f"Error publishing execution event: {e}")
+
+    async def _listen(self):
+        """订阅所有执行的事件频道, 连接断开后自动重连"""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.psubscribe(self._channel("*"))
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    execution_id = int(message["channel"].rsplit(":", 1)[-1])
+                    self._deliver(execution_id, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Execution event listener failed: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+    async def close(self):
+        for task in (self._sender, self._listener):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        await self.redis.close()
+
+
+def create_event_bus() -> EventBus:
+    """根据配置创建事件总线"""
+    backend = settings.EVENT_BUS_BACKEND or settings.EXECUTION_QUEUE_BACKEND
+    if backend == "redis":
+        return RedisEventBus()
+    return EventBus()
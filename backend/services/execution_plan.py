@@ -0,0 +1,94 @@
+import statistics
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy import select, func
+
+from core.config import settings
+from models.test_case import TestCase
+from models.environment import Environment
+from models.test_case_daily_stats import TestCaseDailyStats
+from services.scheduler import longest_first, partition_lpt, simulate_makespan, environment_limit
+
+
+def case_durations_query(project_id: int, days: Optional[int] = None):
+    """项目内用例最近几天的平均耗时, 从每日汇总读取, 同步和异步会话都可以执行"""
+    since = datetime.utcnow().date() - timedelta(days=days or settings.DURATION_HISTORY_DAYS)
+    return (
+        select(
+            TestCaseDailyStats.test_case_id,
+            func.sum(TestCaseDailyStats.total_duration) / func.sum(TestCaseDailyStats.runs)
+        )
+        .where(TestCaseDailyStats.project_id == project_id, TestCaseDailyStats.day >= since)
+        .group_by(TestCaseDailyStats.test_case_id)
+        .having(func.sum(TestCaseDailyStats.runs) > 0)
+    )
+
+
+def estimate_durations(test_cases: List[TestCase], history: Dict[int, float]) -> Dict[int, float]:
+    """每个用例的预计耗时
+
+    没有历史记录的用例使用同类型用例耗时的中位数, 同类型也没有历史时使用DEFAULT_CASE_DURATION。
+    """
+    known_by_type: Dict[str, List[float]] = {}
+    for test_case in test_cases:
+        if test_case.id in history:
+            known_by_type.setdefault(test_case.type, []).append(history[test_case.id])
+    fallback = {
+        test_type: statistics.median(durations)
+        for test_type, durations in known_by_type.items()
+    }
+    return {
+        test_case.id: history.get(test_case.id, fallback.get(test_case.type, settings.DEFAULT_CASE_DURATION))
+        for test_case in test_cases
+    }
+
+
+def api_workers(environment: Optional[Environment]) -> int:
+    """API用例的并行度, 与执行时的并发限制一致"""
+    if settings.API_EXECUTION_ENGINE == "pytest":
+        return max(1, settings.PYTEST_XDIST_WORKERS)
+    limits = [settings.MAX_CONCURRENT_TESTS, environment_limit(environment) or settings.MAX_CONCURRENT_TESTS_PER_ENV]
+    return max(1, min(limit for limit in limits if limit))
+
+
+def ui_workers() -> int:
+    """UI用例的并行度(浏览器上下文数量)"""
+    return max(1, settings.UI_CONTEXT_POOL_SIZE)
+
+
+def build_plan(test_cases: List[TestCase], durations: Dict[int, float], environment: Optional[Environment]) -> Dict[str, Any]:
+    """预测一次执行的耗时
+
+    API用例和UI用例依次执行, 每一类按耗时从长到短在各自的并行槽位上调度。
+    同时返回按数据库顺序执行时的预计耗时作为对比。预测假设该执行独占全局并发槽位。
+    """
+    phases = []
+    for test_type, workers in (("api", api_workers(environment)), ("ui", ui_workers())):
+        cases = [test_case for test_case in test_cases if test_case.type == test_type]
+        if not cases:
+            continue
+        duration_of = lambda test_case: durations[test_case.id]
+        ordered = longest_first(cases, duration_of)
+        shards = partition_lpt(cases, duration_of, workers)
+        phases.append({
+            "type": test_type,
+            "workers": workers,
+            "case_count": len(cases),
+            "total_duration": sum(duration_of(test_case) for test_case in cases),
+            "makespan": simulate_makespan([duration_of(test_case) for test_case in ordered], workers),
+            "unordered_makespan": simulate_makespan([duration_of(test_case) for test_case in cases], workers),
+            "shards": [
+                {
+                    "test_case_ids": [test_case.id for test_case in shard],
+                    "duration": sum(duration_of(test_case) for test_case in shard)
+                }
+                for shard in shards
+            ]
+        })
+    return {
+        "case_count": len(test_cases),
+        "makespan": sum(phase["makespan"] for phase in phases),
+        "unordered_makespan": sum(phase["unordered_makespan"] for phase in phases),
+        "phases": phases
+    }
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import socket
+import uuid
+from typing import Set, Optional
+
+from core.config import settings
+from services.job_queue import JobQueue, Job
+from services.test_service import TestExecutionService
+
+
+class ExecutionWorker:
+    """测试执行worker
+
+    从任务队列消费执行任务并调用TestExecutionService执行, 执行结束后ack;
+    定期发送心跳并回收其他已失联worker的任务。
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        service: TestExecutionService,
+        worker_id: Optional[str] = None,
+        concurrency: Optional[int] = None
+    ):
+        self.queue = queue
+        self.service = service
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = max(1, concurrency or settings.WORKER_CONCURRENCY)
+        self.tasks: Set[asyncio.Task] = set()
+        self._stopping = False
+
+    async def run(self):
+        """持续消费任务直到stop()被调用"""
+        await self.queue.heartbeat(self.worker_id)
+        heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        cancel_task = asyncio.create_task(self._cancel_watch_loop())
+        slots = asyncio.Semaphore(self.concurrency)
+        try:
+            while not self._stopping:
+                await slots.acquire()
+                try:
+                    job = await self.queue.dequeue(self.worker_id, timeout=5)
+                except Exception as e:
+                    print(f"Error dequeuing job: {e}")
+                    job = None
+                    await asyncio.sleep(1)
+                if job is None:
+                    slots.release()
+                    continue
+                task = asyncio.create_task(self._process(job))
+                self.tasks.add(task)
+                task.add_done_callback(lambda t: (self.tasks.discard(t), slots.release()))
+        finally:
+            heartbeat_task.cancel()
+            cancel_task.cancel()
+            for task in list(self.tasks):
+                task.cancel()
+            if self.tasks:
+                await asyncio.gather(*self.tasks, return_exceptions=True)
+            # 未完成的任务放回队列, 由其他worker继续执行
+            await self.queue.release(self.worker_id)
+
+    def stop(self):
+        self._stopping = True
+
+    async def _process(self, job: Job):
+        """执行任务, 正常结束(包括用例失败和用户停止)后ack
+
+        执行仍由另一个存活的worker持有时(例如重复的任务, 或该worker正在退出)不ack,
+        等待CLAIM_RETRY_DELAY后重新入队, 直到执行结束或该worker失联后被认领。
+        """
+        if not await self.queue.cancel_requested([job.execution_id]):
+            finished = await self.service.run_tests(
+                job.execution_id,
+                job.payload.get("test_case_ids"),
+                changes=job.payload.get("changes"),
+                use_cache=job.payload.get("use_cache", True),
+                environment_version=job.payload.get("environment_version"),
+                worker_id=self.worker_id,
+                owner_alive=self.queue.is_alive
+            )
+            if not finished:
+                await self.queue.requeue(self.worker_id, job, settings.CLAIM_RETRY_DELAY)
+                return
+        await self.queue.clear_cancel(job.execution_id)
+        await self.queue.ack(self.worker_id, job)
+
+    async def _cancel_watch_loop(self):
+        """轮询本worker上运行中执行的停止请求"""
+        while True:
+            await asyncio.sleep(settings.CANCEL_POLL_INTERVAL)
+            try:
+                running = list(self.service.running_executions.keys())
+                for execution_id in await self.queue.cancel_requested(running):
+                    await self.service.stop_execution(execution_id)
+            except Exception as e:
+                print(f"Cancel watch failed: {e}")
+
+    async def _heartbeat_loop(self):
+        interval = max(1, settings.WORKER_HEARTBEAT_TTL // 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.queue.heartbeat(self.worker_id)
+                requeued = await self.queue.requeue_dead_workers()
+                if requeued:
+                    print(f"Requeued {requeued} jobs from dead workers")
+            except Exception as e:
+                print(f"Worker heartbeat failed: {e}")
@@ -0,0 +1,66 @@
+from typing import Dict, Any, Optional
+
+import httpx
+
+from core.config import settings
+from models.environment import Environment
+
+
+class HttpOptions:
+    """API用例的HTTP连接池配置
+
+    max_connections: 最大连接数; max_keepalive_connections: 保持空闲的keep-alive连接数;
+    keepalive_expiry: 空闲连接保持秒数; timeout: 请求超时秒数; connect_timeout: 建立连接超时秒数;
+    http2: 使用HTTP/2(只用于native引擎, requests不支持HTTP/2)。
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        timeout: float = 300,
+        connect_timeout: Optional[float] = None,
+        http2: bool = False
+    ):
+        self.max_connections = max(1, int(max_connections))
+        self.max_keepalive_connections = max(0, int(max_keepalive_connections))
+        self.keepalive_expiry = max(0.0, float(keepalive_expiry))
+        self.timeout = float(timeout)
+        self.connect_timeout = float(connect_timeout) if connect_timeout else self.timeout
+        self.http2 = bool(http2)
+
+    @classmethod
+    def for_environment(cls, environment: Optional[Environment] = None) -> "HttpOptions":
+        """合并全局配置和Environment.config["http"], 后者优先"""
+        options = {
+            "max_connections": settings.HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.HTTP_MAX_KEEPALIVE,
+            "keepalive_expiry": settings.HTTP_KEEPALIVE_EXPIRY,
+            "timeout": settings.TEST_TIMEOUT,
+            "connect_timeout": settings.HTTP_CONNECT_TIMEOUT,
+            "http2": settings.HTTP2,
+        }
+        http = (getattr(environment, "config", None) or {}).get("http")
+        if isinstance(http, dict):
+            options.update({key: value for key, value in http.items() if key in options})
+        return cls(**options)
+
+    def async_client(self) -> httpx.AsyncClient:
+        """创建连接池, 同一执行的所有API用例共享"""
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            http2=self.http2
+        )
+
+    def requests_options(self) -> Dict[str, Any]:
+        """生成的pytest模块中requests.Session使用的配置"""
+        return {
+            "pool_maxsize": self.max_connections,
+            "timeout": [self.connect_timeout, self.timeout]
+        }
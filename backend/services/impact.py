@@ -0,0 +1,222 @@
+import asyncio
+import fnmatch
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import List, Dict, Any, Optional, Set, Iterable
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.test_case import TestCase
+from models.test_impact_mapping import TestImpactMapping
+from utils.process_utils import run_process
+
+# 端点中不表示资源的路径段(api前缀、版本号)
+GENERIC_SEGMENTS = {"api", "rest", "graphql"}
+VERSION_SEGMENT = re.compile(r"v\d+")
+
+# 每个仓库镜像同一时间只进行一次fetch
+_fetch_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _normalize(name: str) -> str:
+    return name.lower().replace("-", "_")
+
+
+def path_keywords(path: str) -> Set[str]:
+    """变更路径的目录名和文件名(不含扩展名), 例如 backend/api/v1/test_cases.py -> backend, api, v1, test_cases"""
+    parts = PurePosixPath(path).parts
+    if not parts:
+        return set()
+    return {_normalize(part) for part in parts[:-1]} | {_normalize(PurePosixPath(parts[-1]).stem)}
+
+
+def endpoint_resources(endpoint: Optional[str]) -> Set[str]:
+    """端点中的资源名, 例如 /api/v1/projects/1/test-cases -> projects, test_cases"""
+    if not endpoint:
+        return set()
+    path = re.sub(r"^[a-z]+://[^/]+", "", endpoint).split("?")[0]
+    resources = set()
+    for segment in path.strip("/").split("/"):
+        segment = _normalize(segment)
+        if not segment or segment in GENERIC_SEGMENTS or VERSION_SEGMENT.fullmatch(segment):
+            continue
+        if segment.isdigit() or segment.startswith("{") or segment.startswith(":"):
+            continue
+        resources.add(segment)
+    return resources
+
+
+def impact_reasons(test_case: TestCase, changed_paths: List[str], learned_paths: Iterable[str] = ()) -> List[str]:
+    """变更路径影响该用例的原因, 为空表示不受影响
+
+    依次检查test_data中的source_paths(glob)、tags、接口端点的资源名, 以及从历史失败中学到的路径。
+    """
+    test_data = test_case.test_data or {}
+    reasons = []
+
+    patterns = test_data.get("source_paths") or []
+    for path in changed_paths:
+        pattern = next((pattern for pattern in patterns if fnmatch.fnmatch(path, pattern)), None)
+        if pattern:
+            reasons.append(f"source_paths {pattern}: {path}")
+            break
+
+    keywords = {path: path_keywords(path) for path in changed_paths}
+    for label, names in (
+        ("tag", {_normalize(str(tag)) for tag in test_data.get("tags") or []}),
+        ("endpoint", endpoint_resources(test_data.get("endpoint") or test_data.get("url"))),
+    ):
+        match = next(((name, path) for path in changed_paths for name in names if name in keywords[path]), None)
+        if match:
+            reasons.append(f"{label} {match[0]}: {match[1]}")
+
+    for path in learned_paths:
+        reasons.append(f"failed before after changing {path}")
+        break
+
+    return reasons
+
+
+def run_all_reason(changed_paths: List[str]) -> Optional[str]:
+    """变更的路径匹配IMPACT_RUN_ALL_PATTERNS(例如依赖文件)时执行全部用例"""
+    patterns = [pattern.strip() for pattern in settings.IMPACT_RUN_ALL_PATTERNS.split(",") if pattern.strip()]
+    for path in changed_paths:
+        for pattern in patterns:
+            if fnmatch.fnmatch(path, pattern):
+                return f"{path} matches {pattern}"
+    return None
+
+
+def select_impacted(
+    test_cases: List[TestCase],
+    changed_paths: List[str],
+    learned: Dict[int, List[str]]
+) -> Dict[int, List[str]]:
+    """返回受变更影响的用例ID及原因"""
+    selected = {}
+    for test_case in test_cases:
+        reasons = impact_reasons(test_case, changed_paths, learned.get(test_case.id, ()))
+        if reasons:
+            selected[test_case.id] = reasons
+    return selected
+
+
+def load_learned(db: Session, project_id: int, changed_paths: List[str]) -> Dict[int, List[str]]:
+    """历史失败中与这些路径关联的用例"""
+    learned: Dict[int, List[str]] = {}
+    for offset in range(0, len(changed_paths), 500):
+        rows = db.query(TestImpactMapping.test_case_id, TestImpactMapping.path).filter(
+            TestImpactMapping.project_id == project_id,
+            TestImpactMapping.path.in_(changed_paths[offset:offset + 500])
+        )
+        for test_case_id, path in rows:
+            learned.setdefault(test_case_id, []).append(path)
+    return learned
+
+
+def record_failure_impacts(db: Session, project_id: int, changed_paths: List[str], failed_case_ids: List[int]):
+    """记录变更路径与失败用例的关联
+
+    变更的文件太多时(超过IMPACT_LEARN_MAX_PATHS)无法判断是哪个文件导致失败, 不记录。
+    """
+    if not failed_case_ids or not changed_paths or len(changed_paths) > settings.IMPACT_LEARN_MAX_PATHS:
+        return
+    for attempt in range(3):
+        try:
+            existing = {
+                (mapping.path, mapping.test_case_id): mapping
+                for mapping in db.query(TestImpactMapping).filter(
+                    TestImpactMapping.project_id == project_id,
+                    TestImpactMapping.path.in_(changed_paths),
+                    TestImpactMapping.test_case_id.in_(failed_case_ids)
+                )
+            }
+            now = datetime.utcnow()
+            for path in changed_paths:
+                for test_case_id in failed_case_ids:
+                    mapping = existing.get((path, test_case_id))
+                    if mapping is None:
+                        mapping = TestImpactMapping(project_id=project_id, path=path, test_case_id=test_case_id, failures=0)
+                        db.add(mapping)
+                    mapping.failures += 1
+                    mapping.last_failed_at = now
+            db.commit()
+            return
+        except IntegrityError:
+            # 并发执行同时插入同一关联
+            db.rollback()
+            if attempt == 2:
+                raise
+
+
+async def _git(*args: str, git_dir: Optional[str] = None) -> str:
+    """执行git命令, 错误信息只包含子命令(仓库地址中可能带有凭据)"""
+    prefix = ["git", "--git-dir", git_dir] if git_dir else ["git"]
+    process = await run_process([*prefix, *args], timeout=settings.GIT_TIMEOUT)
+    if process.timed_out:
+        raise RuntimeError(f"git {args[0]} timed out")
+    if process.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {process.stderr.strip()[-500:]}")
+    return process.stdout
+
+
+async def diff_paths(repository_url: str, base: str, head: str) -> List[str]:
+    """从仓库镜像计算两个提交之间变更的文件路径
+
+    仓库在REPOSITORY_CACHE_DIR中保留一份镜像, 之后每次只增量fetch。
+    """
+    mirror = Path(settings.REPOSITORY_CACHE_DIR) / f"{hashlib.sha1(repository_url.encode('utf-8')).hexdigest()[:16]}.git"
+    lock = _fetch_locks.setdefault(str(mirror), asyncio.Lock())
+    async with lock:
+        if not mirror.exists():
+            # 先克隆到临时目录, 克隆中断时不会留下不完整的镜像
+            mirror.parent.mkdir(parents=True, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=mirror.parent, suffix=".tmp")
+            try:
+                await _git("clone", "--mirror", "--quiet", "--", repository_url, tmp_dir)
+                os.replace(tmp_dir, mirror)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        else:
+            await _git("fetch", "--prune", "--quiet", git_dir=str(mirror))
+    # 重命名按删除和新增处理, 旧路径和新路径都计入变更
+    output = await _git("diff", "--name-only", "--no-renames", base, head, "--", git_dir=str(mirror))
+    return [line for line in output.splitlines() if line]
+
+
+async def resolve_changed_paths(repository_url: Optional[str], changes: Dict[str, Any]) -> List[str]:
+    """执行请求中的变更路径, 只给出提交区间时从仓库计算"""
+    if changes.get("changed_paths") is not None:
+        return list(dict.fromkeys(changes["changed_paths"]))
+    if not repository_url:
+        raise RuntimeError("Project has no repository_url")
+    return await diff_paths(repository_url, changes["base"], changes["head"])
+
+
+def selection_summary(
+    changes: Dict[str, Any],
+    changed_paths: List[str],
+    total: int,
+    selected: Dict[int, List[str]],
+    run_all: Optional[str] = None,
+    error: Optional[str] = None
+) -> Dict[str, Any]:
+    """写入TestExecution.selection的选择结果"""
+    return {
+        "base": changes.get("base"),
+        "head": changes.get("head"),
+        "changed_count": len(changed_paths),
+        "changed_paths": changed_paths[:200],
+        "total": total,
+        "selected": total if run_all or error else len(selected),
+        "run_all": run_all,
+        "error": error,
+        "reasons": {str(case_id): reasons for case_id, reasons in selected.items()}
+    }
@@ -0,0 +1,227 @@
+import asyncio
+import json
+from collections import deque
+from typing import Dict, Any, Optional, List, Set
+
+from core.config import settings
+
+
+class Job:
+    """队列中的执行任务"""
+
+    def __init__(self, payload: Dict[str, Any], raw: Optional[str] = None):
+        self.payload = payload
+        self.raw = raw or json.dumps(payload, sort_keys=True)
+
+    @property
+    def execution_id(self) -> int:
+        return self.payload["execution_id"]
+
+
+class JobQueue:
+    """执行任务队列接口
+
+    任务出队后进入所属worker的处理中列表, 执行完成后ack;
+    worker心跳过期时, 其处理中的任务会被重新放回队列。
+    """
+
+    async def enqueue(self, payload: Dict[str, Any]):
+        raise NotImplementedError
+
+    async def dequeue(self, worker_id: str, timeout: int = 5) -> Optional[Job]:
+        raise NotImplementedError
+
+    async def ack(self, worker_id: str, job: Job):
+        raise NotImplementedError
+
+    async def heartbeat(self, worker_id: str):
+        raise NotImplementedError
+
+    async def release(self, worker_id: str):
+        """worker正常退出时, 把未完成的任务放回队列"""
+        raise NotImplementedError
+
+    async def requeue_dead_workers(self) -> int:
+        """把心跳过期的worker的任务放回队列, 返回重新入队的任务数"""
+        raise NotImplementedError
+
+    async def requeue(self, worker_id: str, job: Job, delay: float = 0):
+        """等待delay秒后把处理中的任务放回队列尾部; 等待期间worker失联时任务照常被回收"""
+        raise NotImplementedError
+
+    async def is_alive(self, worker_id: str) -> bool:
+        """worker的心跳是否有效"""
+        raise NotImplementedError
+
+    async def request_cancel(self, execution_id: int):
+        """请求停止某个执行, 由执行它的worker处理"""
+        raise NotImplementedError
+
+    async def cancel_requested(self, execution_ids: List[int]) -> List[int]:
+        """返回给定执行中已被请求停止的执行ID"""
+        raise NotImplementedError
+
+    async def clear_cancel(self, execution_id: int):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class RedisJobQueue(JobQueue):
+    """基于Redis列表的可靠队列, 支持多节点多worker"""
+
+    def __init__(self, url: Optional[str] = None, prefix: Optional[str] = None, heartbeat_ttl: Optional[int] = None):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url or settings.REDIS_URL, decode_responses=True)
+        self.prefix = prefix or settings.EXECUTION_QUEUE_PREFIX
+        self.heartbeat_ttl = heartbeat_ttl or settings.WORKER_HEARTBEAT_TTL
+        self.queue_key = f"{self.prefix}:jobs"
+        self.workers_key = f"{self.prefix}:workers"
+
+    def _processing_key(self, worker_id: str) -> str:
+        return f"{self.prefix}:jobs:processing:{worker_id}"
+
+    def _heartbeat_key(self, worker_id: str) -> str:
+        return f"{self.prefix}:workers:{worker_id}"
+
+    def _cancel_key(self, execution_id: int) -> str:
+        return f"{self.prefix}:cancel:{execution_id}"
+
+    async def enqueue(self, payload: Dict[str, Any]):
+        await self.redis.rpush(self.queue_key, Job(payload).raw)
+
+    async def dequeue(self, worker_id: str, timeout: int = 5) -> Optional[Job]:
+        raw = await self.redis.blmove(
+            self.queue_key, self._processing_key(worker_id), timeout, "LEFT", "RIGHT"
+        )
+        if raw is None:
+            return None
+        return Job(json.loads(raw), raw)
+
+    async def ack(self, worker_id: str, job: Job):
+        await self.redis.lrem(self._processing_key(worker_id), 1, job.raw)
+
+    async def heartbeat(self, worker_id: str):
+        await self.redis.sadd(self.workers_key, worker_id)
+        await self.redis.set(self._heartbeat_key(worker_id), "1", ex=self.heartbeat_ttl)
+
+    async def release(self, worker_id: str):
+        # 先删除心跳, 其他worker取到这些任务时可以直接认领
+        await self.redis.delete(self._heartbeat_key(worker_id))
+        await self._requeue_worker(worker_id)
+
+    async def requeue_dead_workers(self) -> int:
+        requeued = 0
+        for worker_id in await self.redis.smembers(self.workers_key):
+            if not await self.redis.exists(self._heartbeat_key(worker_id)):
+                requeued += await self._requeue_worker(worker_id)
+        return requeued
+
+    async def requeue(self, worker_id: str, job: Job, delay: float = 0):
+        if delay:
+            await asyncio.sleep(delay)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self._processing_key(worker_id), 1, job.raw)
+            pipe.rpush(self.queue_key, job.raw)
+            await pipe.execute()
+
+    async def is_alive(self, worker_id: str) -> bool:
+        return bool(await self.redis.exists(self._heartbeat_key(worker_id)))
+
+    async def _requeue_worker(self, worker_id: str) -> int:
+        """原子地把worker处理中的任务移回队列头部"""
+        requeued = 0
+        while await self.redis.lmove(self._processing_key(worker_id), self.queue_key, "RIGHT", "LEFT"):
+            requeued += 1
+        await self.redis.srem(self.workers_key, worker_id)
+        return requeued
+
+    async def request_cancel(self, execution_id: int):
+        # 停止请求保留一段时间, 覆盖任务仍在队列中尚未开始的情况
+        await self.redis.set(self._cancel_key(execution_id), "1", ex=settings.CANCEL_REQUEST_TTL)
+
+    async def cancel_requested(self, execution_ids: List[int]) -> List[int]:
+        if not execution_ids:
+            return []
+        flags = await self.redis.mget([self._cancel_key(execution_id) for execution_id in execution_ids])
+        return [execution_id for execution_id, flag in zip(execution_ids, flags) if flag]
+
+    async def clear_cancel(self, execution_id: int):
+        await self.redis.delete(self._cancel_key(execution_id))
+
+    async def close(self):
+        await self.redis.close()
+
+
+class InMemoryJobQueue(JobQueue):
+    """进程内队列, 用于测试和单机开发(API进程内运行worker)"""
+
+    def __init__(self):
+        self.pending: deque = deque()
+        self.processing: Dict[str, List[Job]] = {}
+        self.cancelled: Set[int] = set()
+        self._available = asyncio.Condition()
+
+    async def enqueue(self, payload: Dict[str, Any]):
+        async with self._available:
+            self.pending.append(Job(payload))
+            self._available.notify()
+
+    async def dequeue(self, worker_id: str, timeout: int = 5) -> Optional[Job]:
+        async with self._available:
+            if not self.pending:
+                try:
+                    await asyncio.wait_for(self._available.wait_for(lambda: self.pending), timeout)
+                except asyncio.TimeoutError:
+                    return None
+            job = self.pending.popleft()
+            self.processing.setdefault(worker_id, []).append(job)
+            return job
+
+    async def ack(self, worker_id: str, job: Job):
+        jobs = self.processing.get(worker_id, [])
+        if job in jobs:
+            jobs.remove(job)
+
+    async def heartbeat(self, worker_id: str):
+        self.processing.setdefault(worker_id, [])
+
+    async def release(self, worker_id: str):
+        async with self._available:
+            jobs = self.processing.pop(worker_id, [])
+            self.pending.extendleft(reversed(jobs))
+            self._available.notify(len(jobs))
+
+    async def requeue_dead_workers(self) -> int:
+        # 进程内worker与队列同生共死, 不存在心跳过期的情况
+        return 0
+
+    async def requeue(self, worker_id: str, job: Job, delay: float = 0):
+        if delay:
+            await asyncio.sleep(delay)
+        async with self._available:
+            await self.ack(worker_id, job)
+            self.pending.append(job)
+            self._available.notify()
+
+    async def is_alive(self, worker_id: str) -> bool:
+        # release()后worker不再有处理中的列表
+        return worker_id in self.processing
+
+    async def request_cancel(self, execution_id: int):
+        self.cancelled.add(execution_id)
+
+    async def cancel_requested(self, execution_ids: List[int]) -> List[int]:
+        return [execution_id for execution_id in execution_ids if execution_id in self.cancelled]
+
+    async def clear_cancel(self, execution_id: int):
+        self.cancelled.discard(execution_id)
+
+
+def create_job_queue() -> JobQueue:
+    """根据配置创建执行任务队列"""
+    if settings.EXECUTION_QUEUE_BACKEND == "memory":
+        return InMemoryJobQueue()
+    return RedisJobQueue()
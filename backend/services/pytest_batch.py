@@ -0,0 +1,241 @@
+import json
+import math
+import re
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+from core.config import settings
+from models.test_case import TestCase
+from models.environment import Environment
+from utils.process_utils import run_process
+from services.scheduler import partition_lpt
+from services.http_client import HttpOptions
+
+# 生成的pytest模块模板, 用例数据从同目录下的JSON文件读取并参数化
+PYTEST_MODULE_TEMPLATE = '''
+import json
+from pathlib import Path
+
+import allure
+import pytest
+
+CASES = json.loads((Path(__file__).parent / "__CASES_FILE__").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("case", CASES, ids=[f"case_{case['id']}" for case in CASES])
+def test_api_case(case, http_session, http_timeout):
+    """自动生成的API测试"""
+    allure.dynamic.feature(case["feature"])
+    allure.dynamic.story(case["name"])
+    allure.dynamic.title(case["name"])
+
+    base_url = case["base_url"]
+    test_data = case["test_data"]
+
+    # 执行HTTP请求
+    method = test_data.get("method", "GET").upper()
+    endpoint = test_data.get("endpoint", "/")
+    headers = test_data.get("headers", {})
+    params = test_data.get("params", {})
+    json_data = test_data.get("json", None)
+
+    url = base_url + endpoint
+
+    with allure.step(f"发送{method}请求到{url}"):
+        if method in ("GET", "DELETE"):
+            response = http_session.request(method, url, headers=headers, params=params, timeout=http_timeout)
+        elif method in ("POST", "PUT", "PATCH"):
+            response = http_session.request(method, url, headers=headers, params=params, json=json_data, timeout=http_timeout)
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+    # 验证响应
+    expected_status = test_data.get("expected_status", 200)
+    with allure.step(f"验证状态码为{expected_status}"):
+        assert response.status_code == expected_status, f"Expected {expected_status}, got {response.status_code}"
+
+    # 验证响应内容
+    if "expected_response" in test_data:
+        with allure.step("验证响应内容"):
+            expected = test_data["expected_response"]
+            actual = response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text
+            assert expected == actual, f"Expected {expected}, got {actual}"
+'''
+
+# 生成的conftest, 同一pytest进程(xdist时为每个worker)内的用例共享一个keep-alive连接池
+PYTEST_CONFTEST_TEMPLATE = '''
+import json
+from pathlib import Path
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP = json.loads((Path(__file__).parent / "http.json").read_text(encoding="utf-8"))
+
+
+@pytest.fixture(scope="session")
+def http_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=HTTP["pool_maxsize"])
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def http_timeout():
+    return tuple(HTTP["timeout"])
+'''
+
+CASE_ID_PATTERN = re.compile(r"\[case_(\d+)\]$")
+
+# pytest-json-report的outcome到用例状态的映射
+OUTCOME_STATUS = {"passed": "passed", "failed": "failed", "error": "error", "skipped": "skipped"}
+
+
+class PytestBatchRunner:
+    """批量pytest执行器
+
+    把所有选中的API用例生成为一个(或少量分片)参数化模块, 在一次pytest会话中执行,
+    可选使用pytest-xdist多进程; 从一份JSON报告解析每个用例的结果。
+    生成的文件放在临时目录中, 执行结束后删除。
+    """
+
+    def __init__(
+        self,
+        environment: Optional[Environment],
+        feature: str = "API Test",
+        results_dir: Optional[str] = None,
+        shards: Optional[int] = None,
+        workers: Optional[int] = None,
+        durations: Optional[Dict[int, float]] = None
+    ):
+        self.base_url = (environment.base_url if environment else None) or "http://localhost:8000"
+        self.feature = feature
+        self.results_dir = str(Path(results_dir or settings.ALLURE_RESULTS_DIR).resolve())
+        self.shards = max(1, shards or settings.PYTEST_BATCH_SHARDS)
+        self.workers = settings.PYTEST_XDIST_WORKERS if workers is None else workers
+        self.durations = durations or {}
+        self.http_options = HttpOptions.for_environment(environment)
+
+    async def run(
+        self,
+        test_cases: List[TestCase],
+        on_start: Optional[Callable] = None,
+        on_exit: Optional[Callable] = None
+    ) -> List[Dict[str, Any]]:
+        """执行用例, 结果按用例顺序返回"""
+        if not test_cases:
+            return []
+
+        work_dir = Path(tempfile.mkdtemp(prefix="autotester-pytest-"))
+        try:
+            self._write_modules(work_dir, test_cases)
+            report_file = work_dir / "report.json"
+
+            args = [
+                sys.executable, "-m", "pytest", str(work_dir),
+                "-c", str(work_dir / "pytest.ini"),
+                "-p", "no:cacheprovider",
+                f"--alluredir={self.results_dir}",
+                "--json-report",
+                f"--json-report-file={report_file}",
+                "-q"
+            ]
+            if self.workers:
+                args += ["-n", str(self.workers)]
+
+            timeout = self.session_timeout(len(test_cases))
+            process = await run_process(
+                args,
+                cwd=str(work_dir),
+                timeout=timeout,
+                max_output=settings.PROCESS_OUTPUT_LIMIT,
+                on_start=on_start,
+                on_exit=on_exit,
+                # 超时后先中断, pytest-json-report在会话结束时写出已完成用例的结果
+                interrupt_grace=settings.PYTEST_INTERRUPT_GRACE
+            )
+
+            report = {}
+            if report_file.exists():
+                report = json.loads(report_file.read_text(encoding="utf-8"))
+
+            return self._parse_report(test_cases, report, process)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def session_timeout(self, count: int) -> float:
+        """整个会话的超时: 按单用例超时和并行度估算, 不超过PYTEST_SESSION_TIMEOUT"""
+        estimate = settings.TEST_TIMEOUT * math.ceil(count / max(1, self.workers or 1))
+        return min(estimate, settings.PYTEST_SESSION_TIMEOUT)
+
+    def _write_modules(self, work_dir: Path, test_cases: List[TestCase]):
+        """按分片写入用例数据和测试模块, 按预计耗时分片使各模块的总耗时接近"""
+        (work_dir / "pytest.ini").write_text("[pytest]\n", encoding="utf-8")
+        (work_dir / "http.json").write_text(json.dumps(self.http_options.requests_options()), encoding="utf-8")
+        (work_dir / "conftest.py").write_text(PYTEST_CONFTEST_TEMPLATE, encoding="utf-8")
+
+        duration_of = lambda test_case: self.durations.get(test_case.id, 0)
+        for shard_no, shard in enumerate(partition_lpt(test_cases, duration_of, self.shards)):
+            cases_file = f"cases_{shard_no}.json"
+            cases = [
+                {
+                    "id": test_case.id,
+                    "name": test_case.name,
+                    "feature": self.feature,
+                    "base_url": self.base_url,
+                    "test_data": test_case.test_data or {}
+                }
+                for test_case in shard
+            ]
+            (work_dir / cases_file).write_text(json.dumps(cases, ensure_ascii=False), encoding="utf-8")
+            module = PYTEST_MODULE_TEMPLATE.replace("__CASES_FILE__", cases_file)
+            (work_dir / f"test_api_shard_{shard_no}.py").write_text(module, encoding="utf-8")
+
+    def _parse_report(self, test_cases: List[TestCase], report: Dict[str, Any], process) -> List[Dict[str, Any]]:
+        """把JSON报告中的每个测试映射回用例结果"""
+        tests_by_case: Dict[int, Dict[str, Any]] = {}
+        for test in report.get("tests", []):
+            match = CASE_ID_PATTERN.search(test.get("nodeid", ""))
+            if match:
+                tests_by_case[int(match.group(1))] = test
+
+        results = []
+        for test_case in test_cases:
+            test = tests_by_case.get(test_case.id)
+            if test is not None and "call" not in test and (test.get("setup") or {}).get("outcome") == "passed":
+                # 超时中断时正在运行的用例只有setup阶段
+                test = None
+            if test is None:
+                # 收集失败或会话超时, 用例没有运行完
+                error = "Test session timed out" if process.timed_out else "Test was not collected or did not run"
+                results.append({
+                    "test_case_id": test_case.id,
+                    "test_case_name": test_case.name,
+                    "status": "error",
+                    "output": process.stdout,
+                    "errors": process.stderr,
+                    "error": error,
+                    "duration": 0
+                })
+                continue
+
+            phases = [test.get(phase) or {} for phase in ("setup", "call", "teardown")]
+            longrepr = "\n".join(phase["longrepr"] for phase in phases if phase.get("longrepr"))
+            results.append({
+                "test_case_id": test_case.id,
+                "test_case_name": test_case.name,
+                "status": OUTCOME_STATUS.get(test.get("outcome"), "error"),
+                "output": "".join(phase.get("stdout", "") for phase in phases),
+                "errors": longrepr,
+                "duration": sum(phase.get("duration", 0) for phase in phases),
+                "details": test
+            })
+
+        return results
@@ -0,0 +1,153 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy import and_, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.test_case import TestCase
+from models.environment import Environment
+from models.test_case_result import TestCaseResult
+from models.test_result_cache import TestResultCache
+
+# 只缓存API用例, UI用例依赖浏览器和页面状态, 结果不确定
+CACHEABLE_TYPES = {"api"}
+
+
+def _options(environment: Optional[Environment]) -> Dict[str, Any]:
+    options = ((environment.config if environment else None) or {}).get("result_cache")
+    return options if isinstance(options, dict) else {}
+
+
+def cache_ttl(environment: Optional[Environment]) -> int:
+    """结果复用时间(秒), Environment.config["result_cache"]["ttl"]优先, 0表示不缓存"""
+    options = _options(environment)
+    return max(0, int(options.get("ttl", settings.RESULT_CACHE_TTL) or 0))
+
+
+def case_cache_key(test_case: TestCase, environment: Environment, version: Optional[str] = None) -> Optional[str]:
+    """用例结果的缓存键, 不可缓存时返回None
+
+    键包含用例定义、环境地址和配置, 以及环境版本(执行请求中的environment_version,
+    或Environment.config["result_cache"]["version"]), 任一变化都不会命中旧结果。
+    test_data["cache"]为false的用例(例如有副作用的用例)不缓存。
+    """
+    test_data = test_case.test_data or {}
+    if test_case.type not in CACHEABLE_TYPES or test_data.get("cache") is False:
+        return None
+    config = {key: value for key, value in (environment.config or {}).items() if key != "result_cache"}
+    payload = {
+        "case": {"id": test_case.id, "type": test_case.type, "test_data": test_data},
+        "environment": {"id": environment.id, "base_url": environment.base_url, "config": config},
+        "version": version or _options(environment).get("version"),
+        "engine": settings.API_EXECUTION_ENGINE
+    }
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def cached_result(entry: TestResultCache, row: TestCaseResult) -> Dict[str, Any]:
+    """把缓存指向的结果转换为用例结果, cached_from标明来源执行, 本次执行没有耗时"""
+    return {
+        "test_case_id": entry.test_case_id,
+        "test_case_name": row.test_case_name,
+        "status": "passed",
+        "duration": 0,
+        "output": row.output,
+        "errors": "",
+        "details": row.details,
+        "artifacts": row.artifacts,
+        "cached_from": entry.execution_id
+    }
+
+
+def load_cached_results(db: Session, keys: Dict[int, str]) -> Dict[int, Dict[str, Any]]:
+    """未过期的缓存结果, 按用例ID返回"""
+    case_ids = {key: case_id for case_id, key in keys.items()}
+    cached = {}
+    rows = db.query(TestResultCache, TestCaseResult).join(
+        TestCaseResult,
+        and_(
+            TestCaseResult.execution_id == TestResultCache.execution_id,
+            TestCaseResult.test_case_id == TestResultCache.test_case_id
+        )
+    ).filter(
+        TestResultCache.key.in_(list(case_ids)),
+        TestResultCache.expires_at > datetime.utcnow(),
+        TestCaseResult.status == "passed"
+    )
+    for entry, row in rows:
+        cached[case_ids[entry.key]] = cached_result(entry, row)
+    return cached
+
+
+def store_results(
+    db: Session,
+    execution_id: int,
+    project_id: int,
+    environment_id: int,
+    keys: Dict[int, str],
+    results: List[Dict[str, Any]],
+    ttl: int
+):
+    """缓存本次执行通过的结果, 失败的用例删除其缓存
+
+    重试后才通过的结果和复用的缓存结果不写入, 缓存的有效期从实际执行时开始计算。
+    """
+    passed = {}
+    failed = []
+    for result in results:
+        key = keys.get(result["test_case_id"])
+        if key is None or result.get("cached_from"):
+            continue
+        if result.get("status") == "passed" and not result.get("flaky"):
+            passed[key] = result["test_case_id"]
+        elif result.get("status") in ("failed", "error"):
+            failed.append(key)
+
+    for attempt in range(3):
+        try:
+            now = datetime.utcnow()
+            db.execute(delete(TestResultCache).where(
+                TestResultCache.project_id == project_id,
+                TestResultCache.expires_at <= now
+            ))
+            if failed:
+                db.execute(delete(TestResultCache).where(TestResultCache.key.in_(failed)))
+            existing = {
+                entry.key: entry
+                for entry in db.query(TestResultCache).filter(TestResultCache.key.in_(list(passed)))
+            } if passed else {}
+            for key, test_case_id in passed.items():
+                entry = existing.get(key)
+                if entry is None:
+                    entry = TestResultCache(
+                        key=key,
+                        project_id=project_id,
+                        environment_id=environment_id,
+                        test_case_id=test_case_id
+                    )
+                    db.add(entry)
+                entry.execution_id = execution_id
+                entry.created_at = now
+                entry.expires_at = now + timedelta(seconds=ttl)
+            db.commit()
+            return
+        except IntegrityError:
+            # 并发执行同时缓存同一用例
+            db.rollback()
+            if attempt == 2:
+                raise
+
+
+def invalidate_query(project_id: int, environment_id: Optional[int] = None, test_case_id: Optional[int] = None):
+    """删除项目缓存的语句, 可以只删除某个环境或用例, 同步和异步会话都可以执行"""
+    statement = delete(TestResultCache).where(TestResultCache.project_id == project_id)
+    if environment_id is not None:
+        statement = statement.where(TestResultCache.environment_id == environment_id)
+    if test_case_id is not None:
+        statement = statement.where(TestResultCache.test_case_id == test_case_id)
+    return statement
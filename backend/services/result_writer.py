@@ -0,0 +1,162 @@
+import asyncio
+import json
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy import insert
+
+from core.config import settings
+from core.database import SessionLocal
+from models.test_case_result import TestCaseResult
+from services.artifact_store import ArtifactStore, artifact_store
+
+# 超过内联上限时写入产物存储的文本字段及其内容类型
+TEXT_ARTIFACT_FIELDS = {"output": "text/plain", "error": "text/plain"}
+
+
+def summarize_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """根据用例结果计算执行汇总"""
+    summary = {"total": 0, "passed": 0, "failed": 0, "error": 0, "skipped": 0, "duration": 0.0, "retried": 0, "flaky": 0, "cached": 0}
+    for result in results:
+        summary["total"] += 1
+        status = result.get("status")
+        if status in ("passed", "failed", "error", "skipped"):
+            summary[status] += 1
+        else:
+            summary["error"] += 1
+        summary["duration"] += result.get("duration") or 0
+        if result.get("attempts", 1) > 1:
+            summary["retried"] += 1
+        if result.get("flaky"):
+            summary["flaky"] += 1
+        if result.get("cached_from"):
+            summary["cached"] += 1
+    return summary
+
+
+def make_preview(text: str, limit: int, name: str) -> str:
+    """保留开头和结尾各一半的预览, 测试输出的结尾通常包含汇总信息"""
+    half = limit // 2
+    omitted = len(text) - 2 * half
+    return f"{text[:half]}\n...[{omitted} characters omitted, full {name} in artifact]...\n{text[-half:]}"
+
+
+class ResultWriter:
+    """用例结果增量写入器
+
+    用例完成时先放入缓冲区, 达到批量大小或间隔时间后批量插入test_case_results,
+    长时间运行的执行可以随时查看已完成的用例, 进程崩溃也不会丢失已写入的结果。
+    超过ARTIFACT_INLINE_LIMIT的输出、错误和详情写入产物存储, 行内只保留预览和产物键。
+    """
+
+    def __init__(
+        self,
+        execution_id: int,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        store: Optional[ArtifactStore] = None
+    ):
+        self.execution_id = execution_id
+        self.batch_size = batch_size or settings.RESULT_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.RESULT_FLUSH_INTERVAL
+        self.store = store or artifact_store
+        self.inline_limit = settings.ARTIFACT_INLINE_LIMIT
+        self.buffer: List[Dict[str, Any]] = []
+        self._full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._flush_loop())
+
+    def add(self, test_type: str, result: Dict[str, Any]):
+        """缓存一个用例结果"""
+        self.buffer.append(self._to_row(test_type, result))
+        if len(self.buffer) >= self.batch_size:
+            self._full.set()
+
+    async def flush(self):
+        """把缓冲区中的结果批量写入数据库, 写入失败时结果放回缓冲区并抛出异常"""
+        async with self._flush_lock:
+            if not self.buffer:
+                return
+            rows, self.buffer = self.buffer, []
+            self._full.clear()
+            try:
+                await asyncio.to_thread(self._write, rows)
+            except Exception:
+                # 下次写入时重试; 已写入产物存储的字段不会重复写入
+                self.buffer[:0] = rows
+                raise
+
+    async def close(self):
+        """停止定时写入并写入剩余结果, 写入失败时抛出异常"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error writing test case results: {e}")
+
+    def _to_row(self, test_type: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        details = result.get("details")
+        # 复用的缓存结果带有来源结果的产物
+        artifacts = dict(result.get("artifacts") or {})
+        if isinstance(details, dict) and details.get("screenshot"):
+            artifacts["screenshot"] = details["screenshot"]
+        return {
+            "execution_id": self.execution_id,
+            "test_case_id": result["test_case_id"],
+            "test_case_name": result.get("test_case_name"),
+            "type": test_type,
+            "status": result.get("status", "error"),
+            "duration": result.get("duration") or 0,
+            "error": result.get("error") or result.get("errors") or None,
+            "output": result.get("output"),
+            "details": details,
+            "artifacts": artifacts or None,
+            "attempts": result.get("attempts", 1),
+            "flaky": bool(result.get("flaky")),
+            "attempt_history": result.get("attempt_history"),
+            "cached_from": result.get("cached_from")
+        }
+
+    def _externalize(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """把过大的字段写入产物存储(在写入线程中执行)"""
+        artifacts = dict(row["artifacts"] or {})
+        for field, content_type in TEXT_ARTIFACT_FIELDS.items():
+            value = row.get(field)
+            if isinstance(value, str) and len(value) > self.inline_limit and field not in artifacts:
+                data = value.encode("utf-8")
+                artifacts[field] = {"key": self.store.put(data), "size": len(data), "content_type": content_type}
+                row[field] = make_preview(value, self.inline_limit, field)
+        
+        if row.get("details") is not None and "details" not in artifacts:
+            data = json.dumps(row["details"], ensure_ascii=False, default=str).encode("utf-8")
+            if len(data) > self.inline_limit:
+                artifacts["details"] = {"key": self.store.put(data), "size": len(data), "content_type": "application/json"}
+                row["details"] = {"truncated": True, "artifact": "details"}
+        
+        row["artifacts"] = artifacts or None
+        return row
+    
+    def _write(self, rows: List[Dict[str, Any]]):
+        self._insert([self._externalize(row) for row in rows])
+
+    @staticmethod
+    def _insert(rows: List[Dict[str, Any]]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(TestCaseResult), rows)
+            db.commit()
+        finally:
+            db.close()
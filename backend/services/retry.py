@@ -0,0 +1,91 @@
+import re
+from typing import List, Dict, Any, Optional
+
+from core.config import settings
+from models.test_case import TestCase
+from models.environment import Environment
+
+
+def _split(value) -> List[str]:
+    """配置项可以是逗号分隔的字符串或列表"""
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return [str(item) for item in value or []]
+
+
+class RetryPolicy:
+    """用例失败重试策略
+
+    count: 最多重试次数; backoff: 第一次重试前的等待秒数, 之后每次翻倍(不超过RETRY_BACKOFF_MAX);
+    on: 需要重试的结果状态(error/failed); error_types: 只重试错误信息中包含这些异常类名的结果。
+    """
+
+    def __init__(
+        self,
+        count: int = 0,
+        backoff: float = 0,
+        on: Optional[List[str]] = None,
+        error_types: Optional[List[str]] = None
+    ):
+        self.count = max(0, int(count))
+        self.backoff = max(0.0, float(backoff))
+        self.on = set(on or ["error"])
+        self.error_types = list(error_types or [])
+        self._error_pattern = (
+            re.compile(r"\b(" + "|".join(re.escape(name) for name in self.error_types) + r")\b")
+            if self.error_types else None
+        )
+
+    @classmethod
+    def for_case(cls, test_case: TestCase, environment: Optional[Environment] = None) -> "RetryPolicy":
+        """合并全局配置、Environment.config["retry"]和test_data["retry"], 后者优先"""
+        options = {
+            "count": settings.RETRY_COUNT,
+            "backoff": settings.RETRY_BACKOFF,
+            "on": settings.RETRY_ON,
+            "error_types": settings.RETRY_ERROR_TYPES,
+        }
+        for source in ((environment.config if environment else None), test_case.test_data):
+            retry = (source or {}).get("retry")
+            if isinstance(retry, dict):
+                options.update({key: value for key, value in retry.items() if key in options})
+        return cls(
+            count=options["count"],
+            backoff=options["backoff"],
+            on=_split(options["on"]),
+            error_types=_split(options["error_types"])
+        )
+
+    def should_retry(self, result: Dict[str, Any], attempt: int) -> bool:
+        """第attempt次执行的结果是否需要重试"""
+        if attempt > self.count or result.get("status") not in self.on:
+            return False
+        if self._error_pattern is None:
+            return True
+        return bool(self._error_pattern.search(result_error(result)))
+
+    def delay(self, attempt: int) -> float:
+        """第attempt次执行失败后, 重试前的等待秒数"""
+        return min(self.backoff * 2 ** (attempt - 1), settings.RETRY_BACKOFF_MAX)
+
+
+def result_error(result: Dict[str, Any]) -> str:
+    """用例结果中的错误信息(原生执行在error, pytest在errors, UI在details.error)"""
+    details = result.get("details")
+    return (
+        result.get("error")
+        or result.get("errors")
+        or (details.get("error") if isinstance(details, dict) else None)
+        or ""
+    )
+
+
+def attempt_record(result: Dict[str, Any], attempt: int) -> Dict[str, Any]:
+    """一次执行的简要记录, 保存在结果的attempt_history中"""
+    error = result_error(result)
+    return {
+        "attempt": attempt,
+        "status": result.get("status"),
+        "duration": result.get("duration") or 0,
+        "error": error[:settings.ARTIFACT_INLINE_LIMIT] or None
+    }
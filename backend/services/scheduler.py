@@ -0,0 +1,143 @@
+import asyncio
+import heapq
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Callable, Awaitable, TypeVar, Sequence
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class _KeySlots:
+    """同一个key的槽位
+
+    每个占用者带着自己的上限, 运行中的数量不超过所有运行中占用者(及申请者)上限的最小值,
+    因此共享base_url但上限不同的环境同时执行时按较小的上限限制。
+    """
+
+    def __init__(self):
+        self.limits: List[int] = []
+        self._waiters: List[asyncio.Future] = []
+
+    def _available(self, limit: int) -> bool:
+        return len(self.limits) < min([limit, *self.limits])
+
+    @property
+    def idle(self) -> bool:
+        return not self.limits and not self._waiters
+
+    async def acquire(self, limit: int):
+        while not self._available(limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                self._waiters.remove(waiter)
+        self.limits.append(limit)
+
+    def release(self, limit: int):
+        self.limits.remove(limit)
+        # 上限不同的申请者条件不同, 全部唤醒后各自重新检查
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """测试并发限制器
+
+    同时限制进程内的全局并发数和每个key(环境/base_url)的并发数,
+    多个执行共享同一个限制器时总并发不会超过全局上限。
+    限制只在当前进程(一个worker)内生效, 多个worker进程时总并发为各进程之和。
+    """
+
+    def __init__(self, global_limit: int, per_key_limit: Optional[int] = None):
+        self.global_limit = max(1, global_limit)
+        self.per_key_limit = per_key_limit
+        self._global = asyncio.Semaphore(self.global_limit)
+        self._per_key: Dict[str, _KeySlots] = {}
+
+    @asynccontextmanager
+    async def slot(self, key: Optional[str] = None, limit: Optional[int] = None):
+        """占用一个执行槽位, 先获取key槽位再获取全局槽位
+
+        同一个key的上限变化时(例如修改了环境配置, 或多个环境共享base_url),
+        运行中的用例数不超过运行中各用例上限的最小值。
+        """
+        limit = limit or self.per_key_limit
+        if key is None or not limit:
+            async with self._global:
+                yield
+            return
+        limit = max(1, limit)
+        slots = self._per_key.setdefault(key, _KeySlots())
+        await slots.acquire(limit)
+        try:
+            async with self._global:
+                yield
+        finally:
+            slots.release(limit)
+            if slots.idle and self._per_key.get(key) is slots:
+                del self._per_key[key]
+
+
+async def run_bounded(
+    items: Sequence[T],
+    worker: Callable[[T], Awaitable[R]],
+    limiter: ConcurrencyLimiter,
+    key: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[R]:
+    """在并发限制内执行所有任务, 结果按items的顺序返回"""
+
+    async def run_one(item: T) -> R:
+        async with limiter.slot(key, limit):
+            return await worker(item)
+
+    return list(await asyncio.gather(*(run_one(item) for item in items)))
+
+
+def longest_first(items: Sequence[T], duration_of: Callable[[T], float]) -> List[T]:
+    """按预计耗时从长到短排序(耗时相同时保持原顺序)
+
+    run_bounded按items顺序获取槽位, 长用例先开始可以避免执行末尾只剩一个长用例在运行。
+    """
+    return sorted(items, key=duration_of, reverse=True)
+
+
+def partition_lpt(items: Sequence[T], duration_of: Callable[[T], float], shards: int) -> List[List[T]]:
+    """最长处理时间优先(LPT)分片: 依次把最长的用例分给当前总耗时最小的分片
+
+    每个分片内的用例同样按耗时从长到短排列, 不会返回空分片。
+    """
+    shards = max(1, min(shards, len(items)))
+    # 总耗时相同时分给用例较少的分片, 耗时都为0时退化为轮流分配
+    heap = [(0.0, 0, index) for index in range(shards)]
+    partitions: List[List[T]] = [[] for _ in range(shards)]
+    for item in longest_first(items, duration_of):
+        load, size, index = heapq.heappop(heap)
+        partitions[index].append(item)
+        heapq.heappush(heap, (load + duration_of(item), size + 1, index))
+    return [partition for partition in partitions if partition]
+
+
+def simulate_makespan(durations: Sequence[float], workers: int) -> float:
+    """按给定顺序把任务交给最早空闲的槽位, 返回全部完成的时间(与run_bounded的调度方式一致)"""
+    heap = [0.0] * max(1, workers)
+    for duration in durations:
+        heapq.heapreplace(heap, heap[0] + duration)
+    return max(heap)
+
+
+def environment_key(environment: Any) -> Optional[str]:
+    """环境的并发限制key, 以base_url区分"""
+    if environment is None:
+        return None
+    return environment.base_url or f"environment-{environment.id}"
+
+
+def environment_limit(environment: Any) -> Optional[int]:
+    """从Environment.config读取该环境在每个worker进程中的并发上限(max_concurrency)"""
+    config = (environment.config if environment else None) or {}
+    limit = config.get("max_concurrency")
+    return int(limit) if limit else None
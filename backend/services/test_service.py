@@ -1,329 +1,632 @@
 import asyncio
-import subprocess
-import json
-import uuid
-from pathlib import Path
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-from sqlalchemy.orm import Session
-import pytest
-from playwright.async_api import async_playwright
+import time
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple
+from datetime import datetime, timedelta
+import httpx
+from sqlalchemy.orm import Session, joinedload
 
+from core.config import settings
 from core.database import SessionLocal
 from models.test_execution import TestExecution
 from models.test_case import TestCase
 from models.environment import Environment
 from models.project import Project
-from utils.allure_utils import generate_allure_report
+from models.test_case_result import TestCaseResult
+from utils.allure_utils import generate_allure_report, parse_allure_results, write_allure_result
+from services.api_runner import ApiTestRunner
+from services.ui_runner import UiTestRunner
+from services.browser_pool import BrowserPool
+from services.cancellation import ExecutionHandle
+from services.pytest_batch import PytestBatchRunner
+from services.result_writer import ResultWriter, summarize_results
+from services.events import create_event_bus
+from services.analytics import record_execution_stats
+from services.scheduler import ConcurrencyLimiter, run_bounded, environment_key, environment_limit, longest_first
+from services.execution_plan import case_durations_query, estimate_durations
+from services.retry import RetryPolicy, attempt_record
+from services.impact import (
+    resolve_changed_paths,
+    run_all_reason,
+    select_impacted,
+    load_learned,
+    record_failure_impacts,
+    selection_summary
+)
+from services.result_cache import cache_ttl, case_cache_key, load_cached_results, store_results
+from services.http_client import HttpOptions
 
 class TestExecutionService:
     """测试执行服务"""
     
     def __init__(self):
         self.running_executions = {}
+        self.result_writers = {}
+        # 进程内所有执行共享的并发限制
+        self.limiter = ConcurrencyLimiter(
+            settings.MAX_CONCURRENT_TESTS,
+            settings.MAX_CONCURRENT_TESTS_PER_ENV
+        )
+        # 常驻浏览器池, 由应用启动时预热
+        self.browser_pool = BrowserPool()
+        # 后台报告生成任务及其并发限制
+        self.report_semaphore = asyncio.Semaphore(settings.REPORT_MAX_CONCURRENCY)
+        self.report_tasks = set()
+        # 执行进度事件, 供SSE接口推送
+        self.event_bus = create_event_bus()
     
-    async def run_tests(self, execution_id: int, test_case_ids: Optional[List[int]] = None):
-        """运行测试"""
-        db = SessionLocal()
+    async def startup(self):
+        """启动服务持有的长期资源"""
+        if settings.BROWSER_POOL_PREWARM:
+            try:
+                await self.browser_pool.start()
+            except Exception as e:
+                # 浏览器不可用时不影响API启动, 首次执行UI测试时再启动
+                print(f"Error starting browser pool: {e}")
+    
+    async def shutdown(self):
+        """释放服务持有的长期资源"""
+        if self.report_tasks:
+            await asyncio.gather(*self.report_tasks, return_exceptions=True)
+        await self.browser_pool.stop()
+        await self.event_bus.close()
+    
+    async def run_tests(
+        self,
+        execution_id: int,
+        test_case_ids: Optional[List[int]] = None,
+        changes: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        environment_version: Optional[str] = None,
+        worker_id: Optional[str] = None,
+        owner_alive: Optional[Callable[[str], Awaitable[bool]]] = None
+    ) -> bool:
+        """运行测试, 给出changes时只运行受变更影响的用例
+
+        环境开启结果缓存时, 用例定义、环境和环境版本都未变化的API用例复用有效期内的通过结果。
+        use_cache为False时全部重新执行, 结果仍会写入缓存。
+        worker_id为执行它的worker, owner_alive检查另一个worker的心跳(见_claim_execution)。
+        执行仍由其他存活的worker持有时返回False, 调用方应稍后重试。
+        """
+        handle = ExecutionHandle(execution_id, asyncio.current_task())
+        self.running_executions[execution_id] = handle
+        writer = ResultWriter(execution_id)
+        self.result_writers[execution_id] = writer
+        # 同步会话只在线程中访问数据库(asyncio.to_thread), 不阻塞事件循环;
+        # 提交后不过期已加载的对象, 之后在事件循环中读取属性不会触发查询
+        db = SessionLocal(expire_on_commit=False)
+        execution = None
+        changed_paths: List[str] = []
+        cache_keys: Dict[int, str] = {}
+        ttl = 0
         try:
-            execution = db.query(TestExecution).filter(TestExecution.id == execution_id).first()
-            if not execution:
-                return
-            
-            # 更新状态为运行中
-            execution.status = "running"
-            execution.start_time = datetime.utcnow()
-            db.commit()
+            claimed = await self._claim_execution(db, execution_id, worker_id, owner_alive)
+            if not claimed:
+                # 已停止或已结束时任务直接ack; 正由其他worker执行时稍后重试
+                return claimed is not None
+            execution, test_cases = await asyncio.to_thread(self._load_execution, db, execution_id, test_case_ids)
+            writer.start()
             
-            # 获取测试用例
-            test_cases_query = db.query(TestCase).filter(TestCase.project_id == execution.project_id)
-            if test_case_ids:
-                test_cases_query = test_cases_query.filter(TestCase.id.in_(test_case_ids))
+            if changes:
+                test_cases, changed_paths = await self._select_impacted(db, execution, test_cases, changes)
+                await asyncio.to_thread(db.commit)
             
-            test_cases = test_cases_query.all()
+            # 按历史耗时从长到短执行, 避免执行末尾只剩一个长用例
+            history = await asyncio.to_thread(
+                lambda: dict(db.execute(case_durations_query(execution.project_id)).all())
+            )
+            durations = estimate_durations(test_cases, history)
+            test_cases = longest_first(test_cases, lambda test_case: durations[test_case.id])
+            handle.case_ids = [tc.id for tc in test_cases]
+            handle.counters["total"] = len(test_cases)
+            self.event_bus.publish(execution_id, {
+                "type": "execution_started",
+                "execution_id": execution_id,
+                "counters": dict(handle.counters)
+            })
             
             # 获取环境信息
-            environment = db.query(Environment).filter(Environment.id == execution.environment_id).first()
+            environment = await asyncio.to_thread(db.get, Environment, execution.environment_id)
+            handle.retry_policies = {tc.id: RetryPolicy.for_case(tc, environment) for tc in test_cases}
+            
+            ttl = cache_ttl(environment)
+            if environment and ttl:
+                keys = {tc.id: case_cache_key(tc, environment, environment_version) for tc in test_cases}
+                cache_keys = {case_id: key for case_id, key in keys.items() if key}
+            cached = await asyncio.to_thread(load_cached_results, db, cache_keys) if use_cache and cache_keys else {}
             
             # 分类测试用例
             api_cases = [tc for tc in test_cases if tc.type == "api"]
             ui_cases = [tc for tc in test_cases if tc.type == "ui"]
             
-            results = {
-                "api_results": [],
-                "ui_results": [],
-                "summary": {}
-            }
+            # 复用缓存中的通过结果
+            api_results = self._reuse_cached(execution_id, [tc for tc in api_cases if tc.id in cached], cached)
+            api_cases = [tc for tc in api_cases if tc.id not in cached]
+            ui_results = []
             
-            # 执行API测试
+            # 执行API测试, native引擎的所有API用例(包括重试)共享本次执行的连接池
             if api_cases:
-                api_results = await self.execute_api_tests(execution_id, api_cases, environment)
-                results["api_results"] = api_results
+                client = None
+                if settings.API_EXECUTION_ENGINE != "pytest":
+                    client = HttpOptions.for_environment(environment).async_client()
+                try:
+                    api_results += await self._run_with_retries(
+                        execution_id,
+                        api_cases,
+                        lambda cases: self.execute_api_tests(execution_id, cases, environment, durations, client)
+                    )
+                finally:
+                    if client is not None:
+                        await client.aclose()
             
             # 执行UI测试
             if ui_cases:
-                ui_results = await self.execute_ui_tests(execution_id, ui_cases, environment)
-                results["ui_results"] = ui_results
+                ui_results = await self._run_with_retries(
+                    execution_id,
+                    ui_cases,
+                    lambda cases: self.execute_ui_tests(execution_id, cases, environment)
+                )
             
-            # 生成测试报告
-            report_path = await self.generate_test_report(execution_id)
+            # 写入剩余的用例结果
+            await writer.close()
+            
+            # 从本次执行的Allure结果计算汇总, 列表页无需打开HTML报告即可显示数量
+            summary = await asyncio.to_thread(parse_allure_results, self.results_dir(execution_id))
+            summary.pop("tests", None)
             
             # 计算总结果
             all_passed = all(
                 result.get("status") == "passed" 
-                for result in results["api_results"] + results["ui_results"]
+                for result in api_results + ui_results
             )
             
-            # 更新执行结果
+            # 更新执行结果, 每个用例的结果已写入test_case_results
             execution.status = "passed" if all_passed else "failed"
             execution.end_time = datetime.utcnow()
-            execution.result = results
-            execution.report_path = report_path
-            db.commit()
+            self._record_summary(execution, summarize_results(api_results + ui_results))
+            execution.summary = summary
+            await asyncio.to_thread(db.commit)
+            
+            # 报告在后台生成, 不阻塞执行结束
+            self._schedule_report(execution_id)
+        
+        except asyncio.CancelledError:
+            if not handle.cancelled or execution is None:
+                # 不是用户停止(例如worker退出), 任务会被重新入队, 继续向上传播
+                raise
+            # 用户停止执行: 记录已完成和被取消的用例
+            execution.status = "cancelled"
+            execution.end_time = datetime.utcnow()
+            self._record_summary(execution, summarize_results(handle.completed["api"] + handle.completed["ui"]))
+            execution.result.update({
+                "message": "Execution stopped by user",
+                "completed_case_ids": sorted(handle.completed_case_ids),
+                "cancelled_case_ids": handle.cancelled_case_ids
+            })
+            await asyncio.to_thread(db.commit)
             
         except Exception as e:
             # 错误处理
-            execution.status = "failed"
-            execution.end_time = datetime.utcnow()
-            execution.result = {"error": str(e)}
-            db.commit()
+            if execution is not None:
+                execution.status = "failed"
+                execution.end_time = datetime.utcnow()
+                execution.result = {"error": str(e)}
+                await asyncio.to_thread(db.commit)
         finally:
-            db.close()
-            # 清理运行状态
-            self.running_executions.pop(execution_id, None)
-    
-    async def execute_api_tests(self, execution_id: int, test_cases: List[TestCase], environment: Environment) -> List[Dict[str, Any]]:
-        """执行API测试"""
-        results = []
-        
-        for test_case in test_cases:
+            # 已完成用例的结果在任何情况下都写入数据库
             try:
-                # 生成pytest测试文件
-                test_file = self._generate_api_test_file(test_case, environment)
-                
-                # 执行pytest
-                result = subprocess.run([
-                    "pytest",
-                    str(test_file),
-                    "--allure-dir=./allure-results",
-                    "--json-report",
-                    f"--json-report-file=./test-report-{test_case.id}.json",
-                    "-v"
-                ], capture_output=True, text=True, cwd="./")
-                
-                # 解析结果
-                test_result = {
-                    "test_case_id": test_case.id,
-                    "test_case_name": test_case.name,
-                    "status": "passed" if result.returncode == 0 else "failed",
-                    "output": result.stdout,
-                    "errors": result.stderr,
-                    "duration": 0  # 可以从JSON报告中提取
-                }
-                
-                # 尝试读取JSON报告获取详细信息
-                try:
-                    with open(f"./test-report-{test_case.id}.json", "r") as f:
-                        json_report = json.load(f)
-                        test_result["duration"] = json_report.get("duration", 0)
-                        test_result["details"] = json_report
-                except:
-                    pass
-                
-                results.append(test_result)
-                
+                await writer.close()
             except Exception as e:
-                results.append({
-                    "test_case_id": test_case.id,
-                    "test_case_name": test_case.name,
-                    "status": "error",
-                    "error": str(e)
+                print(f"Error writing test case results: {e}")
+            if execution is not None and execution.status not in ("pending", "running"):
+                self.event_bus.publish(execution_id, {
+                    "type": "execution_finished",
+                    "execution_id": execution_id,
+                    "status": execution.status,
+                    "counters": dict(handle.counters)
                 })
-        
-        return results
+                # 累加到每日汇总, 趋势接口不需要读取历史执行的结果, 复用的缓存结果不计入
+                await asyncio.to_thread(
+                    self._record_stats,
+                    execution_id,
+                    [result for result in handle.completed["api"] + handle.completed["ui"] if not result.get("cached_from")]
+                )
+                if cache_keys:
+                    await asyncio.to_thread(
+                        self._record_cache,
+                        execution_id,
+                        execution.project_id,
+                        execution.environment_id,
+                        cache_keys,
+                        handle.completed["api"],
+                        ttl
+                    )
+                if changed_paths:
+                    await asyncio.to_thread(
+                        self._record_impacts,
+                        execution.project_id,
+                        changed_paths,
+                        handle.completed["api"] + handle.completed["ui"]
+                    )
+            await asyncio.to_thread(db.close)
+            # 清理运行状态
+            self.running_executions.pop(execution_id, None)
+            self.result_writers.pop(execution_id, None)
+        return True
     
-    async def execute_ui_tests(self, execution_id: int, test_cases: List[TestCase], environment: Environment) -> List[Dict[str, Any]]:
-        """执行UI测试"""
-        results = []
+    async def execute_api_tests(
+        self,
+        execution_id: int,
+        test_cases: List[TestCase],
+        environment: Environment,
+        durations: Optional[Dict[int, float]] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> List[Dict[str, Any]]:
+        """执行API测试, 给出client时使用该连接池"""
+        if settings.API_EXECUTION_ENGINE == "pytest":
+            return await self._execute_api_tests_with_pytest(execution_id, test_cases, environment, durations)
         
-        async with async_playwright() as playwright:
-            browser = await playwright.chromium.launch(headless=True)
-            context = await browser.new_context()
-            
-            for test_case in test_cases:
-                page = await context.new_page()
+        feature = test_cases[0].project.name if test_cases and test_cases[0].project else "API Test"
+        
+        async with ApiTestRunner(
+            environment,
+            feature=feature,
+            results_dir=self.results_dir(execution_id),
+            client=client
+        ) as runner:
+            async def run_case(test_case: TestCase) -> Dict[str, Any]:
+                self._case_started(execution_id, test_case)
                 try:
-                    start_time = datetime.utcnow()
-                    
-                    # 执行UI测试步骤
-                    result = await self._execute_ui_steps(page, test_case, environment)
-                    
-                    end_time = datetime.utcnow()
-                    duration = (end_time - start_time).total_seconds()
-                    
-                    results.append({
-                        "test_case_id": test_case.id,
-                        "test_case_name": test_case.name,
-                        "status": result.get("status", "failed"),
-                        "details": result,
-                        "duration": duration
-                    })
-                    
+                    result = await runner.run_case(test_case)
                 except Exception as e:
-                    results.append({
+                    result = {
                         "test_case_id": test_case.id,
                         "test_case_name": test_case.name,
                         "status": "error",
                         "error": str(e)
-                    })
-                finally:
-                    await page.close()
+                    }
+                self._case_finished(execution_id, "api", result)
+                return result
             
-            await browser.close()
+            # 按并发上限并行执行, 结果保持用例顺序
+            return await run_bounded(
+                test_cases,
+                run_case,
+                self.limiter,
+                key=environment_key(environment),
+                limit=environment_limit(environment)
+            )
+    
+    async def _execute_api_tests_with_pytest(
+        self,
+        execution_id: int,
+        test_cases: List[TestCase],
+        environment: Environment,
+        durations: Optional[Dict[int, float]] = None
+    ) -> List[Dict[str, Any]]:
+        """在一次pytest会话中批量执行API测试(需要pytest/allure插件时使用)"""
+        handle = self.running_executions.get(execution_id)
+        feature = test_cases[0].project.name if test_cases and test_cases[0].project else "API Test"
+        
+        runner = PytestBatchRunner(
+            environment,
+            feature=feature,
+            results_dir=self.results_dir(execution_id),
+            durations=durations
+        )
+        results = await runner.run(
+            test_cases,
+            on_start=handle.add_process if handle else None,
+            on_exit=handle.discard_process if handle else None
+        )
+        
+        for result in results:
+            self._case_finished(execution_id, "api", result)
         
         return results
     
-    def _generate_api_test_file(self, test_case: TestCase, environment: Environment) -> Path:
-        """生成API测试文件"""
-        test_data = test_case.test_data or {}
-        base_url = environment.base_url or "http://localhost:8000"
-        
-        # 生成pytest测试代码
-        test_code = f"""
-import pytest
-import requests
-import allure
-
-@allure.feature("{test_case.project.name if hasattr(test_case, 'project') else 'API Test'}")
-@allure.story("{test_case.name}")
-def test_{test_case.id}():
-    \"\"\"自动生成的API测试: {test_case.name}\"\"\"
+    async def execute_ui_tests(self, execution_id: int, test_cases: List[TestCase], environment: Environment) -> List[Dict[str, Any]]:
+        """执行UI测试"""
+        runner = UiTestRunner(
+            environment,
+            self.browser_pool,
+            handle=self.running_executions.get(execution_id),
+            results_dir=self.results_dir(execution_id)
+        )
+        return await runner.run_cases(
+            test_cases,
+            on_start=lambda test_case: self._case_started(execution_id, test_case),
+            on_result=lambda result: self._case_finished(execution_id, "ui", result)
+        )
     
-    base_url = "{base_url}"
-    test_data = {json.dumps(test_data, indent=4)}
+    async def _run_with_retries(
+        self,
+        execution_id: int,
+        test_cases: List[TestCase],
+        run: Callable[[List[TestCase]], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """执行一批用例, 之后只重跑按重试策略需要重试的用例, 结果按用例顺序返回"""
+        handle = self.running_executions.get(execution_id)
+        results: Dict[int, Dict[str, Any]] = {}
+        pending = test_cases
+        while pending:
+            for result in await run(pending):
+                results[result["test_case_id"]] = result
+            if handle is None:
+                break
+            pending = [tc for tc in pending if tc.id in handle.retry_case_ids]
+            handle.retry_case_ids.difference_update(tc.id for tc in pending)
+            if pending:
+                # 退避期间不占用并发槽位, 瞬时故障(例如服务重启)有时间恢复
+                await asyncio.sleep(max(
+                    handle.retry_policies[tc.id].delay(len(handle.attempts[tc.id])) for tc in pending
+                ))
+        return [results[tc.id] for tc in test_cases]
     
-    # 执行HTTP请求
-    method = test_data.get("method", "GET").upper()
-    endpoint = test_data.get("endpoint", "/")
-    headers = test_data.get("headers", {{}})
-    params = test_data.get("params", {{}})
-    json_data = test_data.get("json", None)
+    @staticmethod
+    async def _claim_execution(
+        db: Session,
+        execution_id: int,
+        worker_id: Optional[str] = None,
+        owner_alive: Optional[Callable[[str], Awaitable[bool]]] = None
+    ) -> Optional[bool]:
+        """把执行标记为由本worker运行
+
+        返回True表示已认领, False表示不需要执行(已停止或已结束), None表示仍由其他存活的worker执行。
+        运行中的执行只有在所属worker失联(没有心跳)后才能重新认领; 没有记录worker或无法检查心跳时,
+        按start_time超过心跳过期时间判断。使用条件UPDATE, 与停止接口和其他worker之间不会同时认领。
+        数据库访问都在线程中执行。
+        """
+        def read_state():
+            row = db.query(TestExecution.status, TestExecution.worker_id).filter(TestExecution.id == execution_id).first()
+            db.commit()
+            return row
+
+        def claim(query, now: datetime) -> int:
+            claimed = query.update(
+                {"status": "running", "start_time": now, "worker_id": worker_id},
+                synchronize_session=False
+            )
+            db.commit()
+            return claimed
+
+        row = await asyncio.to_thread(read_state)
+        if row is None or row.status not in ("pending", "running"):
+            return False
+
+        now = datetime.utcnow()
+        query = db.query(TestExecution).filter(TestExecution.id == execution_id, TestExecution.status == row.status)
+        if row.status == "running":
+            if row.worker_id and owner_alive is not None:
+                if row.worker_id != worker_id and await owner_alive(row.worker_id):
+                    return None
+                query = query.filter(TestExecution.worker_id == row.worker_id)
+            else:
+                stale_before = now - timedelta(seconds=settings.WORKER_HEARTBEAT_TTL)
+                query = query.filter(TestExecution.start_time < stale_before)
+        claimed = await asyncio.to_thread(claim, query, now)
+        # 条件不满足: 执行刚被停止、结束或被其他worker认领, 由重试时重新判断
+        return True if claimed == 1 else None
     
-    url = base_url + endpoint
+    @staticmethod
+    def _load_execution(
+        db: Session,
+        execution_id: int,
+        test_case_ids: Optional[List[int]]
+    ) -> Tuple[TestExecution, List[TestCase]]:
+        """读取执行和要运行的用例(连同所属项目), 并清理重新入队前写入的部分结果"""
+        execution = db.query(TestExecution).options(joinedload(TestExecution.project)).filter(
+            TestExecution.id == execution_id
+        ).first()
+        db.query(TestCaseResult).filter(TestCaseResult.execution_id == execution_id).delete()
+        db.commit()
+        
+        query = db.query(TestCase).options(joinedload(TestCase.project)).filter(TestCase.project_id == execution.project_id)
+        if test_case_ids:
+            query = query.filter(TestCase.id.in_(test_case_ids))
+        return execution, query.all()
     
-    with allure.step(f"发送{{method}}请求到{{url}}"):
-        if method == "GET":
-            response = requests.get(url, headers=headers, params=params)
-        elif method == "POST":
-            response = requests.post(url, headers=headers, params=params, json=json_data)
-        elif method == "PUT":
-            response = requests.put(url, headers=headers, params=params, json=json_data)
-        elif method == "DELETE":
-            response = requests.delete(url, headers=headers, params=params)
-        else:
-            raise ValueError(f"Unsupported HTTP method: {{method}}")
+    @staticmethod
+    def _record_summary(execution: TestExecution, summary: Dict[str, Any]):
+        """写入执行汇总, 数量同时写入标量列供列表接口使用"""
+        execution.result = {"summary": summary}
+        execution.total_count = summary["total"]
+        execution.passed_count = summary["passed"]
+        execution.failed_count = summary["failed"]
+        execution.error_count = summary["error"]
+        execution.skipped_count = summary["skipped"]
+        execution.duration = summary["duration"]
     
-    # 验证响应
-    expected_status = test_data.get("expected_status", 200)
-    with allure.step(f"验证状态码为{{expected_status}}"):
-        assert response.status_code == expected_status, f"Expected {{expected_status}}, got {{response.status_code}}"
+    @staticmethod
+    def _record_stats(execution_id: int, results: List[Dict[str, Any]]):
+        """更新每日汇总, 失败不影响执行结果"""
+        db = SessionLocal()
+        try:
+            execution = db.query(TestExecution).filter(TestExecution.id == execution_id).first()
+            if execution:
+                record_execution_stats(db, execution, results)
+        except Exception as e:
+            print(f"Error recording execution stats: {e}")
+        finally:
+            db.close()
     
-    # 验证响应内容
-    if "expected_response" in test_data:
-        with allure.step("验证响应内容"):
-            expected = test_data["expected_response"]
-            actual = response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text
-            assert expected == actual, f"Expected {{expected}}, got {{actual}}"
-"""
-        
-        # 写入临时文件
-        test_file = Path(f"./temp_test_{test_case.id}_{uuid.uuid4().hex[:8]}.py")
-        test_file.write_text(test_code)
-        
-        return test_file
+    @staticmethod
+    def _record_cache(
+        execution_id: int,
+        project_id: int,
+        environment_id: int,
+        keys: Dict[int, str],
+        results: List[Dict[str, Any]],
+        ttl: int
+    ):
+        """缓存本次通过的结果, 失败不影响执行结果"""
+        db = SessionLocal()
+        try:
+            store_results(db, execution_id, project_id, environment_id, keys, results, ttl)
+        except Exception as e:
+            print(f"Error caching test results: {e}")
+        finally:
+            db.close()
     
-    async def _execute_ui_steps(self, page, test_case: TestCase, environment: Environment) -> Dict[str, Any]:
-        """执行UI测试步骤"""
-        test_data = test_case.test_data or {}
-        base_url = environment.base_url or "http://localhost:3000"
-        
-        steps = test_data.get("steps", [])
-        
+    @staticmethod
+    def _record_impacts(project_id: int, changed_paths: List[str], results: List[Dict[str, Any]]):
+        """从本次失败中学习变更路径与用例的关联"""
+        failed_case_ids = [result["test_case_id"] for result in results if result.get("status") in ("failed", "error")]
+        db = SessionLocal()
         try:
-            for i, step in enumerate(steps):
-                action = step.get("action")
-                selector = step.get("selector")
-                value = step.get("value")
-                expected = step.get("expected")
-                
-                if action == "goto":
-                    url = base_url + (value or "/")
-                    await page.goto(url)
-                
-                elif action == "fill":
-                    await page.fill(selector, value)
-                
-                elif action == "click":
-                    await page.click(selector)
-                
-                elif action == "wait":
-                    timeout = int(value or 5000)
-                    await page.wait_for_timeout(timeout)
-                
-                elif action == "wait_for_selector":
-                    timeout = int(value or 30000)
-                    await page.wait_for_selector(selector, timeout=timeout)
-                
-                elif action == "assert_text":
-                    element = await page.wait_for_selector(selector)
-                    text = await element.text_content()
-                    assert expected in text, f"Expected '{expected}' in '{text}'"
-                
-                elif action == "assert_url":
-                    current_url = page.url
-                    assert expected in current_url, f"Expected '{expected}' in '{current_url}'"
-                
-                elif action == "screenshot":
-                    screenshot_path = f"./screenshots/step_{i}_{uuid.uuid4().hex[:8]}.png"
-                    await page.screenshot(path=screenshot_path)
-            
-            return {"status": "passed", "message": "All steps completed successfully"}
-            
+            record_failure_impacts(db, project_id, changed_paths, failed_case_ids)
         except Exception as e:
-            # 截图保存错误状态
-            error_screenshot = f"./screenshots/error_{uuid.uuid4().hex[:8]}.png"
-            await page.screenshot(path=error_screenshot)
-            
-            return {
-                "status": "failed",
-                "error": str(e),
-                "screenshot": error_screenshot
-            }
+            print(f"Error recording test impacts: {e}")
+        finally:
+            db.close()
     
-    async def generate_test_report(self, execution_id: int) -> str:
-        """生成测试报告"""
+    @staticmethod
+    async def _select_impacted(
+        db: Session,
+        execution: TestExecution,
+        test_cases: List[TestCase],
+        changes: Dict[str, Any]
+    ) -> Tuple[List[TestCase], List[str]]:
+        """只保留受变更影响的用例, 选择结果写入execution.selection
+
+        无法计算变更(例如git失败)或变更匹配IMPACT_RUN_ALL_PATTERNS时执行全部用例。
+        """
         try:
-            report_path = f"./allure-reports/execution-{execution_id}"
-            
-            # 生成Allure报告
-            result = subprocess.run([
-                "allure", "generate",
-                "./allure-results",
-                "-o", report_path,
-                "--clean"
-            ], capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                return report_path
-            else:
-                return None
-                
+            changed_paths = await resolve_changed_paths(execution.project.repository_url, changes)
         except Exception as e:
-            print(f"Error generating report: {e}")
-            return None
+            execution.selection = selection_summary(changes, [], len(test_cases), {}, error=str(e))
+            return test_cases, []
+        
+        run_all = run_all_reason(changed_paths)
+        if run_all:
+            execution.selection = selection_summary(changes, changed_paths, len(test_cases), {}, run_all=run_all)
+            return test_cases, changed_paths
+        
+        learned = await asyncio.to_thread(load_learned, db, execution.project_id, changed_paths)
+        selected = select_impacted(test_cases, changed_paths, learned)
+        execution.selection = selection_summary(changes, changed_paths, len(test_cases), selected)
+        return [tc for tc in test_cases if tc.id in selected], changed_paths
+    
+    def _reuse_cached(
+        self,
+        execution_id: int,
+        test_cases: List[TestCase],
+        cached: Dict[int, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """把缓存结果作为本次执行的结果, 同样写入Allure结果并推送用例事件"""
+        feature = test_cases[0].project.name if test_cases and test_cases[0].project else "API Test"
+        results = []
+        for test_case in test_cases:
+            result = cached[test_case.id]
+            self._case_started(execution_id, test_case)
+            now = time.time()
+            write_allure_result(
+                self.results_dir(execution_id),
+                name=test_case.name,
+                full_name=f"api.test_{test_case.id}",
+                status="passed",
+                start=now,
+                stop=now,
+                labels={"feature": feature, "story": test_case.name, "suite": "api", "tag": "cached"},
+                description=f"缓存结果, 来自执行 {result['cached_from']}"
+            )
+            self._case_finished(execution_id, "api", result)
+            results.append(result)
+        return results
+    
+    def _case_started(self, execution_id: int, test_case: TestCase):
+        """单个用例开始执行"""
+        self.event_bus.publish(execution_id, {
+            "type": "case_started",
+            "execution_id": execution_id,
+            "test_case_id": test_case.id,
+            "test_case_name": test_case.name
+        })
+    
+    def _case_finished(self, execution_id: int, test_type: str, result: Dict[str, Any]):
+        """单个用例执行完成, 需要重试时只记录本次执行"""
+        handle = self.running_executions.get(execution_id)
+        if handle and handle.cancelled:
+            # 停止后才返回的结果(进程被结束、上下文被关闭)不是用例的真实结果, 用例记为已取消
+            return
+        if handle:
+            case_id = result["test_case_id"]
+            attempts = handle.attempts.get(case_id, [])
+            attempt = len(attempts) + 1
+            policy = handle.retry_policies.get(case_id)
+            if policy and policy.should_retry(result, attempt):
+                handle.attempts[case_id] = attempts + [attempt_record(result, attempt)]
+                handle.retry_case_ids.add(case_id)
+                self.event_bus.publish(execution_id, {
+                    "type": "case_retry",
+                    "execution_id": execution_id,
+                    "test_case_id": case_id,
+                    "test_case_name": result.get("test_case_name"),
+                    "status": result.get("status"),
+                    "attempt": attempt,
+                    "delay": policy.delay(attempt)
+                })
+                return
+            if attempts:
+                # 重试后通过的用例标记为不稳定
+                result["attempt_history"] = attempts + [attempt_record(result, attempt)]
+                result["attempts"] = attempt
+                result["flaky"] = result.get("status") == "passed"
+            handle.record(test_type, result)
+        writer = self.result_writers.get(execution_id)
+        if writer:
+            writer.add(test_type, result)
+        self.event_bus.publish(execution_id, {
+            "type": "case_finished",
+            "execution_id": execution_id,
+            "test_case_id": result["test_case_id"],
+            "test_case_name": result.get("test_case_name"),
+            "status": result.get("status"),
+            "duration": result.get("duration"),
+            "attempts": result.get("attempts", 1),
+            "flaky": result.get("flaky", False),
+            "cached_from": result.get("cached_from"),
+            "counters": dict(handle.counters) if handle else None
+        })
+    
+    def results_dir(self, execution_id: int) -> str:
+        """每个执行独立的Allure结果目录, 并发执行互不影响"""
+        return f"{settings.ALLURE_RESULTS_DIR}/execution-{execution_id}"
+    
+    async def generate_test_report(self, execution_id: int) -> Optional[str]:
+        """生成测试报告(只包含本次执行的结果)"""
+        report_path = f"{settings.ALLURE_REPORTS_DIR}/execution-{execution_id}"
+        return await generate_allure_report(self.results_dir(execution_id), report_path, timeout=settings.REPORT_TIMEOUT)
+    
+    def _schedule_report(self, execution_id: int):
+        """在后台生成报告"""
+        task = asyncio.create_task(self._generate_report_in_background(execution_id))
+        self.report_tasks.add(task)
+        task.add_done_callback(self.report_tasks.discard)
+    
+    async def _generate_report_in_background(self, execution_id: int):
+        """在有限的并发内生成报告, 完成后回写report_path"""
+        async with self.report_semaphore:
+            report_path = await self.generate_test_report(execution_id)
+        if not report_path:
+            return
+        await asyncio.to_thread(self._record_report_path, execution_id, report_path)
+    
+    @staticmethod
+    def _record_report_path(execution_id: int, report_path: str):
+        """回写报告路径"""
+        db = SessionLocal()
+        try:
+            execution = db.query(TestExecution).filter(TestExecution.id == execution_id).first()
+            if execution:
+                execution.report_path = report_path
+                db.commit()
+        finally:
+            db.close()
     
-    async def stop_execution(self, execution_id: int):
-        """停止测试执行"""
-        if execution_id in self.running_executions:
-            # 这里可以实现停止逻辑，比如杀死进程等
-            self.running_executions[execution_id]["stopped"] = True
+    async def stop_execution(self, execution_id: int) -> bool:
+        """停止测试执行, 结束其子进程和浏览器上下文; 执行不在本进程时返回False"""
+        handle = self.running_executions.get(execution_id)
+        if handle is None:
+            return False
+        await handle.cancel()
+        return True
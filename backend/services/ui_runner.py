@@ -0,0 +1,169 @@
+import time
+import uuid
+from typing import List, Dict, Any, Optional, Callable
+
+from playwright.async_api import Page
+
+from core.config import settings
+from models.test_case import TestCase
+from models.environment import Environment
+from services.browser_pool import BrowserPool
+from services.cancellation import ExecutionHandle
+from services.scheduler import run_bounded
+from utils.allure_utils import write_allure_result
+
+# Allure状态映射
+ALLURE_STATUS = {"passed": "passed", "failed": "failed", "error": "broken"}
+
+
+class UiTestRunner:
+    """并行UI测试执行器
+
+    从常驻浏览器池租用浏览器上下文, 每个用例在独立的上下文中执行(cookie/localStorage互不影响),
+    进程内所有执行同时最多有UI_CONTEXT_POOL_SIZE个上下文处于活动状态。
+    """
+
+    def __init__(
+        self,
+        environment: Optional[Environment],
+        browser_pool: BrowserPool,
+        handle: Optional[ExecutionHandle] = None,
+        results_dir: Optional[str] = None
+    ):
+        self.environment = environment
+        self.browser_pool = browser_pool
+        self.handle = handle
+        self.results_dir = results_dir or settings.ALLURE_RESULTS_DIR
+        self.base_url = (environment.base_url if environment else None) or "http://localhost:3000"
+
+    async def run_cases(
+        self,
+        test_cases: List[TestCase],
+        on_start: Optional[Callable[[TestCase], None]] = None,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """在上下文池中并行执行用例, 结果按用例顺序返回"""
+        async def run_one(test_case: TestCase) -> Dict[str, Any]:
+            if on_start:
+                on_start(test_case)
+            result = await self.run_case(test_case)
+            if on_result:
+                on_result(result)
+            return result
+
+        # 使用浏览器池共享的限制, 多个执行同时运行时上下文总数不超过上限
+        return await run_bounded(test_cases, run_one, self.browser_pool.limiter)
+
+    async def run_case(self, test_case: TestCase) -> Dict[str, Any]:
+        """在租用的浏览器上下文中执行单个UI用例"""
+        try:
+            async with self.browser_pool.lease_context() as context:
+                # 登记上下文, 停止执行时可直接关闭
+                if self.handle:
+                    self.handle.add_context(context)
+                try:
+                    return await self._run_in_context(context, test_case)
+                finally:
+                    if self.handle:
+                        self.handle.discard_context(context)
+        except Exception as e:
+            return {
+                "test_case_id": test_case.id,
+                "test_case_name": test_case.name,
+                "status": "error",
+                "error": str(e)
+            }
+
+    async def _run_in_context(self, context, test_case: TestCase) -> Dict[str, Any]:
+        """在给定上下文中打开页面并执行用例"""
+        page = await context.new_page()
+        try:
+            start = time.time()
+
+            # 执行UI测试步骤
+            result = await self.execute_steps(page, test_case)
+
+            stop = time.time()
+            status = result.get("status", "failed")
+
+            write_allure_result(
+                self.results_dir,
+                name=test_case.name,
+                full_name=f"ui.test_{test_case.id}",
+                status=ALLURE_STATUS.get(status, "broken"),
+                start=start,
+                stop=stop,
+                labels={"feature": "UI Test", "story": test_case.name, "suite": "ui"},
+                message=result.get("error")
+            )
+
+            return {
+                "test_case_id": test_case.id,
+                "test_case_name": test_case.name,
+                "status": status,
+                "details": result,
+                "duration": stop - start
+            }
+
+        finally:
+            await page.close()
+
+    async def execute_steps(self, page: Page, test_case: TestCase) -> Dict[str, Any]:
+        """执行UI测试步骤"""
+        test_data = test_case.test_data or {}
+        base_url = self.base_url
+
+        steps = test_data.get("steps", [])
+
+        try:
+            for i, step in enumerate(steps):
+                action = step.get("action")
+                selector = step.get("selector")
+                value = step.get("value")
+                expected = step.get("expected")
+
+                if action == "goto":
+                    url = base_url + (value or "/")
+                    await page.goto(url)
+
+                elif action == "fill":
+                    await page.fill(selector, value)
+
+                elif action == "click":
+                    await page.click(selector)
+
+                elif action == "wait":
+                    timeout = int(value or 5000)
+                    await page.wait_for_timeout(timeout)
+
+                elif action == "wait_for_selector":
+                    timeout = int(value or 30000)
+                    await page.wait_for_selector(selector, timeout=timeout)
+
+                elif action == "assert_text":
+                    element = await page.wait_for_selector(selector)
+                    text = await element.text_content()
+                    if expected not in (text or ""):
+                        raise AssertionError(f"Expected '{expected}' in '{text}'")
+
+                elif action == "assert_url":
+                    current_url = page.url
+                    if expected not in current_url:
+                        raise AssertionError(f"Expected '{expected}' in '{current_url}'")
+
+                elif action == "screenshot":
+                    screenshot_path = f"./screenshots/step_{i}_{uuid.uuid4().hex[:8]}.png"
+                    await page.screenshot(path=screenshot_path)
+
+            return {"status": "passed", "message": "All steps completed successfully"}
+
+        except Exception as e:
+            # 截图保存错误状态
+            error_screenshot = f"./screenshots/error_{uuid.uuid4().hex[:8]}.png"
+            await page.screenshot(path=error_screenshot)
+
+            return {
+                "status": "failed",
+                "error": str(e),
+                "screenshot": error_screenshot
+            }
@@ -1,25 +1,31 @@
-import subprocess
 import json
+import uuid
+import hashlib
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 
-def generate_allure_report(results_dir: str, output_dir: str) -> Optional[str]:
-    """生成Allure报告"""
+from utils.process_utils import run_process
+
+async def generate_allure_report(results_dir: str, output_dir: str, timeout: Optional[float] = None) -> Optional[str]:
+    """生成Allure报告(异步执行allure命令, 不阻塞事件循环)"""
     try:
         # 确保目录存在
         Path(results_dir).mkdir(parents=True, exist_ok=True)
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
         # 生成Allure报告
-        result = subprocess.run([
+        result = await run_process([
             "allure", "generate",
             results_dir,
             "-o", output_dir,
             "--clean"
-        ], capture_output=True, text=True)
+        ], timeout=timeout)
         
         if result.returncode == 0:
             return output_dir
+        elif result.timed_out:
+            print(f"Allure generation timed out after {timeout}s")
+            return None
         else:
             print(f"Allure generation failed: {result.stderr}")
             return None
@@ -41,29 +47,34 @@ def parse_allure_results(results_dir: str) -> Dict[str, Any]:
     }
     
     try:
-        # 读取测试结果文件
+        # 读取测试结果文件, 重试的用例(historyId相同)只统计最后一次执行
+        latest = {}
         for result_file in results_path.glob("*-result.json"):
             with open(result_file, 'r', encoding='utf-8') as f:
                 test_result = json.load(f)
-                
-                summary["total"] += 1
-                status = test_result.get("status", "unknown")
-                
-                if status == "passed":
-                    summary["passed"] += 1
-                elif status == "failed":
-                    summary["failed"] += 1
-                elif status == "broken":
-                    summary["broken"] += 1
-                elif status == "skipped":
-                    summary["skipped"] += 1
-                
-                summary["tests"].append({
-                    "name": test_result.get("name", "Unknown"),
-                    "status": status,
-                    "duration": test_result.get("stop", 0) - test_result.get("start", 0),
-                    "uuid": test_result.get("uuid")
-                })
+            key = test_result.get("historyId") or test_result.get("uuid") or result_file.name
+            if key not in latest or test_result.get("stop", 0) >= latest[key].get("stop", 0):
+                latest[key] = test_result
+        
+        for test_result in latest.values():
+            summary["total"] += 1
+            status = test_result.get("status", "unknown")
+            
+            if status == "passed":
+                summary["passed"] += 1
+            elif status == "failed":
+                summary["failed"] += 1
+            elif status == "broken":
+                summary["broken"] += 1
+            elif status == "skipped":
+                summary["skipped"] += 1
+            
+            summary["tests"].append({
+                "name": test_result.get("name", "Unknown"),
+                "status": status,
+                "duration": test_result.get("stop", 0) - test_result.get("start", 0),
+                "uuid": test_result.get("uuid")
+            })
     
     except Exception as e:
         print(f"Error parsing Allure results: {e}")
@@ -78,3 +89,56 @@ def create_allure_environment_properties(environment_config: Dict[str, Any]) ->
         properties.append(f"{key}={value}")
     
     return "\n".join(properties)
+
+def write_allure_result(
+    results_dir: str,
+    name: str,
+    full_name: str,
+    status: str,
+    start: float,
+    stop: float,
+    labels: Optional[Dict[str, str]] = None,
+    steps: Optional[List[Dict[str, Any]]] = None,
+    message: Optional[str] = None,
+    description: Optional[str] = None
+) -> str:
+    """写入单条Allure结果文件
+
+    start/stop为秒级时间戳, status取值为passed/failed/broken/skipped。
+    返回写入的结果文件路径。
+    """
+    results_path = Path(results_dir)
+    results_path.mkdir(parents=True, exist_ok=True)
+
+    result_uuid = str(uuid.uuid4())
+    result = {
+        "uuid": result_uuid,
+        "historyId": hashlib.md5(full_name.encode("utf-8")).hexdigest(),
+        "name": name,
+        "fullName": full_name,
+        "status": status,
+        "stage": "finished",
+        "start": int(start * 1000),
+        "stop": int(stop * 1000),
+        "labels": [{"name": key, "value": value} for key, value in (labels or {}).items()],
+        "steps": [
+            {
+                "name": step["name"],
+                "status": step.get("status", "passed"),
+                "stage": "finished",
+                "start": int(step["start"] * 1000),
+                "stop": int(step["stop"] * 1000)
+            }
+            for step in (steps or [])
+        ]
+    }
+    if description:
+        result["description"] = description
+    if message:
+        result["statusDetails"] = {"message": message}
+
+    result_file = results_path / f"{result_uuid}-result.json"
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+
+    return str(result_file)
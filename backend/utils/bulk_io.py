@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+import tempfile
+from typing import Dict, Any, Iterator, Tuple, List, Optional
+
+from fastapi import HTTPException, Request
+
+# 请求体超过该大小后写入临时文件, 避免大文件常驻内存
+SPOOL_MAX_MEMORY = 1024 * 1024
+
+# CSV导入导出的列, test_data为JSON字符串
+CSV_COLUMNS = ["id", "name", "type", "description", "test_data"]
+
+FORMAT_MEDIA_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def detect_format(request: Request, fmt: Optional[str] = None) -> str:
+    """根据format参数或Content-Type判断格式(jsonl/csv)"""
+    if fmt:
+        if fmt not in FORMAT_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail="Unsupported format, use jsonl or csv")
+        return fmt
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/jsonl", "application/json-lines", "application/json", ""):
+        return "jsonl"
+    raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type}")
+
+
+async def spool_request(request: Request) -> tempfile.SpooledTemporaryFile:
+    """把请求体流式写入临时文件"""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def iter_records(spool, fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """逐条读取记录, 返回(行号, 记录); 无法解析的行抛出ValueError"""
+    text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            line = reader.line_num
+            if None in record:
+                raise ValueError(f"line {line}: too many columns")
+            record = {key: value for key, value in record.items() if value not in (None, "")}
+            if "test_data" in record:
+                try:
+                    record["test_data"] = json.loads(record["test_data"])
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"line {line}: invalid test_data JSON: {e}")
+            yield line, record
+        return
+
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {line}: invalid JSON: {e}")
+        if not isinstance(record, dict):
+            raise ValueError(f"line {line}: expected a JSON object")
+        yield line, record
+
+
+def format_jsonl(rows: List[Dict[str, Any]]) -> str:
+    return "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows)
+
+
+def format_csv(rows: List[Dict[str, Any]], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+    if header:
+        writer.writeheader()
+    for row in rows:
+        writer.writerow({
+            **row,
+            "test_data": json.dumps(row["test_data"], ensure_ascii=False) if row.get("test_data") is not None else ""
+        })
+    return buffer.getvalue()
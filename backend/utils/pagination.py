@@ -0,0 +1,66 @@
+import base64
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 游标响应头, 列表接口的响应体保持为数组
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """把最后一行的键编码为不透明的游标"""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: List[str]) -> Dict[str, Any]:
+    """解析游标, 格式不正确时返回400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return {key: data[key] for key in keys}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_condition(columns: List[Any], values: List[Any], descending: bool = False):
+    """生成"排序键在游标之后"的条件, 等价于行值比较(a, b) > (x, y)"""
+    conditions = []
+    for index, column in enumerate(columns):
+        after = column < values[index] if descending else column > values[index]
+        equal = [columns[i] == values[i] for i in range(index)]
+        conditions.append(and_(*equal, after))
+    return or_(*conditions)
+
+
+async def estimate_count(db: AsyncSession, query) -> Optional[int]:
+    """使用PostgreSQL查询计划的行数估计, 其他数据库返回None"""
+    connection = await db.connection()
+    if connection.dialect.name != "postgresql":
+        return None
+
+    compiled = query.compile(dialect=connection.dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(db: AsyncSession, query, estimate_threshold: int) -> Tuple[int, bool]:
+    """统计查询的行数
+
+    估计值达到阈值时直接返回估计值(大表上精确COUNT需要扫描全部匹配行),
+    否则执行精确COUNT。返回(行数, 是否为估计值)。
+    """
+    estimate = await estimate_count(db, query)
+    if estimate is not None and estimate >= estimate_threshold:
+        return estimate, True
+    count = await db.scalar(select(func.count()).select_from(query.subquery()))
+    return count, False
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import signal
+from typing import List, Optional, Callable
+
+# 每个输出流默认保留的最大字节数
+DEFAULT_OUTPUT_LIMIT = 1024 * 1024
+
+
+class ProcessResult:
+    """外部进程执行结果"""
+
+    def __init__(self, returncode: Optional[int], stdout: str, stderr: str, timed_out: bool = False):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timed_out = timed_out
+
+
+class _TailBuffer:
+    """只保留最后limit字节的输出缓冲区(测试输出的结尾通常包含汇总信息)"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.data = bytearray()
+        self.dropped = 0
+
+    def write(self, chunk: bytes):
+        self.data.extend(chunk)
+        overflow = len(self.data) - self.limit
+        if overflow > 0:
+            del self.data[:overflow]
+            self.dropped += overflow
+
+    def text(self) -> str:
+        text = self.data.decode("utf-8", errors="replace")
+        if self.dropped:
+            return f"...[truncated {self.dropped} bytes]\n{text}"
+        return text
+
+
+async def _pump(stream: asyncio.StreamReader, buffer: _TailBuffer):
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        buffer.write(chunk)
+
+
+def kill_process(process: asyncio.subprocess.Process, sig: int = signal.SIGKILL):
+    """向进程及其子进程(进程组)发送信号, 默认强制结束"""
+    if process.returncode is not None:
+        return
+    try:
+        os.killpg(process.pid, sig)
+    except (ProcessLookupError, PermissionError, AttributeError):
+        try:
+            process.send_signal(sig)
+        except ProcessLookupError:
+            pass
+
+
+async def run_process(
+    args: List[str],
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = None,
+    max_output: int = DEFAULT_OUTPUT_LIMIT,
+    on_start: Optional[Callable[[asyncio.subprocess.Process], None]] = None,
+    on_exit: Optional[Callable[[asyncio.subprocess.Process], None]] = None,
+    interrupt_grace: float = 0
+) -> ProcessResult:
+    """异步执行外部进程
+
+    流式读取stdout/stderr并限制保留大小, 超时后结束整个进程组;
+    所在任务被取消时同样会结束进程后再抛出CancelledError。
+    on_start/on_exit在进程启动后和结束后调用, 用于登记运行中的进程。
+    interrupt_grace大于0时, 超时后先发送SIGINT并等待该秒数让进程自行收尾(例如pytest写出报告),
+    仍未退出再强制结束。
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True
+    )
+    if on_start:
+        on_start(process)
+
+    stdout = _TailBuffer(max_output)
+    stderr = _TailBuffer(max_output)
+    timed_out = False
+
+    async def communicate():
+        await asyncio.gather(_pump(process.stdout, stdout), _pump(process.stderr, stderr))
+        await process.wait()
+
+    try:
+        try:
+            await asyncio.wait_for(communicate(), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            if interrupt_grace:
+                kill_process(process, signal.SIGINT)
+                try:
+                    await asyncio.wait_for(communicate(), interrupt_grace)
+                except asyncio.TimeoutError:
+                    pass
+            kill_process(process)
+            await process.wait()
+    except asyncio.CancelledError:
+        kill_process(process)
+        await process.wait()
+        raise
+    finally:
+        if on_exit:
+            on_exit(process)
+
+    return ProcessResult(process.returncode, stdout.text(), stderr.text(), timed_out)
@@ -0,0 +1,35 @@
+"""
+测试执行worker入口
+
+从执行任务队列(Redis)消费任务, 可在多个节点上启动多个实例:
+    python worker.py
+"""
+import asyncio
+import signal
+
+from core.config import settings
+from services.job_queue import create_job_queue
+from services.execution_worker import ExecutionWorker
+from services.test_service import TestExecutionService
+
+
+async def main():
+    queue = create_job_queue()
+    service = TestExecutionService()
+    worker = ExecutionWorker(queue, service)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    await service.startup()
+    print(f"Worker {worker.worker_id} started (concurrency={worker.concurrency}, queue={settings.EXECUTION_QUEUE_BACKEND})")
+    try:
+        await worker.run()
+    finally:
+        await service.shutdown()
+        await queue.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
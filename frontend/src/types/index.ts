@@ -48,10 +48,18 @@ export interface TestExecution {
   id: number;
   projectId: number;
   environmentId: number;
-  status: 'pending' | 'running' | 'passed' | 'failed';
+  parentId?: number;
+  status: 'pending' | 'running' | 'passed' | 'failed' | 'cancelled';
   startTime?: string;
   endTime?: string;
   result?: Record<string, any>;
+  summary?: Record<string, any>;
+  totalCount?: number;
+  passedCount?: number;
+  failedCount?: number;
+  errorCount?: number;
+  skippedCount?: number;
+  duration?: number;
   reportPath?: string;
   createdBy: number;
   createdAt: string;
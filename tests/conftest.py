@@ -7,13 +7,15 @@ from fastapi.testclient import TestClient
 import sys
 import os
 
-# 添加项目根目录到Python路径
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 添加后端目录到Python路径, 与应用使用相同的导入根(core、models、services)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
 
-from backend.main import app
-from backend.core.database import SessionLocal, engine
-from backend.models.user import User
-from backend.core.security import get_password_hash
+from main import app
+from core.database import SessionLocal, engine
+from models.user import User
+from models.project import Project
+from models.environment import Environment
+from core.security import get_password_hash
 
 # 测试数据库配置
 @pytest.fixture(scope="session")
@@ -74,6 +76,17 @@ def admin_user(db_session):
     db_session.refresh(user)
     return user
 
+@pytest.fixture
+def test_environment(db_session, test_user):
+    """测试用户创建的项目及其环境"""
+    project = Project(name="测试项目", created_by=test_user.id)
+    db_session.add(project)
+    db_session.flush()
+    environment = Environment(project_id=project.id, name="test", base_url="http://127.0.0.1:9", config={})
+    db_session.add(environment)
+    db_session.commit()
+    return environment
+
 @pytest.fixture(scope="session")
 async def browser() -> AsyncGenerator[Browser, None]:
     """Playwright浏览器实例"""
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+import allure
+
+from models.test_case import TestCase
+from models.test_case_daily_stats import TestCaseDailyStats
+from models.test_execution import TestExecution
+from services.analytics import (
+    DURATION_BUCKETS,
+    add_to_histogram,
+    merge_histograms,
+    histogram_percentile,
+    record_execution_stats,
+    summarize_case_stats
+)
+
+
+@allure.feature("统计分析")
+class TestDurationHistogram:
+
+    @allure.story("分桶")
+    @pytest.mark.unit
+    def test_add_to_histogram(self):
+        """测试耗时落入上界不小于它的第一个桶, 超出最大上界的进入最后一个桶"""
+        histogram = add_to_histogram(None, [0.05, 0.1, 3, 10000])
+
+        assert len(histogram) == len(DURATION_BUCKETS) + 1
+        assert histogram[0] == 2
+        assert histogram[DURATION_BUCKETS.index(5)] == 1
+        assert histogram[-1] == 1
+        assert sum(merge_histograms([histogram, histogram])) == 8
+
+    @allure.story("分位数")
+    @pytest.mark.unit
+    def test_histogram_percentile(self):
+        """测试分位数在桶内插值"""
+        histogram = add_to_histogram(None, [0.6] * 10)
+
+        assert histogram_percentile(histogram, 0.5) == pytest.approx(0.75)
+        assert histogram_percentile(histogram, 1.0) == pytest.approx(1.0)
+        assert histogram_percentile(add_to_histogram(None, []), 0.5) is None
+
+
+@allure.feature("统计分析")
+class TestCaseFlips:
+
+    @pytest.fixture
+    def record(self, db_session, test_environment):
+        """把一个用例的结果依次记录为同一天的多次执行, 返回该用例的每日汇总"""
+        test_case = TestCase(project_id=test_environment.project_id, name="用例", type="api", test_data={})
+        db_session.add(test_case)
+        db_session.commit()
+
+        def record(*results):
+            for result in results:
+                execution = TestExecution(
+                    project_id=test_environment.project_id,
+                    environment_id=test_environment.id,
+                    status=result["status"],
+                    start_time=datetime(2026, 1, 1, 12)
+                )
+                db_session.add(execution)
+                db_session.commit()
+                record_execution_stats(db_session, execution, [{"test_case_id": test_case.id, "duration": 1, **result}])
+            return db_session.query(TestCaseDailyStats).filter(TestCaseDailyStats.test_case_id == test_case.id).all()
+
+        return record
+
+    @allure.story("结果切换")
+    @pytest.mark.unit
+    def test_flips_between_runs(self, record):
+        """测试相邻执行的结果切换"""
+        rows = record({"status": "passed"}, {"status": "failed"}, {"status": "error"}, {"status": "passed"})
+
+        stats = summarize_case_stats(rows)
+        assert (stats["runs"], stats["flips"], stats["retries"]) == (4, 2, 0)
+        assert stats["flakiness"] == pytest.approx(2 / 3)
+
+    @allure.story("结果切换")
+    @pytest.mark.unit
+    def test_retry_recovered_results_count_as_flips(self, record):
+        """测试重试后才通过的结果计入切换, 重试也计入切换率的分母"""
+        rows = record(
+            {"status": "passed"},
+            {"status": "passed", "flaky": True, "attempts": 2, "attempt_history": [
+                {"attempt": 1, "status": "failed"}, {"attempt": 2, "status": "passed"}
+            ]},
+            {"status": "failed", "attempts": 2, "attempt_history": [
+                {"attempt": 1, "status": "error"}, {"attempt": 2, "status": "failed"}
+            ]}
+        )
+
+        stats = summarize_case_stats(rows)
+        assert (stats["runs"], stats["passes"], stats["flips"], stats["retries"]) == (3, 2, 3, 2)
+        assert stats["flakiness"] == pytest.approx(3 / 4)
+        assert rows[0].last_status == "failed"
@@ -0,0 +1,124 @@
+import os
+import sys
+import threading
+import json
+import pytest
+import allure
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from types import SimpleNamespace
+
+from services.api_runner import ApiTestRunner
+from services.http_client import HttpOptions
+from utils.process_utils import run_process
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """返回固定JSON的测试服务"""
+
+    def do_GET(self):
+        body = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def http_server():
+    """本地HTTP服务"""
+    server = HTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def _case(case_id, test_data):
+    return SimpleNamespace(id=case_id, name=f"case-{case_id}", test_data=test_data)
+
+
+@allure.feature("API执行引擎")
+class TestApiRunner:
+
+    @allure.story("进程内执行")
+    @pytest.mark.unit
+    async def test_run_case_passed(self, http_server, tmp_path):
+        """测试断言通过的用例"""
+        environment = SimpleNamespace(base_url=http_server)
+        async with ApiTestRunner(environment, results_dir=str(tmp_path)) as runner:
+            result = await runner.run_case(_case(1, {
+                "endpoint": "/ping",
+                "expected_status": 200,
+                "expected_response": {"ok": True}
+            }))
+
+        assert result["status"] == "passed"
+        assert result["test_case_id"] == 1
+        assert len(list(tmp_path.glob("*-result.json"))) == 1
+
+    @allure.story("进程内执行")
+    @pytest.mark.unit
+    async def test_run_case_failed(self, http_server, tmp_path):
+        """测试状态码断言失败的用例"""
+        environment = SimpleNamespace(base_url=http_server)
+        async with ApiTestRunner(environment, results_dir=str(tmp_path)) as runner:
+            result = await runner.run_case(_case(2, {"endpoint": "/ping", "expected_status": 201}))
+
+        assert result["status"] == "failed"
+        assert "Expected 201" in result["errors"]
+
+    @allure.story("进程内执行")
+    @pytest.mark.unit
+    async def test_assertions_survive_optimize(self, http_server, tmp_path):
+        """测试python -O运行时断言仍然生效"""
+        script = (
+            "import asyncio, sys\n"
+            "from types import SimpleNamespace\n"
+            "from services.api_runner import ApiTestRunner\n"
+            "async def main():\n"
+            "    case = SimpleNamespace(id=1, name='case-1', test_data={'endpoint': '/ping', 'expected_status': 201})\n"
+            "    async with ApiTestRunner(SimpleNamespace(base_url=sys.argv[1]), results_dir=sys.argv[2]) as runner:\n"
+            "        print((await runner.run_case(case))['status'])\n"
+            "asyncio.run(main())\n"
+        )
+        backend = os.path.dirname(os.path.dirname(sys.modules[ApiTestRunner.__module__].__file__))
+
+        result = await run_process(
+            [sys.executable, "-O", "-c", script, http_server, str(tmp_path)],
+            cwd=backend,
+            timeout=60
+        )
+
+        assert result.stdout.strip() == "failed", result.stderr
+
+    @allure.story("进程内执行")
+    @pytest.mark.unit
+    async def test_unsupported_method(self, tmp_path):
+        """测试不支持的HTTP方法"""
+        environment = SimpleNamespace(base_url="http://127.0.0.1:1")
+        async with ApiTestRunner(environment, results_dir=str(tmp_path)) as runner:
+            result = await runner.run_case(_case(3, {"method": "TRACE"}))
+
+        assert result["status"] == "error"
+        assert "Unsupported HTTP method" in result["errors"]
+
+    @allure.story("连接池")
+    @pytest.mark.unit
+    async def test_environment_http_options(self, http_server, tmp_path):
+        """测试环境配置覆盖连接池参数, 传入的连接池在执行器退出后仍可使用"""
+        environment = SimpleNamespace(base_url=http_server, config={"http": {"max_connections": 2, "timeout": 5}})
+        options = HttpOptions.for_environment(environment)
+        assert options.max_connections == 2
+        assert options.timeout == 5
+        assert options.requests_options()["pool_maxsize"] == 2
+
+        async with options.async_client() as client:
+            for case_id in (1, 2):
+                async with ApiTestRunner(environment, results_dir=str(tmp_path), client=client) as runner:
+                    result = await runner.run_case(_case(case_id, {"endpoint": "/ping"}))
+                assert result["status"] == "passed"
+            assert not client.is_closed
@@ -0,0 +1,33 @@
+import pytest
+import allure
+
+from services.artifact_store import LocalArtifactStore
+
+
+@allure.feature("产物存储")
+class TestArtifactStore:
+
+    @allure.story("内容寻址")
+    @pytest.mark.unit
+    def test_put_is_content_addressed(self, tmp_path):
+        """测试相同内容只保存一份并可以完整读回"""
+        store = LocalArtifactStore(str(tmp_path))
+        data = b"line\n" * 100000
+
+        key = store.put(data)
+
+        assert store.put(data) == key
+        assert store.exists(key)
+        assert len(list(tmp_path.rglob("*.gz"))) == 1
+        assert b"".join(store.open(key)) == data
+
+    @allure.story("无效键")
+    @pytest.mark.unit
+    @pytest.mark.parametrize("key", ["0" * 64, "../../etc/passwd"])
+    def test_open_missing_or_invalid_key(self, tmp_path, key):
+        """测试不存在或格式不正确的键"""
+        store = LocalArtifactStore(str(tmp_path))
+
+        assert not store.exists(key)
+        with pytest.raises(KeyError):
+            store.open(key)
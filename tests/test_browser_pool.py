@@ -0,0 +1,209 @@
+import asyncio
+
+import pytest
+import allure
+
+from models.test_case import TestCase
+from services import browser_pool
+from services.browser_pool import BrowserPool
+from services.ui_runner import UiTestRunner
+
+
+class FakePage:
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.url = "about:blank"
+
+    async def wait_for_timeout(self, timeout):
+        await asyncio.sleep(timeout / 1000)
+
+    async def close(self):
+        pass
+
+
+class FakeContext:
+
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        return FakePage(self.browser)
+
+    async def close(self):
+        self.browser.contexts.remove(self)
+
+
+class FakeBrowser:
+    """模拟playwright的Browser, 记录打开的上下文"""
+
+    def __init__(self, playwright):
+        self.playwright = playwright
+        self.connected = True
+        self.closed = False
+        self.fail_new_context = False
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected and not self.closed
+
+    async def new_context(self):
+        if self.fail_new_context:
+            raise RuntimeError("Target closed")
+        context = FakeContext(self)
+        self.contexts.append(context)
+        self.playwright.peak = max(self.playwright.peak, self.playwright.open_contexts)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+
+    def __init__(self):
+        self.launched = []
+        self.peak = 0
+        self.chromium = self
+
+    @property
+    def open_contexts(self):
+        return sum(len(browser.contexts) for browser in self.launched)
+
+    async def launch(self, headless=True):
+        browser = FakeBrowser(self)
+        self.launched.append(browser)
+        return browser
+
+
+class FakePlaywrightManager:
+
+    def __init__(self, playwright):
+        self.playwright = playwright
+
+    async def __aenter__(self):
+        return self.playwright
+
+    async def __aexit__(self, *args):
+        pass
+
+
+@pytest.fixture
+def playwright(monkeypatch):
+    playwright = FakePlaywright()
+    monkeypatch.setattr(browser_pool, "async_playwright", lambda: FakePlaywrightManager(playwright))
+    return playwright
+
+
+@allure.feature("浏览器池")
+class TestBrowserPool:
+
+    @allure.story("上下文并发")
+    @pytest.mark.unit
+    async def test_context_limit_shared_across_executions(self, playwright, tmp_path):
+        """测试多个执行共享浏览器池的上下文上限"""
+        pool = BrowserPool(size=1, context_limit=2, health_check_interval=3600)
+        cases = [
+            TestCase(id=index, name=f"用例{index}", type="ui", test_data={"steps": [{"action": "wait", "value": "20"}]})
+            for index in range(3)
+        ]
+        try:
+            results = await asyncio.gather(*(
+                UiTestRunner(None, pool, results_dir=str(tmp_path)).run_cases(cases)
+                for _ in range(2)
+            ))
+        finally:
+            await pool.stop()
+
+        assert [result["status"] for results_of_run in results for result in results_of_run] == ["passed"] * 6
+        assert playwright.peak == 2
+
+    @allure.story("浏览器回收")
+    @pytest.mark.unit
+    async def test_recycle_after_max_uses(self, playwright):
+        """测试浏览器使用达到BROWSER_MAX_USES后, 最后一个上下文归还时关闭并启动新浏览器"""
+        pool = BrowserPool(size=1, max_uses=2, health_check_interval=3600)
+        try:
+            async with pool.lease_context():
+                first = pool.slots[0].browser
+            async with pool.lease_context():
+                pass
+            assert first.closed
+            assert len(playwright.launched) == 2
+            assert [slot.browser for slot in pool.slots] == [playwright.launched[1]]
+
+            # 达到上限时仍有活动上下文, 等最后一个上下文归还后再回收
+            second = playwright.launched[1]
+            pool.max_uses = 1
+            lease = pool.lease_context()
+            await lease.__aenter__()
+            async with pool.lease_context():
+                pass
+            assert not second.closed and pool.slots[0].retiring
+            async with pool.lease_context():
+                # 回收中的浏览器不再分配新的上下文, 临时启动一个
+                assert len(playwright.launched) == 3
+            await lease.__aexit__(None, None, None)
+            assert all(browser.closed for browser in playwright.launched[:-1])
+            assert [slot.browser for slot in pool.slots] == [playwright.launched[-1]]
+        finally:
+            await pool.stop()
+
+        assert all(browser.closed for browser in playwright.launched)
+
+    @allure.story("健康检查")
+    @pytest.mark.unit
+    async def test_health_loop_replaces_disconnected_browser(self, playwright):
+        """测试健康检查替换已断开且没有活动上下文的浏览器"""
+        pool = BrowserPool(size=2, health_check_interval=0.01)
+        try:
+            await pool.start()
+            crashed, busy = [slot.browser for slot in pool.slots]
+            crashed.connected = False
+
+            async with pool.lease_context():
+                # 租用时跳过已断开的浏览器
+                assert busy.contexts
+                busy.connected = False
+
+                async def replaced():
+                    while crashed in [slot.browser for slot in pool.slots]:
+                        await asyncio.sleep(0.01)
+
+                await asyncio.wait_for(replaced(), 5)
+                # 仍有活动上下文的浏览器等归还后再处理
+                await asyncio.sleep(0.05)
+                assert busy in [slot.browser for slot in pool.slots]
+
+            async def busy_replaced():
+                while busy in [slot.browser for slot in pool.slots]:
+                    await asyncio.sleep(0.01)
+
+            await asyncio.wait_for(busy_replaced(), 5)
+            assert crashed.closed and busy.closed
+            assert len(pool.slots) == 2
+            assert all(slot.healthy for slot in pool.slots)
+        finally:
+            await pool.stop()
+
+    @allure.story("上下文失败")
+    @pytest.mark.unit
+    async def test_lease_returned_when_new_context_fails(self, playwright):
+        """测试创建上下文失败时归还浏览器租用, 异常抛给调用方"""
+        pool = BrowserPool(size=1, max_uses=10, health_check_interval=3600)
+        try:
+            await pool.start()
+            slot = pool.slots[0]
+            slot.browser.fail_new_context = True
+
+            with pytest.raises(RuntimeError):
+                async with pool.lease_context():
+                    pass
+
+            assert (slot.active, slot.uses) == (0, 1)
+            slot.browser.fail_new_context = False
+            async with pool.lease_context() as context:
+                assert context in slot.browser.contexts
+            assert (slot.active, slot.uses) == (0, 2)
+        finally:
+            await pool.stop()
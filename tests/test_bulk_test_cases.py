@@ -0,0 +1,178 @@
+import json
+
+import pytest
+import allure
+
+from core.config import settings
+from models.project import Project
+from models.test_case import TestCase
+
+
+def _jsonl(*records):
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+def _bulk(test_client, method, project_id, body, headers, content_type="application/x-ndjson"):
+    return test_client.request(
+        method,
+        f"/api/v1/projects/{project_id}/test-cases/bulk",
+        content=body.encode("utf-8"),
+        headers={**headers, "Content-Type": content_type}
+    )
+
+
+def _cases(db_session, project_id):
+    db_session.expire_all()
+    return db_session.query(TestCase).filter(TestCase.project_id == project_id).order_by(TestCase.id).all()
+
+
+@pytest.fixture
+def project_id(test_environment):
+    return test_environment.project_id
+
+
+@pytest.fixture
+def existing(db_session, project_id, test_user):
+    """项目中已有的两个用例, 以及另一个项目的用例"""
+    other = Project(name="其他项目", created_by=test_user.id)
+    db_session.add(other)
+    db_session.flush()
+    cases = [
+        TestCase(project_id=project_id, name="用例1", type="api", test_data={}),
+        TestCase(project_id=project_id, name="用例2", type="api", test_data={}),
+        TestCase(project_id=other.id, name="其他项目的用例", type="api", test_data={})
+    ]
+    db_session.add_all(cases)
+    db_session.commit()
+    return cases
+
+
+@allure.feature("批量导入")
+class TestBulkCreate:
+
+    @allure.story("JSON Lines")
+    @pytest.mark.api
+    def test_create_from_jsonl(self, test_client, auth_headers, db_session, project_id):
+        """测试从JSON Lines批量创建, 空行被忽略"""
+        body = _jsonl(
+            {"name": "登录", "type": "api", "test_data": {"endpoint": "/login"}},
+            {"name": "首页", "type": "ui"}
+        ) + "\n"
+
+        response = _bulk(test_client, "POST", project_id, body, auth_headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"created": 2}
+        cases = _cases(db_session, project_id)
+        assert [(case.name, case.type, case.test_data) for case in cases] == [
+            ("登录", "api", {"endpoint": "/login"}), ("首页", "ui", None)
+        ]
+
+    @allure.story("CSV")
+    @pytest.mark.api
+    def test_create_from_csv(self, test_client, auth_headers, db_session, project_id):
+        """测试从CSV批量创建, test_data列按JSON解析"""
+        body = (
+            "name,type,description,test_data\n"
+            "登录,api,,\"{\"\"endpoint\"\": \"\"/login\"\"}\"\n"
+            "首页,ui,打开首页,\n"
+        )
+
+        response = _bulk(test_client, "POST", project_id, body, auth_headers, content_type="text/csv")
+
+        assert response.status_code == 200
+        assert response.json() == {"created": 2}
+        cases = _cases(db_session, project_id)
+        assert [(case.name, case.description, case.test_data) for case in cases] == [
+            ("登录", None, {"endpoint": "/login"}), ("首页", "打开首页", None)
+        ]
+
+    @allure.story("校验错误")
+    @pytest.mark.api
+    def test_errors_roll_back_written_batches(self, test_client, auth_headers, db_session, project_id, monkeypatch):
+        """测试记录校验失败时已写入的批次回滚, 最多返回BULK_MAX_ERRORS个错误"""
+        monkeypatch.setattr(settings, "BULK_BATCH_SIZE", 2)
+        monkeypatch.setattr(settings, "BULK_MAX_ERRORS", 2)
+        body = _jsonl(
+            *({"name": f"用例{i}", "type": "api"} for i in range(3)),
+            *({"name": f"错误{i}", "type": "unknown"} for i in range(3))
+        )
+
+        response = _bulk(test_client, "POST", project_id, body, auth_headers)
+
+        assert response.status_code == 422
+        assert [error["line"] for error in response.json()["detail"]] == [4, 5]
+        assert _cases(db_session, project_id) == []
+
+    @allure.story("校验错误")
+    @pytest.mark.api
+    def test_invalid_csv_json(self, test_client, auth_headers, db_session, project_id):
+        """测试CSV中无法解析的test_data"""
+        body = "name,type,test_data\n登录,api,{oops\n"
+
+        response = _bulk(test_client, "POST", project_id, body, auth_headers, content_type="text/csv")
+
+        assert response.status_code == 422
+        assert "invalid test_data JSON" in response.json()["detail"][0]["error"]
+        assert _cases(db_session, project_id) == []
+
+
+@allure.feature("批量导入")
+class TestBulkUpdate:
+
+    @allure.story("批量更新")
+    @pytest.mark.api
+    def test_update(self, test_client, auth_headers, db_session, project_id, existing):
+        """测试每条记录只修改给出的字段"""
+        body = _jsonl({"id": existing[0].id, "name": "改名"}, {"id": existing[1].id, "type": "ui"})
+
+        response = _bulk(test_client, "PUT", project_id, body, auth_headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"updated": 2}
+        assert [(case.name, case.type) for case in _cases(db_session, project_id)] == [("改名", "api"), ("用例2", "ui")]
+
+    @allure.story("批量更新")
+    @pytest.mark.api
+    def test_rejects_record_without_changes(self, test_client, auth_headers, project_id, existing):
+        """测试只有id的记录没有要修改的字段"""
+        body = _jsonl({"id": existing[0].id, "name": "改名"}, {"id": existing[1].id}, {"name": "没有id"})
+
+        response = _bulk(test_client, "PUT", project_id, body, auth_headers)
+
+        assert response.status_code == 422
+        assert response.json()["detail"] == [
+            {"line": 2, "error": "no fields to update"},
+            {"line": 3, "error": "id is required and must be an integer"}
+        ]
+
+    @allure.story("批量更新")
+    @pytest.mark.api
+    def test_foreign_id_is_not_found(self, test_client, auth_headers, db_session, project_id, existing, monkeypatch):
+        """测试其他项目的用例返回404, 之前写入的批次回滚"""
+        monkeypatch.setattr(settings, "BULK_BATCH_SIZE", 1)
+        body = _jsonl({"id": existing[0].id, "name": "改名"}, {"id": existing[2].id, "name": "改名"})
+
+        response = _bulk(test_client, "PUT", project_id, body, auth_headers)
+
+        assert response.status_code == 404
+        assert str(existing[2].id) in response.json()["detail"]
+        assert [case.name for case in _cases(db_session, project_id)] == ["用例1", "用例2"]
+        assert _cases(db_session, existing[2].project_id)[0].name == "其他项目的用例"
+
+
+@allure.feature("批量导入")
+class TestBulkDelete:
+
+    @allure.story("批量删除")
+    @pytest.mark.api
+    def test_delete_ignores_foreign_ids(self, test_client, auth_headers, db_session, project_id, existing):
+        """测试批量删除只删除本项目的用例"""
+        body = "id\n" + "".join(f"{case.id}\n" for case in (existing[0], existing[2]))
+
+        response = _bulk(test_client, "DELETE", project_id, body, auth_headers, content_type="text/csv")
+
+        assert response.status_code == 200
+        assert response.json() == {"deleted": 1}
+        assert [case.name for case in _cases(db_session, project_id)] == ["用例2"]
+        assert len(_cases(db_session, existing[2].project_id)) == 1
@@ -0,0 +1,66 @@
+import time
+import pytest
+import allure
+
+from core.cache import TTLCache, UserCache
+from core.config import settings
+
+
+@allure.feature("缓存")
+class TestCache:
+
+    @allure.story("LRU淘汰")
+    @pytest.mark.unit
+    def test_evicts_least_recently_used(self):
+        """测试超过容量时淘汰最久未使用的条目"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    @allure.story("过期")
+    @pytest.mark.unit
+    def test_entries_expire(self):
+        """测试条目在TTL后过期"""
+        cache = TTLCache(maxsize=10, ttl=0.05)
+        cache.set("a", 1)
+        time.sleep(0.06)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    @allure.story("用户缓存失效")
+    @pytest.mark.unit
+    async def test_user_cache_invalidate(self):
+        """测试失效后重新从数据库加载用户"""
+        cache = UserCache(maxsize=10, ttl=60, use_redis=False)
+        await cache.set("alice", {"role": "tester"})
+        assert await cache.get("alice", loader=None) == {"role": "tester"}
+
+        cache.invalidate("alice")
+
+        assert await cache.get("alice", loader=None) is None
+
+    @allure.story("Redis用户缓存")
+    @pytest.mark.unit
+    @pytest.mark.parametrize("configured, backend, use_redis, local_ttl", [
+        (None, "redis", True, 5),
+        (None, "memory", False, 60),
+        (False, "redis", False, 60),
+        (True, "memory", True, 5),
+    ])
+    def test_user_cache_redis_default(self, monkeypatch, configured, backend, use_redis, local_ttl):
+        """测试未配置USER_CACHE_REDIS时跟随执行队列启用Redis, 启用后进程内条目只保留USER_CACHE_LOCAL_TTL秒"""
+        monkeypatch.setattr(settings, "USER_CACHE_REDIS", configured)
+        monkeypatch.setattr(settings, "EXECUTION_QUEUE_BACKEND", backend)
+        monkeypatch.setattr(settings, "USER_CACHE_LOCAL_TTL", 5)
+
+        cache = UserCache(maxsize=10, ttl=60)
+
+        assert cache.use_redis is use_redis
+        assert cache.local.ttl == local_ttl
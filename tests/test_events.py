@@ -0,0 +1,197 @@
+import asyncio
+import fnmatch
+import json
+
+import pytest
+import allure
+
+from models.test_execution import TestExecution
+from services import events
+from services.events import EventBus, RedisEventBus, format_sse
+
+
+class FakePubSub:
+    """模拟redis.asyncio的PubSub, 只支持psubscribe"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.pattern = None
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def psubscribe(self, pattern):
+        self.pattern = pattern
+        self.redis.pubsubs.append(self)
+        await self.messages.put({"type": "psubscribe", "channel": pattern, "data": 1})
+
+    def deliver(self, channel, data):
+        if fnmatch.fnmatchcase(channel, self.pattern):
+            self.messages.put_nowait({"type": "pmessage", "pattern": self.pattern, "channel": channel, "data": data})
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+    async def close(self):
+        if self in self.redis.pubsubs:
+            self.redis.pubsubs.remove(self)
+
+
+class FakeRedis:
+    """多个进程共享的Redis频道, 发布的消息投递给所有模式匹配的订阅"""
+
+    def __init__(self):
+        self.pubsubs = []
+
+    async def publish(self, channel, data):
+        for pubsub in list(self.pubsubs):
+            pubsub.deliver(channel, data)
+        return len(self.pubsubs)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def close(self):
+        pass
+
+
+async def _wait_for(condition, timeout=5):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+@allure.feature("执行事件")
+class TestEventBus:
+
+    @allure.story("发布订阅")
+    @pytest.mark.unit
+    async def test_publish_to_subscribers_of_execution(self):
+        """测试事件只投递给订阅该执行的订阅者, 取消订阅后不再投递"""
+        bus = EventBus()
+        first = bus.subscribe(1)
+        second = bus.subscribe(1)
+        other = bus.subscribe(2)
+
+        bus.publish(1, {"type": "case_started", "test_case_id": 7})
+        bus.unsubscribe(1, second)
+        bus.publish(1, {"type": "execution_finished"})
+
+        assert [first.get_nowait()["type"], first.get_nowait()["type"]] == ["case_started", "execution_finished"]
+        assert second.get_nowait()["type"] == "case_started" and second.empty()
+        assert other.empty()
+        bus.unsubscribe(1, first)
+        assert 1 not in bus.subscribers
+
+    @allure.story("发布订阅")
+    @pytest.mark.unit
+    async def test_slow_subscriber_drops_oldest(self, monkeypatch):
+        """测试订阅者队列满时丢弃最旧的事件, 发布不阻塞"""
+        monkeypatch.setattr(events, "SUBSCRIBER_QUEUE_SIZE", 2)
+        bus = EventBus()
+        queue = bus.subscribe(1)
+
+        for index in range(3):
+            bus.publish(1, {"type": "case_finished", "index": index})
+
+        assert [queue.get_nowait()["index"], queue.get_nowait()["index"]] == [1, 2]
+
+    @allure.story("跨进程推送")
+    @pytest.mark.unit
+    async def test_redis_bus_fans_out_worker_events(self):
+        """测试worker进程发布的事件通过Redis频道投递到API进程的订阅者"""
+        redis = FakeRedis()
+        api_bus = RedisEventBus(prefix="test")
+        worker_bus = RedisEventBus(prefix="test")
+        api_bus.redis = worker_bus.redis = redis
+        try:
+            queue = api_bus.subscribe(1)
+            other = api_bus.subscribe(2)
+            await _wait_for(lambda: redis.pubsubs)
+
+            worker_bus.publish(1, {"type": "case_finished", "test_case_id": 7})
+            worker_bus.publish(1, {"type": "execution_finished", "status": "passed"})
+
+            assert await asyncio.wait_for(queue.get(), 5) == {"type": "case_finished", "test_case_id": 7}
+            assert (await asyncio.wait_for(queue.get(), 5))["type"] == "execution_finished"
+            assert other.empty()
+        finally:
+            await api_bus.close()
+            await worker_bus.close()
+
+    @allure.story("SSE编码")
+    @pytest.mark.unit
+    def test_format_sse(self):
+        """测试事件类型作为SSE的event字段"""
+        message = format_sse({"type": "snapshot", "status": "运行中"})
+
+        assert message == 'event: snapshot\ndata: {"type": "snapshot", "status": "运行中"}\n\n'
+
+
+def _events(body: str):
+    """解析SSE响应中的事件, 忽略keepalive注释"""
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@allure.feature("执行事件")
+class TestExecutionEventStream:
+
+    @pytest.fixture
+    def bus(self, monkeypatch):
+        bus = EventBus()
+        monkeypatch.setattr("api.v1.executions.test_service.event_bus", bus)
+        return bus
+
+    def _execution(self, db_session, environment, status):
+        execution = TestExecution(
+            project_id=environment.project_id,
+            environment_id=environment.id,
+            status=status,
+            summary={"total": 1} if status == "passed" else None
+        )
+        db_session.add(execution)
+        db_session.commit()
+        return execution
+
+    @allure.story("SSE推送")
+    @pytest.mark.api
+    async def test_stream_until_finished(self, async_client, auth_headers, bus, db_session, test_environment):
+        """测试先推送快照, 再推送执行事件, 收到execution_finished后结束"""
+        execution = self._execution(db_session, test_environment, "running")
+        request = asyncio.create_task(
+            async_client.get(f"/api/v1/executions/{execution.id}/events", headers=auth_headers)
+        )
+        await _wait_for(lambda: execution.id in bus.subscribers or request.done())
+
+        bus.publish(execution.id, {"type": "case_finished", "test_case_id": 7, "status": "passed"})
+        bus.publish(execution.id, {"type": "execution_finished", "status": "passed"})
+        response = await asyncio.wait_for(request, 5)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert [event["type"] for event in _events(response.text)] == ["snapshot", "case_finished", "execution_finished"]
+        assert _events(response.text)[0]["status"] == "running"
+        assert execution.id not in bus.subscribers
+
+    @allure.story("SSE推送")
+    @pytest.mark.api
+    async def test_subscribe_after_finished(self, async_client, auth_headers, bus, db_session, test_environment):
+        """测试执行结束后才连接的订阅者只收到最终状态的快照, 连接立即结束"""
+        execution = self._execution(db_session, test_environment, "passed")
+        bus.publish(execution.id, {"type": "execution_finished", "status": "passed"})
+
+        response = await asyncio.wait_for(
+            async_client.get(f"/api/v1/executions/{execution.id}/events", headers=auth_headers), 5
+        )
+
+        assert response.status_code == 200
+        received = _events(response.text)
+        assert [event["type"] for event in received] == ["snapshot"]
+        assert received[0]["status"] == "passed"
+        assert received[0]["summary"] == {"total": 1}
+        assert execution.id not in bus.subscribers
@@ -0,0 +1,230 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+import allure
+from sqlalchemy import event
+
+from core.database import engine
+from models.test_case import TestCase
+from models.test_execution import TestExecution
+from models.test_case_result import TestCaseResult
+from core.config import settings
+from services.events import EventBus
+from services.execution_worker import ExecutionWorker
+from services.job_queue import InMemoryJobQueue
+from services.test_service import TestExecutionService
+
+
+@pytest.fixture
+async def service():
+    """使用进程内事件总线的执行服务"""
+    service = TestExecutionService()
+    service.event_bus = EventBus()
+    yield service
+    await service.shutdown()
+
+
+def _execution(db_session, environment, status, **fields):
+    execution = TestExecution(
+        project_id=environment.project_id,
+        environment_id=environment.id,
+        status=status,
+        **fields
+    )
+    db_session.add(execution)
+    db_session.flush()
+    db_session.add(TestCaseResult(execution_id=execution.id, test_case_name="earlier", status="passed"))
+    db_session.commit()
+    return execution
+
+
+def _result_count(db_session, execution_id):
+    return db_session.query(TestCaseResult).filter(TestCaseResult.execution_id == execution_id).count()
+
+
+@allure.feature("测试执行")
+class TestRunTestsClaim:
+
+    @allure.story("认领执行")
+    @pytest.mark.unit
+    @pytest.mark.parametrize("status", ["cancelled", "passed"])
+    async def test_skips_stopped_or_finished_execution(self, service, db_session, test_environment, status):
+        """测试已停止或已结束的执行被重新取到时不会重新执行, 也不删除已有结果"""
+        execution = _execution(db_session, test_environment, status, end_time=datetime.utcnow())
+
+        await service.run_tests(execution.id)
+
+        db_session.expire_all()
+        assert db_session.get(TestExecution, execution.id).status == status
+        assert _result_count(db_session, execution.id) == 1
+
+    @allure.story("认领执行")
+    @pytest.mark.unit
+    async def test_skips_running_execution_with_live_worker(self, service, db_session, test_environment):
+        """测试刚开始运行的执行(worker仍在心跳)不会被另一个worker认领"""
+        execution = _execution(db_session, test_environment, "running", start_time=datetime.utcnow())
+
+        await service.run_tests(execution.id)
+
+        db_session.expire_all()
+        assert db_session.get(TestExecution, execution.id).status == "running"
+        assert _result_count(db_session, execution.id) == 1
+
+    @allure.story("认领执行")
+    @pytest.mark.unit
+    async def test_reclaims_execution_of_dead_worker(self, service, db_session, test_environment):
+        """测试worker失联后重新入队的执行被重新执行, 清理之前的部分结果"""
+        execution = _execution(
+            db_session, test_environment, "running", start_time=datetime.utcnow() - timedelta(hours=1)
+        )
+
+        await service.run_tests(execution.id)
+
+        db_session.expire_all()
+        assert db_session.get(TestExecution, execution.id).status == "passed"
+        assert _result_count(db_session, execution.id) == 0
+
+
+@allure.feature("测试执行")
+class TestRunTestsDatabaseAccess:
+
+    @allure.story("数据库访问")
+    @pytest.mark.unit
+    async def test_queries_run_off_event_loop(self, service, db_session, test_environment):
+        """测试执行过程中的同步数据库查询都在线程中执行, 不阻塞事件循环"""
+        execution = _execution(db_session, test_environment, "pending")
+        db_session.add(TestCase(project_id=test_environment.project_id, name="接口", type="api", test_data={"endpoint": "/"}))
+        db_session.commit()
+        execution_id = execution.id
+        loop_thread = threading.current_thread()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if threading.current_thread() is loop_thread:
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            await service.run_tests(execution_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        db_session.expire_all()
+        assert db_session.get(TestExecution, execution_id).status == "failed"
+        assert _result_count(db_session, execution_id) == 1
+        assert statements == []
+
+
+@allure.feature("测试执行")
+class TestWorkerRequeue:
+
+    async def _released_job(self, queue, execution):
+        """worker-1取到任务后正常退出, 任务被放回队列"""
+        await queue.enqueue({"execution_id": execution.id})
+        await queue.heartbeat("worker-1")
+        await queue.dequeue("worker-1", timeout=1)
+        await queue.release("worker-1")
+
+    @allure.story("任务重新入队")
+    @pytest.mark.unit
+    async def test_released_job_is_claimed_by_another_worker(self, service, db_session, test_environment):
+        """测试worker退出时放回队列的执行被另一个worker立即认领, 不会一直停留在运行中"""
+        queue = InMemoryJobQueue()
+        execution = _execution(db_session, test_environment, "running", start_time=datetime.utcnow(), worker_id="worker-1")
+        await self._released_job(queue, execution)
+        worker = ExecutionWorker(queue, service, worker_id="worker-2")
+        await queue.heartbeat("worker-2")
+
+        job = await queue.dequeue("worker-2", timeout=1)
+        await worker._process(job)
+
+        db_session.expire_all()
+        claimed = db_session.get(TestExecution, execution.id)
+        assert (claimed.status, claimed.worker_id) == ("passed", "worker-2")
+        assert _result_count(db_session, execution.id) == 0
+        assert not queue.pending and queue.processing["worker-2"] == []
+
+    @allure.story("任务重新入队")
+    @pytest.mark.unit
+    async def test_job_of_live_worker_is_requeued(self, service, db_session, test_environment, monkeypatch):
+        """测试执行仍由存活的worker持有时, 任务稍后重新入队而不是被ack丢弃"""
+        monkeypatch.setattr(settings, "CLAIM_RETRY_DELAY", 0)
+        queue = InMemoryJobQueue()
+        execution = _execution(db_session, test_environment, "running", start_time=datetime.utcnow(), worker_id="worker-1")
+        await queue.heartbeat("worker-1")
+        await queue.enqueue({"execution_id": execution.id})
+        worker = ExecutionWorker(queue, service, worker_id="worker-2")
+        await queue.heartbeat("worker-2")
+
+        job = await queue.dequeue("worker-2", timeout=1)
+        await worker._process(job)
+
+        db_session.expire_all()
+        assert db_session.get(TestExecution, execution.id).status == "running"
+        assert _result_count(db_session, execution.id) == 1
+        assert [job.execution_id for job in queue.pending] == [execution.id]
+        assert queue.processing["worker-2"] == []
+
+
+@allure.feature("测试执行")
+class TestStopExecution:
+
+    @allure.story("停止执行")
+    @pytest.mark.unit
+    async def test_stop_running_execution(self, service, db_session, test_environment, monkeypatch):
+        """测试停止运行中的执行: 已完成的用例保留结果, 停止后才返回的结果不记录, 用例记为已取消"""
+        cases = [
+            TestCase(project_id=test_environment.project_id, name=f"用例{i}", type="api", test_data={})
+            for i in range(2)
+        ]
+        db_session.add_all(cases)
+        db_session.commit()
+        execution = _execution(db_session, test_environment, "pending")
+        started = asyncio.Event()
+
+        async def execute_api_tests(execution_id, test_cases, environment, durations=None, client=None):
+            first, second = test_cases
+            service._case_finished(execution_id, "api", {
+                "test_case_id": first.id, "test_case_name": first.name, "status": "passed"
+            })
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            finally:
+                # 进行中的用例在停止时返回的错误(例如浏览器上下文已关闭)
+                service._case_finished(execution_id, "api", {
+                    "test_case_id": second.id, "test_case_name": second.name, "status": "error",
+                    "error": "Target page, context or browser has been closed"
+                })
+
+        monkeypatch.setattr(service, "execute_api_tests", execute_api_tests)
+        task = asyncio.create_task(service.run_tests(execution.id, test_case_ids=[case.id for case in cases]))
+        await asyncio.wait_for(started.wait(), 5)
+
+        assert await service.stop_execution(execution.id)
+        await asyncio.wait_for(task, 5)
+
+        db_session.expire_all()
+        stopped = db_session.get(TestExecution, execution.id)
+        assert stopped.status == "cancelled"
+        assert stopped.result["completed_case_ids"] == [cases[0].id]
+        assert stopped.result["cancelled_case_ids"] == [cases[1].id]
+        rows = db_session.query(TestCaseResult).filter(TestCaseResult.execution_id == execution.id).all()
+        assert [(row.test_case_id, row.status) for row in rows] == [(cases[0].id, "passed")]
+
+    @allure.story("停止执行")
+    @pytest.mark.api
+    def test_stop_pending_execution(self, test_client, auth_headers, db_session, test_environment, monkeypatch):
+        """测试停止尚未开始的执行: 直接标记为已取消, worker取到后不会执行"""
+        queue = InMemoryJobQueue()
+        monkeypatch.setattr("api.v1.executions.job_queue", queue)
+        execution = _execution(db_session, test_environment, "pending")
+
+        response = test_client.post(f"/api/v1/executions/{execution.id}/stop", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert queue.cancelled == {execution.id}
+        db_session.expire_all()
+        assert db_session.get(TestExecution, execution.id).status == "cancelled"
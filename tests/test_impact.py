@@ -0,0 +1,34 @@
+import pytest
+import allure
+
+from services.impact import path_keywords, endpoint_resources, impact_reasons
+
+
+class _Case:
+    def __init__(self, test_data):
+        self.id = 1
+        self.test_data = test_data
+
+
+@allure.feature("变更选择")
+class TestImpactSelection:
+
+    @allure.story("路径与端点")
+    @pytest.mark.unit
+    def test_keywords_and_resources(self):
+        """测试变更路径的关键字和端点的资源名"""
+        assert path_keywords("backend/api/v1/test-cases.py") == {"backend", "api", "v1", "test_cases"}
+        assert endpoint_resources("/api/v1/projects/12/test-cases?skip=0") == {"projects", "test_cases"}
+        assert endpoint_resources("http://host:8000/v2/{id}/users") == {"users"}
+
+    @allure.story("影响原因")
+    @pytest.mark.unit
+    def test_impact_reasons(self):
+        """测试source_paths、tags、端点和历史失败都可以选中用例"""
+        changed = ["app/api/users.py", "docs/guide.md"]
+
+        assert impact_reasons(_Case({"endpoint": "/api/v1/users/1"}), changed) == ["endpoint users: app/api/users.py"]
+        assert impact_reasons(_Case({"source_paths": ["docs/*"]}), changed) == ["source_paths docs/*: docs/guide.md"]
+        assert impact_reasons(_Case({"tags": ["API"]}), changed) == ["tag api: app/api/users.py"]
+        assert impact_reasons(_Case({"endpoint": "/orders"}), changed) == []
+        assert impact_reasons(_Case({}), changed, ["docs/guide.md"]) == ["failed before after changing docs/guide.md"]
@@ -0,0 +1,38 @@
+import pytest
+import allure
+
+from services.job_queue import InMemoryJobQueue
+
+
+@allure.feature("执行队列")
+class TestJobQueue:
+
+    @allure.story("任务确认")
+    @pytest.mark.unit
+    async def test_dequeue_and_ack(self):
+        """测试任务出队与确认"""
+        queue = InMemoryJobQueue()
+        await queue.enqueue({"execution_id": 1, "test_case_ids": None})
+
+        job = await queue.dequeue("worker-1", timeout=1)
+        assert job.execution_id == 1
+        assert queue.processing["worker-1"] == [job]
+
+        await queue.ack("worker-1", job)
+        assert queue.processing["worker-1"] == []
+        assert await queue.dequeue("worker-1", timeout=0.01) is None
+
+    @allure.story("任务重新入队")
+    @pytest.mark.unit
+    async def test_release_requeues_unfinished_jobs(self):
+        """测试worker退出时未完成的任务重新入队"""
+        queue = InMemoryJobQueue()
+        await queue.enqueue({"execution_id": 1})
+        await queue.enqueue({"execution_id": 2})
+
+        await queue.dequeue("worker-1", timeout=1)
+        await queue.release("worker-1")
+
+        first = await queue.dequeue("worker-2", timeout=1)
+        second = await queue.dequeue("worker-2", timeout=1)
+        assert [first.execution_id, second.execution_id] == [1, 2]
@@ -0,0 +1,153 @@
+from datetime import datetime
+
+import pytest
+import allure
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, load_only
+
+from api.v1.executions import LIST_COLUMNS
+from models.test_execution import TestExecution
+from schemas.test_execution import TestExecutionListItem
+from utils.pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+
+
+@allure.feature("分页")
+class TestPagination:
+
+    @allure.story("游标编解码")
+    @pytest.mark.unit
+    def test_cursor_round_trip(self):
+        """测试游标可以还原排序键"""
+        cursor = encode_cursor({"id": 42})
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor, ["id"]) == {"id": 42}
+
+    @allure.story("无效游标")
+    @pytest.mark.unit
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor({"other": 1})])
+    def test_invalid_cursor(self, cursor):
+        """测试无效游标返回400"""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor(cursor, ["id"])
+
+        assert exc_info.value.status_code == 400
+
+
+@allure.feature("分页")
+class TestExecutionPages:
+
+    @pytest.fixture
+    def executions(self, db_session, test_environment, test_user):
+        executions = [
+            TestExecution(
+                project_id=test_environment.project_id,
+                environment_id=test_environment.id,
+                status="passed",
+                created_by=test_user.id,
+                created_at=datetime(2026, 1, 1, 0, 0, second)
+            )
+            for second in (1, 2, 2, 3)
+        ]
+        db_session.add_all(executions)
+        db_session.commit()
+        return executions
+
+    def _page(self, test_client, auth_headers, project_id, cursor=None):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = test_client.get(f"/api/v1/projects/{project_id}/executions", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        return [row["id"] for row in response.json()], response.headers.get(NEXT_CURSOR_HEADER)
+
+    @allure.story("游标分页")
+    @pytest.mark.api
+    def test_pages_by_created_at(self, test_client, auth_headers, test_environment, executions):
+        """测试按创建时间倒序分页, 创建时间相同时按ID"""
+        project_id = test_environment.project_id
+
+        first, cursor = self._page(test_client, auth_headers, project_id)
+        second, last = self._page(test_client, auth_headers, project_id, cursor)
+
+        assert first + second == [executions[i].id for i in (3, 2, 1, 0)]
+        assert last is None
+
+    @allure.story("游标分页")
+    @pytest.mark.api
+    def test_cursor_row_deleted(self, test_client, auth_headers, db_session, test_environment, executions):
+        """测试游标指向的执行被删除后, 下一页仍从游标位置继续"""
+        project_id = test_environment.project_id
+        first, cursor = self._page(test_client, auth_headers, project_id)
+        db_session.delete(executions[2])
+        db_session.commit()
+
+        second, _ = self._page(test_client, auth_headers, project_id, cursor)
+
+        assert first == [executions[3].id, executions[2].id]
+        assert second == [executions[1].id, executions[0].id]
+
+
+@allure.feature("分页")
+class TestExecutionProjection:
+
+    @pytest.fixture
+    def execution(self, db_session, test_environment, test_user):
+        execution = TestExecution(
+            project_id=test_environment.project_id,
+            environment_id=test_environment.id,
+            status="passed",
+            created_by=test_user.id,
+            result={"api": [{"status": "passed"}]},
+            summary={"total": 1, "passed": 1},
+            total_count=1,
+            passed_count=1
+        )
+        db_session.add(execution)
+        db_session.commit()
+        return execution
+
+    @allure.story("列表字段")
+    @pytest.mark.api
+    def test_list_omits_json_columns(self, test_client, auth_headers, test_environment, execution):
+        """测试执行列表只返回列表项字段, 不返回result/summary"""
+        response = test_client.get(
+            f"/api/v1/projects/{test_environment.project_id}/executions",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        row = response.json()[0]
+        assert set(row) == set(TestExecutionListItem.model_fields)
+        assert "result" not in row and "summary" not in row
+        assert (row["id"], row["total_count"], row["passed_count"]) == (execution.id, 1, 1)
+
+    @allure.story("列表字段")
+    @pytest.mark.unit
+    def test_list_query_does_not_load_json_columns(self, db_session, execution):
+        """测试列表查询只加载LIST_COLUMNS, 访问未加载的列时报错而不是逐行查询"""
+        with Session(db_session.get_bind()) as session:
+            loaded = session.scalars(
+                select(TestExecution)
+                .options(load_only(*LIST_COLUMNS, raiseload=True))
+                .where(TestExecution.id == execution.id)
+            ).one()
+
+            assert loaded.status == "passed"
+            with pytest.raises(InvalidRequestError):
+                loaded.result
+
+    @allure.story("详情字段")
+    @pytest.mark.api
+    def test_detail_fields(self, test_client, auth_headers, execution):
+        """测试详情接口的fields参数只返回指定字段, 未知字段返回400"""
+        url = f"/api/v1/executions/{execution.id}"
+
+        response = test_client.get(url, params={"fields": "id, summary"}, headers=auth_headers)
+        unknown = test_client.get(url, params={"fields": "id,password"}, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"id": execution.id, "summary": {"total": 1, "passed": 1}}
+        assert unknown.status_code == 400
+        assert unknown.json()["detail"] == "Unknown fields: password"
+        assert "result" in test_client.get(url, headers=auth_headers).json()
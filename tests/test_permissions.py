@@ -0,0 +1,101 @@
+import pytest
+import allure
+from sqlalchemy import delete
+
+from core.cache import project_owner_cache
+from models.project import Project
+from models.test_case import TestCase
+
+
+@pytest.fixture
+def project(db_session, test_user):
+    project = Project(name="权限项目", created_by=test_user.id)
+    db_session.add(project)
+    db_session.commit()
+    yield project
+    project_owner_cache.delete(project.id)
+
+
+def _create_case(test_client, project_id, headers):
+    return test_client.post(
+        f"/api/v1/projects/{project_id}/test-cases",
+        json={"name": "用例", "type": "api", "project_id": project_id},
+        headers=headers
+    )
+
+
+@allure.feature("项目权限")
+class TestProjectAccess:
+
+    @allure.story("权限缓存")
+    @pytest.mark.api
+    def test_read_uses_cached_owner(self, test_client, auth_headers, project, admin_user):
+        """测试只读请求使用缓存的创建者ID, 第一次检查后写入缓存"""
+        url = f"/api/v1/projects/{project.id}/test-cases"
+
+        assert test_client.get(url, headers=auth_headers).status_code == 200
+        assert project_owner_cache.get(project.id) == project.created_by
+
+        project_owner_cache.set(project.id, admin_user.id)
+        assert test_client.get(url, headers=auth_headers).status_code == 403
+
+    @allure.story("权限缓存")
+    @pytest.mark.api
+    def test_write_rechecks_owner(self, test_client, auth_headers, project, admin_user):
+        """测试写请求不使用缓存, 重新查询后刷新缓存"""
+        project_owner_cache.set(project.id, admin_user.id)
+
+        response = _create_case(test_client, project.id, auth_headers)
+
+        assert response.status_code == 200
+        assert project_owner_cache.get(project.id) == project.created_by
+
+    @allure.story("权限缓存")
+    @pytest.mark.api
+    def test_write_to_project_deleted_by_other_process(self, test_client, auth_headers, db_session, project):
+        """测试其他进程删除项目后(本进程缓存未失效), 写请求返回404"""
+        project_id = project.id
+        assert test_client.get(f"/api/v1/projects/{project_id}/test-cases", headers=auth_headers).status_code == 200
+        # 批量删除不触发ORM事件, 与其他进程删除一样不会失效本进程的缓存
+        db_session.execute(delete(Project).where(Project.id == project_id))
+        db_session.commit()
+        assert project_owner_cache.get(project_id) is not None
+
+        response = _create_case(test_client, project_id, auth_headers)
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Project not found"
+        assert db_session.query(TestCase).filter(TestCase.project_id == project_id).count() == 0
+
+
+@allure.feature("项目权限")
+class TestProjectCacheInvalidation:
+
+    @allure.story("缓存失效")
+    @pytest.mark.unit
+    def test_delete_invalidates_after_commit(self, db_session, project):
+        """测试删除项目提交后失效缓存, 回滚则保留"""
+        project_owner_cache.set(project.id, project.created_by)
+
+        db_session.delete(project)
+        db_session.flush()
+        db_session.rollback()
+        assert project_owner_cache.get(project.id) == project.created_by
+
+        db_session.delete(project)
+        db_session.commit()
+        assert project_owner_cache.get(project.id) is None
+
+    @allure.story("缓存失效")
+    @pytest.mark.unit
+    def test_owner_change_invalidates(self, db_session, project, admin_user):
+        """测试修改项目创建者后失效缓存, 只修改其他字段时保留"""
+        project_owner_cache.set(project.id, project.created_by)
+
+        project.name = "改名"
+        db_session.commit()
+        assert project_owner_cache.get(project.id) is not None
+
+        project.created_by = admin_user.id
+        db_session.commit()
+        assert project_owner_cache.get(project.id) is None
@@ -0,0 +1,70 @@
+import sys
+import time
+import pytest
+import allure
+
+from services.cancellation import ExecutionHandle
+from utils.process_utils import run_process
+
+
+@allure.feature("外部进程")
+class TestRunProcess:
+
+    @allure.story("输出捕获")
+    @pytest.mark.unit
+    async def test_output_is_capped(self):
+        """测试输出只保留结尾部分"""
+        result = await run_process(
+            [sys.executable, "-c", "print('x' * 5000); print('tail')"],
+            max_output=100
+        )
+
+        assert result.returncode == 0
+        assert result.stdout.startswith("...[truncated")
+        assert result.stdout.rstrip().endswith("tail")
+
+    @allure.story("超时")
+    @pytest.mark.unit
+    async def test_timeout_kills_process(self):
+        """测试超时后进程被结束"""
+        start = time.monotonic()
+        result = await run_process([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.5)
+
+        assert result.timed_out
+        assert time.monotonic() - start < 10
+
+    @allure.story("超时")
+    @pytest.mark.unit
+    async def test_timeout_interrupts_before_kill(self):
+        """测试超时后先发送SIGINT, 进程可以在等待时间内收尾并输出"""
+        script = (
+            "import time\n"
+            "try:\n"
+            "    print('started', flush=True)\n"
+            "    time.sleep(30)\n"
+            "except KeyboardInterrupt:\n"
+            "    print('report written')\n"
+        )
+
+        result = await run_process([sys.executable, "-c", script], timeout=1, interrupt_grace=5)
+
+        assert result.timed_out
+        assert result.returncode == 0
+        assert result.stdout.split() == ["started", "report", "written"]
+
+    @allure.story("进程登记")
+    @pytest.mark.unit
+    async def test_process_is_discarded_on_exit(self):
+        """测试进程结束后从执行句柄中移除, 句柄只保留运行中的进程"""
+        handle = ExecutionHandle(1)
+        registered = []
+
+        def on_exit(process):
+            registered.append(process in handle.processes)
+            handle.discard_process(process)
+
+        result = await run_process([sys.executable, "-c", "pass"], on_start=handle.add_process, on_exit=on_exit)
+
+        assert result.returncode == 0
+        assert registered == [True]
+        assert not handle.processes
@@ -0,0 +1,119 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import allure
+
+from core.config import settings
+from models.environment import Environment
+from models.test_case import TestCase
+from services.pytest_batch import PytestBatchRunner
+from utils.process_utils import ProcessResult
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """/ok返回200和JSON, /slow在测试结束前不返回, 其他路径返回404"""
+
+    release = threading.Event()
+
+    def do_GET(self):
+        if self.path == "/slow":
+            # 客户端已被中断, 不再返回响应
+            self.release.wait(60)
+            return
+        status = 200 if self.path == "/ok" else 404
+        body = json.dumps({"ok": status == 200}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _Handler.release.clear()
+    yield f"http://127.0.0.1:{server.server_port}"
+    _Handler.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _case(case_id, **test_data):
+    return TestCase(id=case_id, name=f"用例{case_id}", type="api", test_data=test_data)
+
+
+@allure.feature("pytest批量执行")
+class TestPytestBatchRunner:
+
+    @allure.story("批量执行")
+    @pytest.mark.unit
+    async def test_runs_cases_in_one_session(self, base_url, tmp_path):
+        """测试生成分片模块在一次pytest会话中执行, 按JSON报告返回每个用例的结果"""
+        cases = [
+            _case(1, endpoint="/ok", expected_response={"ok": True}),
+            _case(2, endpoint="/missing"),
+            _case(3, endpoint="/ok", expected_status=201)
+        ]
+        runner = PytestBatchRunner(
+            Environment(base_url=base_url, config={}),
+            results_dir=str(tmp_path / "allure"),
+            shards=2,
+            workers=0
+        )
+        started = []
+
+        results = await runner.run(cases, on_start=started.append)
+
+        assert len(started) == 1
+        assert [(result["test_case_id"], result["status"]) for result in results] == [
+            (1, "passed"), (2, "failed"), (3, "failed")
+        ]
+        assert "Expected 200, got 404" in results[1]["errors"]
+        assert list((tmp_path / "allure").glob("*-result.json"))
+
+    @allure.story("会话超时")
+    @pytest.mark.unit
+    async def test_session_timeout_keeps_finished_cases(self, base_url, tmp_path, monkeypatch):
+        """测试会话超时后中断pytest, 已完成的用例保留结果, 未完成的用例记为超时"""
+        monkeypatch.setattr(settings, "PYTEST_SESSION_TIMEOUT", 5)
+        monkeypatch.setattr(settings, "PYTEST_INTERRUPT_GRACE", 10)
+        cases = [_case(1, endpoint="/ok"), _case(2, endpoint="/slow"), _case(3, endpoint="/ok")]
+        runner = PytestBatchRunner(Environment(base_url=base_url, config={}), results_dir=str(tmp_path), workers=0)
+
+        results = await runner.run(cases)
+
+        assert [(result["test_case_id"], result["status"]) for result in results] == [
+            (1, "passed"), (2, "error"), (3, "error")
+        ]
+        assert results[1]["error"] == results[2]["error"] == "Test session timed out"
+
+    @allure.story("结果解析")
+    @pytest.mark.unit
+    def test_cases_missing_from_report(self):
+        """测试没有超时但报告中没有的用例记为未运行"""
+        runner = PytestBatchRunner(None)
+
+        results = runner._parse_report([_case(1)], {}, ProcessResult(4, "", "collection error"))
+
+        assert results[0]["status"] == "error"
+        assert results[0]["error"] == "Test was not collected or did not run"
+        assert results[0]["errors"] == "collection error"
+
+    @allure.story("会话超时")
+    @pytest.mark.unit
+    def test_session_timeout_is_capped(self, monkeypatch):
+        """测试会话超时按用例数和并行度估算, 不超过PYTEST_SESSION_TIMEOUT"""
+        monkeypatch.setattr(settings, "TEST_TIMEOUT", 300)
+        monkeypatch.setattr(settings, "PYTEST_SESSION_TIMEOUT", 1800)
+        runner = PytestBatchRunner(None, workers=4)
+
+        assert runner.session_timeout(8) == 600
+        assert runner.session_timeout(1000) == 1800
@@ -0,0 +1,208 @@
+import pytest
+import allure
+
+from models.environment import Environment
+from models.test_case import TestCase
+from models.test_case_result import TestCaseResult
+from models.test_execution import TestExecution
+from services.job_queue import InMemoryJobQueue
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    """重跑请求写入的进程内队列"""
+    queue = InMemoryJobQueue()
+    monkeypatch.setattr("api.v1.executions.job_queue", queue)
+    return queue
+
+
+@pytest.fixture
+def cases(db_session, test_environment):
+    cases = [
+        TestCase(project_id=test_environment.project_id, name=f"用例{name}", type="api", test_data={})
+        for name in "ABCD"
+    ]
+    db_session.add_all(cases)
+    db_session.commit()
+    return cases
+
+
+def _execution(db_session, environment, status, results, parent=None, result=None, **fields):
+    """创建执行及其用例结果, results为(用例, 状态, 耗时)"""
+    execution = TestExecution(
+        project_id=environment.project_id,
+        environment_id=environment.id,
+        parent_id=parent.id if parent else None,
+        status=status,
+        result=result,
+        **fields
+    )
+    db_session.add(execution)
+    db_session.flush()
+    db_session.add_all([
+        TestCaseResult(
+            execution_id=execution.id,
+            test_case_id=test_case.id,
+            test_case_name=test_case.name,
+            status=case_status,
+            duration=duration
+        )
+        for test_case, case_status, duration in results
+    ])
+    db_session.commit()
+    return execution
+
+
+@pytest.fixture
+def chain(db_session, test_environment, cases):
+    """原执行和两次重跑: B在第一次重跑通过, C在第二次重跑通过, D之后被删除"""
+    a, b, c, d = cases
+    root = _execution(db_session, test_environment, "failed", [
+        (a, "passed", 1.0), (b, "failed", 1.0), (c, "error", 1.0), (d, "failed", 1.0)
+    ])
+    first = _execution(db_session, test_environment, "failed", [(b, "passed", 2.0), (c, "failed", 2.0)], parent=root)
+    second = _execution(db_session, test_environment, "passed", [(c, "passed", 3.0)], parent=first)
+    db_session.delete(d)
+    db_session.commit()
+    return root, first, second
+
+
+@allure.feature("重跑失败用例")
+class TestCombinedResults:
+
+    @allure.story("合并结果")
+    @pytest.mark.api
+    def test_latest_rerun_wins(self, test_client, auth_headers, chain, cases):
+        """测试每个用例取重跑链中最近一次的结果, 已删除用例的结果保留"""
+        root, first, second = chain
+        a, b, c, _ = cases
+
+        response = test_client.get(f"/api/v1/executions/{second.id}/combined-results", headers=auth_headers)
+
+        assert response.status_code == 200
+        results = {(row["test_case_name"], row["execution_id"], row["status"]) for row in response.json()}
+        assert results == {
+            (a.name, root.id, "passed"),
+            (b.name, first.id, "passed"),
+            (c.name, second.id, "passed"),
+            ("用例D", root.id, "failed")
+        }
+
+    @allure.story("合并结果")
+    @pytest.mark.api
+    def test_middle_of_chain_ignores_later_reruns(self, test_client, auth_headers, chain, cases):
+        """测试从中间的重跑查询时只合并它和它之前的执行"""
+        root, first, second = chain
+
+        response = test_client.get(
+            f"/api/v1/executions/{first.id}/combined-results",
+            params={"status": "failed"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert sorted((row["test_case_name"], row["execution_id"]) for row in response.json()) == [
+            ("用例C", first.id), ("用例D", root.id)
+        ]
+
+    @allure.story("合并汇总")
+    @pytest.mark.api
+    def test_combined_summary(self, test_client, auth_headers, chain):
+        """测试合并汇总的数量和耗时, execution_ids从原执行到当前执行"""
+        root, first, second = chain
+
+        response = test_client.get(f"/api/v1/executions/{second.id}/combined-summary", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "execution_ids": [root.id, first.id, second.id],
+            "total": 4,
+            "passed": 3,
+            "failed": 1,
+            "error": 0,
+            "skipped": 0,
+            "duration": 7.0
+        }
+
+
+@allure.feature("重跑失败用例")
+class TestRerunFailed:
+
+    @allure.story("重跑")
+    @pytest.mark.api
+    def test_reruns_failed_cases_except_deleted(self, test_client, auth_headers, queue, chain, cases):
+        """测试只重跑失败和出错的用例, 已删除的用例跳过"""
+        root, _, _ = chain
+
+        response = test_client.post(f"/api/v1/executions/{root.id}/rerun-failed", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["parent_id"] == root.id
+        job = queue.pending[0]
+        assert job.execution_id == response.json()["id"]
+        assert job.payload["test_case_ids"] == [cases[1].id, cases[2].id]
+
+    @allure.story("重跑")
+    @pytest.mark.api
+    def test_includes_cancelled_cases(self, test_client, auth_headers, queue, db_session, test_environment, cases):
+        """测试停止的执行中没有运行的用例也被重跑"""
+        a, b, c, _ = cases
+        execution = _execution(
+            db_session, test_environment, "cancelled", [(a, "passed", 1.0), (b, "failed", 1.0)],
+            result={"cancelled_case_ids": [c.id]}
+        )
+
+        response = test_client.post(f"/api/v1/executions/{execution.id}/rerun-failed", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert queue.pending[0].payload["test_case_ids"] == [b.id, c.id]
+
+    @allure.story("重跑")
+    @pytest.mark.api
+    def test_keeps_cache_options(self, test_client, auth_headers, queue, db_session, test_environment, cases):
+        """测试重跑沿用原执行的use_cache和environment_version, 换环境时不沿用环境版本"""
+        execution = _execution(
+            db_session, test_environment, "failed", [(cases[0], "failed", 1.0)],
+            use_cache=False, environment_version="build-7"
+        )
+        other = Environment(project_id=test_environment.project_id, name="other", base_url="http://127.0.0.1:9", config={})
+        db_session.add(other)
+        db_session.commit()
+        url = f"/api/v1/executions/{execution.id}/rerun-failed"
+
+        same = test_client.post(url, headers=auth_headers)
+        moved = test_client.post(url, json={"environment_id": other.id}, headers=auth_headers)
+
+        assert same.status_code == moved.status_code == 200
+        payloads = [job.payload for job in queue.pending]
+        assert [(payload["use_cache"], payload["environment_version"]) for payload in payloads] == [
+            (False, "build-7"), (False, None)
+        ]
+        rerun = db_session.get(TestExecution, same.json()["id"])
+        assert (rerun.use_cache, rerun.environment_version) == (False, "build-7")
+
+    @allure.story("重跑")
+    @pytest.mark.api
+    @pytest.mark.parametrize("status", ["pending", "running"])
+    def test_rejects_unfinished_execution(self, test_client, auth_headers, queue, db_session, test_environment, cases, status):
+        """测试未结束的执行不能重跑"""
+        execution = _execution(db_session, test_environment, status, [(cases[0], "failed", 1.0)])
+
+        response = test_client.post(f"/api/v1/executions/{execution.id}/rerun-failed", headers=auth_headers)
+
+        assert response.status_code == 400
+        assert not queue.pending
+
+    @allure.story("重跑")
+    @pytest.mark.api
+    def test_rejects_when_failed_cases_were_deleted(self, test_client, auth_headers, queue, db_session, test_environment, cases):
+        """测试失败的用例都已删除时没有可重跑的用例"""
+        execution = _execution(db_session, test_environment, "failed", [(cases[0], "passed", 1.0), (cases[3], "failed", 1.0)])
+        db_session.delete(cases[3])
+        db_session.commit()
+
+        response = test_client.post(f"/api/v1/executions/{execution.id}/rerun-failed", headers=auth_headers)
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "No failed test cases to rerun"
+        assert not queue.pending
@@ -0,0 +1,63 @@
+import pytest
+import allure
+
+from services.result_cache import cache_ttl, case_cache_key
+from services.result_writer import summarize_results
+
+
+class _Case:
+    def __init__(self, test_data, type="api"):
+        self.id = 1
+        self.type = type
+        self.test_data = test_data
+
+
+class _Environment:
+    def __init__(self, config, base_url="http://api.test"):
+        self.id = 1
+        self.base_url = base_url
+        self.config = config
+
+
+@allure.feature("结果缓存")
+class TestResultCache:
+
+    @allure.story("缓存键")
+    @pytest.mark.unit
+    def test_key_changes_with_case_environment_and_version(self):
+        """测试用例定义、环境配置和环境版本变化时缓存键不同"""
+        case = _Case({"endpoint": "/users", "expected_status": 200})
+        environment = _Environment({"result_cache": {"ttl": 60}, "headers": {"X-Env": "a"}})
+        key = case_cache_key(case, environment)
+
+        assert key == case_cache_key(_Case({"expected_status": 200, "endpoint": "/users"}), environment)
+        assert key != case_cache_key(_Case({"endpoint": "/users", "expected_status": 201}), environment)
+        assert key != case_cache_key(case, _Environment({"result_cache": {"ttl": 60}, "headers": {"X-Env": "b"}}))
+        assert key != case_cache_key(case, _Environment(environment.config, base_url="http://other.test"))
+        assert key != case_cache_key(case, environment, version="build-2")
+        # 只修改缓存时间不影响已缓存的结果
+        assert key == case_cache_key(case, _Environment({"result_cache": {"ttl": 600}, "headers": {"X-Env": "a"}}))
+
+    @allure.story("可缓存的用例")
+    @pytest.mark.unit
+    def test_uncacheable_cases(self):
+        """测试UI用例和显式关闭缓存的用例不缓存, 环境未配置时不启用"""
+        environment = _Environment({"result_cache": {"ttl": 60}})
+
+        assert case_cache_key(_Case({"url": "/"}, type="ui"), environment) is None
+        assert case_cache_key(_Case({"endpoint": "/orders", "cache": False}), environment) is None
+        assert cache_ttl(environment) == 60
+        assert cache_ttl(_Environment({})) == 0
+
+    @allure.story("汇总")
+    @pytest.mark.unit
+    def test_summary_counts_cached_results(self):
+        """测试执行汇总统计复用的缓存结果"""
+        summary = summarize_results([
+            {"status": "passed", "duration": 0, "cached_from": 3},
+            {"status": "passed", "duration": 1.5}
+        ])
+
+        assert summary["passed"] == 2
+        assert summary["cached"] == 1
+        assert summary["duration"] == 1.5
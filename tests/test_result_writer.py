@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+import allure
+
+from services.artifact_store import LocalArtifactStore
+from services.result_writer import ResultWriter
+
+
+def _result(case_id, **fields):
+    return {"test_case_id": case_id, "test_case_name": f"case-{case_id}", "status": "passed", **fields}
+
+
+def _writer(tmp_path, written, fail=0, **options):
+    """不连接数据库的写入器, 写入的批次记录在written中, 前fail次写入失败"""
+    writer = ResultWriter(1, store=LocalArtifactStore(str(tmp_path)), **options)
+    failures = [fail]
+
+    def insert(rows):
+        if failures[0]:
+            failures[0] -= 1
+            raise RuntimeError("database is locked")
+        written.append(rows)
+
+    writer._insert = insert
+    return writer
+
+
+@allure.feature("结果写入")
+class TestResultWriter:
+
+    @allure.story("批量写入")
+    @pytest.mark.unit
+    async def test_flushes_when_batch_is_full(self, tmp_path):
+        """测试缓冲区达到批量大小时立即写入"""
+        written = []
+        writer = _writer(tmp_path, written, batch_size=2, flush_interval=60)
+        writer.start()
+        writer.add("api", _result(1))
+        writer.add("api", _result(2))
+        await asyncio.sleep(0.1)
+
+        assert [[row["test_case_id"] for row in rows] for rows in written] == [[1, 2]]
+        writer.add("api", _result(3))
+        await writer.close()
+        assert [row["test_case_id"] for row in written[-1]] == [3]
+
+    @allure.story("批量写入")
+    @pytest.mark.unit
+    async def test_flushes_after_interval(self, tmp_path):
+        """测试未达到批量大小的结果在间隔时间后写入"""
+        written = []
+        writer = _writer(tmp_path, written, batch_size=100, flush_interval=0.05)
+        writer.start()
+        writer.add("api", _result(1))
+        await asyncio.sleep(0.2)
+
+        assert len(written) == 1
+        await writer.close()
+
+    @allure.story("产物存储")
+    @pytest.mark.unit
+    async def test_large_fields_moved_to_artifact_store(self, tmp_path):
+        """测试超过内联上限的输出和详情写入产物存储, 行内只保留预览"""
+        written = []
+        writer = _writer(tmp_path, written)
+        writer.inline_limit = 100
+        writer.add("api", _result(1, output="x" * 1000, details={"body": "y" * 1000}))
+        await writer.close()
+
+        row = written[0][0]
+        assert set(row["artifacts"]) == {"output", "details"}
+        assert row["artifacts"]["output"]["size"] == 1000
+        assert len(row["output"]) < 200
+        assert row["details"] == {"truncated": True, "artifact": "details"}
+        assert writer.store.exists(row["artifacts"]["output"]["key"])
+
+    @allure.story("写入失败")
+    @pytest.mark.unit
+    async def test_failed_write_keeps_rows(self, tmp_path):
+        """测试写入失败时结果留在缓冲区并在下次写入, close在仍然失败时抛出异常"""
+        written = []
+        writer = _writer(tmp_path, written, fail=2)
+        writer.inline_limit = 100
+        writer.add("api", _result(1, output="x" * 1000))
+
+        with pytest.raises(RuntimeError):
+            await writer.flush()
+        assert len(writer.buffer) == 1
+        with pytest.raises(RuntimeError):
+            await writer.close()
+
+        writer.add("api", _result(2))
+        await writer.close()
+        assert [row["test_case_id"] for row in written[0]] == [1, 2]
+        assert len(list(tmp_path.rglob("*.gz"))) == 1
@@ -0,0 +1,51 @@
+import pytest
+import allure
+
+from services.retry import RetryPolicy
+
+
+class _Case:
+    def __init__(self, test_data):
+        self.test_data = test_data
+
+
+class _Environment:
+    def __init__(self, config):
+        self.config = config
+
+
+@allure.feature("失败重试")
+class TestRetryPolicy:
+
+    @allure.story("重试条件")
+    @pytest.mark.unit
+    def test_should_retry(self):
+        """测试按次数、状态和异常类名判断是否重试"""
+        policy = RetryPolicy(count=2, on=["error"], error_types=["ConnectError"])
+        error = {"status": "error", "error": "ConnectError: connection refused"}
+
+        assert policy.should_retry(error, 1)
+        assert policy.should_retry(error, 2)
+        assert not policy.should_retry(error, 3)
+        assert not policy.should_retry({"status": "failed", "error": "ConnectError"}, 1)
+        assert not policy.should_retry({"status": "error", "error": "ValueError: bad"}, 1)
+        assert not policy.should_retry({"status": "error", "error": "NotConnectErrorX"}, 1)
+
+    @allure.story("退避")
+    @pytest.mark.unit
+    def test_delay_doubles(self):
+        """测试退避时间每次翻倍"""
+        policy = RetryPolicy(count=3, backoff=0.5)
+
+        assert [policy.delay(attempt) for attempt in (1, 2, 3)] == [0.5, 1.0, 2.0]
+
+    @allure.story("配置合并")
+    @pytest.mark.unit
+    def test_case_overrides_environment(self):
+        """测试用例的重试配置覆盖环境配置"""
+        environment = _Environment({"retry": {"count": 1, "backoff": 2, "on": "error,failed"}})
+        policy = RetryPolicy.for_case(_Case({"retry": {"count": 3}}), environment)
+
+        assert policy.count == 3
+        assert policy.backoff == 2
+        assert policy.on == {"error", "failed"}
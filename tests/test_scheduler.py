@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+import allure
+
+from services.scheduler import (
+    ConcurrencyLimiter,
+    run_bounded,
+    longest_first,
+    partition_lpt,
+    simulate_makespan
+)
+
+
+@allure.feature("测试调度")
+class TestScheduler:
+
+    @allure.story("并发限制")
+    @pytest.mark.unit
+    async def test_run_bounded_respects_limit(self):
+        """测试并发数不超过上限且结果保持顺序"""
+        limiter = ConcurrencyLimiter(global_limit=3)
+        running = 0
+        peak = 0
+
+        async def worker(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01 * (10 - item))
+            running -= 1
+            return item * 2
+
+        results = await run_bounded(list(range(10)), worker, limiter)
+
+        assert results == [item * 2 for item in range(10)]
+        assert peak == 3
+
+    @allure.story("并发限制")
+    @pytest.mark.unit
+    async def test_per_key_limit(self):
+        """测试单个环境的并发上限"""
+        limiter = ConcurrencyLimiter(global_limit=10, per_key_limit=2)
+        running = 0
+        peak = 0
+
+        async def worker(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return item
+
+        await run_bounded(list(range(6)), worker, limiter, key="http://env")
+
+        assert peak == 2
+
+    @allure.story("并发限制")
+    @pytest.mark.unit
+    async def test_per_key_limit_change(self):
+        """测试同一环境的并发上限修改后, 之后的执行使用新的上限"""
+        limiter = ConcurrencyLimiter(global_limit=10)
+        peaks = []
+
+        for limit in (1, 3):
+            running = 0
+            peak = 0
+
+            async def worker(item):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+            await run_bounded(list(range(6)), worker, limiter, key="http://env", limit=limit)
+            peaks.append(peak)
+
+        assert peaks == [1, 3]
+
+    @allure.story("并发限制")
+    @pytest.mark.unit
+    async def test_shared_key_uses_smaller_limit(self):
+        """测试共享base_url但上限不同的两个执行同时运行时, 总并发不超过较小的上限"""
+        limiter = ConcurrencyLimiter(global_limit=10)
+        running = []
+        overlaps = []
+
+        def worker(limit):
+            async def run(item):
+                running.append(limit)
+                overlaps.append(list(running))
+                await asyncio.sleep(0.01)
+                running.remove(limit)
+            return run
+
+        await asyncio.gather(
+            run_bounded(list(range(6)), worker(3), limiter, key="http://env", limit=3),
+            run_bounded(list(range(3)), worker(1), limiter, key="http://env", limit=1)
+        )
+
+        assert all(len(current) <= min(current) for current in overlaps)
+        assert max(len(current) for current in overlaps) == 3
+        assert not limiter._per_key
+
+    @allure.story("耗时调度")
+    @pytest.mark.unit
+    def test_longest_first_shortens_makespan(self):
+        """测试长用例在最后开始时按耗时排序可以缩短总耗时"""
+        durations = [1, 1, 1, 1, 1, 1, 6]
+
+        assert simulate_makespan(durations, 2) == 9
+        assert simulate_makespan(longest_first(durations, float), 2) == 6
+
+    @allure.story("耗时调度")
+    @pytest.mark.unit
+    def test_partition_lpt(self):
+        """测试分片的总耗时均衡且没有空分片"""
+        shards = partition_lpt([5, 4, 3, 3, 2, 1], float, 3)
+
+        assert sorted(sum(shard) for shard in shards) == [6, 6, 6]
+        assert all(shard == sorted(shard, reverse=True) for shard in shards)
+        assert len(partition_lpt([0, 0, 0, 0], float, 2)[0]) == 2
+        assert partition_lpt([1], float, 4) == [[1]]